@@ -0,0 +1,89 @@
+"""
+Measures resident memory of a synthetic world's attributes held two ways: compactly, as
+AttributeHandler keeps them (serialized values keyed by shared name ids), and decoded, as a dict
+of Attribute to an AttributeValue holding a built Text per value, which is how they used to be
+kept. Each layout is built in its own process so one can't hide in the other's freed memory.
+
+Usage:
+    python benchmarks/attribute_memory.py [objects] [attributes per object]
+"""
+import gc
+import subprocess
+import sys
+import time
+import types
+
+from pymush.attributes import AttributeHandler, AttributeManager, AttributeValue
+from pymush.inheritance import InheritanceIndex
+from mudrich.text import Text
+
+LAYOUTS = ("compact", "decoded")
+
+
+def rss() -> int:
+    """
+    Current resident set size in bytes, from /proc.
+    """
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    raise RuntimeError("VmRSS not found")
+
+
+def entries(i: int, per_object: int) -> dict:
+    return {f"ATTR{a}": {"value": {"text": f"value {a} of {i}"}} for a in range(per_object)}
+
+
+def build(layout: str, count: int, per_object: int) -> list:
+    manager = AttributeManager(None)
+    owner = types.SimpleNamespace(game=types.SimpleNamespace(inheritance=InheritanceIndex(None)), uuid=None)
+    held = list()
+    for i in range(count):
+        data = entries(i, per_object)
+        if layout == "compact":
+            handler = AttributeHandler(owner, manager)
+            handler.load(data)
+            held.append(handler)
+        else:
+            held.append(
+                {
+                    manager.get_or_create(name): AttributeValue(manager.get_or_create(name), Text.deserialize(entry["value"]))
+                    for name, entry in data.items()
+                }
+            )
+    return held
+
+
+def measure(layout: str, count: int, per_object: int):
+    gc.collect()
+    before = rss()
+    started = time.perf_counter()
+    held = build(layout, count, per_object)
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    grown = rss() - before
+    total = count * per_object
+    print(
+        f"{layout:>8}: {grown / 2**20:8.1f} MiB, {grown / total:6.1f} bytes/attribute, built in {elapsed:.2f}s"
+    )
+    return held
+
+
+def main(count: int, per_object: int):
+    print(f"{count} objects x {per_object} attributes = {count * per_object} attributes")
+    for layout in LAYOUTS:
+        subprocess.run([sys.executable, __file__, "--layout", layout, str(count), str(per_object)], check=True)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    layout = None
+    if args[:1] == ["--layout"]:
+        layout, args = args[1], args[2:]
+    count = int(args[0]) if len(args) > 0 else 50000
+    per_object = int(args[1]) if len(args) > 1 else 100
+    if layout:
+        measure(layout, count, per_object)
+    else:
+        main(count, per_object)
@@ -0,0 +1,103 @@
+"""
+Measures one say-sized message delivered to 10, 100 and 1000 listeners two ways: through the
+Broadcaster, which renders once per distinct client profile and writes the output to every
+connection sharing it, and per recipient, each connection rendering the Text on its own Console
+as it did before. Listeners are spread over a handful of client profiles the way a live game's
+are: most on one common setup, the rest scattered.
+
+Usage:
+    python benchmarks/broadcast.py [repeats] [listener counts...]
+"""
+import io
+import sys
+import time
+
+from mudrich.console import Console
+from mudrich.text import Text
+
+from pymush.broadcast import Broadcaster
+from pymush.conn import COLOR_MAP, ColorSystem
+
+# (color, width, mxp, screen reader), weighted by how many listeners use each.
+PROFILES = (
+    ((ColorSystem.TRUECOLOR, 80, False, False), 6),
+    ((ColorSystem.EIGHT_BIT, 80, False, False), 2),
+    ((ColorSystem.STANDARD, 120, True, False), 1),
+    ((None, 80, False, True), 1),
+)
+
+
+class BenchConnection:
+    def __init__(self, profile):
+        self.render_profile = profile
+        color, width, mxp, _ = profile
+        self.console = Console(
+            color_system=COLOR_MAP[color] if color else None, mxp=mxp, file=io.StringIO(), width=width
+        )
+        self.written = 0
+
+    def send(self, message):
+        message.send(self)
+
+    def print_rendered(self, rendered: str):
+        self.written += len(rendered)
+
+    def print(self, text: Text):
+        with self.console.capture() as capture:
+            self.console.print(text, highlight=False)
+        self.written += len(capture.get())
+
+
+class BenchObject:
+    def __init__(self, connection: BenchConnection):
+        self.connection = connection
+
+    def send(self, message):
+        if self.connection not in message.relay_chain:
+            self.connection.send(message.relay(self))
+
+
+def listeners(count: int) -> list:
+    weights = [profile for profile, weight in PROFILES for _ in range(weight)]
+    return [BenchObject(BenchConnection(weights[i % len(weights)])) for i in range(count)]
+
+
+def per_recipient(objects: list, text: Text):
+    for obj in objects:
+        obj.connection.print(text)
+
+
+def broadcast(broadcaster: Broadcaster, objects: list, text: Text):
+    broadcaster.send_all(objects, text)
+
+
+def timed(func, repeats: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - started) / repeats
+
+
+def main(repeats: int, counts: list):
+    text = Text('Someone says, "') + Text("Hello, everyone. How is it going?", style="green") + Text('"')
+    print(f"{repeats} messages per run, {len(PROFILES)} client profiles")
+    for count in counts:
+        objects = listeners(count)
+        broadcaster = Broadcaster(None)
+        # Warm both paths so profile consoles are built before timing.
+        broadcast(broadcaster, objects, text)
+        per_recipient(objects, text)
+        renders = broadcaster.renders
+        shared = timed(lambda: broadcast(broadcaster, objects, text), repeats)
+        each = timed(lambda: per_recipient(objects, text), repeats)
+        print(
+            f"{count:>5} listeners: broadcaster {shared * 1000:8.2f}ms ({(broadcaster.renders - renders) // repeats} renders), "
+            f"per recipient {each * 1000:8.2f}ms ({count} renders), {each / shared:5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    repeats = int(args[0]) if len(args) > 0 else 100
+    counts = [int(arg) for arg in args[1:]] or [10, 100, 1000]
+    main(repeats, counts)
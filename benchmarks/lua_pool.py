@@ -0,0 +1,113 @@
+"""
+Compares running short Lua scripts on a fresh runtime per task, as LuaTask used to, with running
+them on a pooled runtime with a compiled-chunk cache, as LuaRuntimePool does.
+
+pymush.lua is built on asynclupa, so this mirrors its setup steps with plain lupa rather than
+importing it: creating the runtime and snapshotting its globals, evaluating the hook and api
+factories, compiling the chunk with load() (or rebinding a cached chunk's _ENV) and setting the
+count hook. The scripts run synchronously, so the numbers cover setup and execution only.
+
+Usage:
+    python benchmarks/lua_pool.py [tasks]
+"""
+import hashlib
+import sys
+import time
+
+from collections import OrderedDict
+
+from lupa import LuaRuntime
+
+HOOK_CALL = """
+function(step, slice, budget)
+    local used, since_yield = 0, 0
+    return function()
+        used = used + step
+        if budget > 0 and used > budget then error("budget") end
+        since_yield = since_yield + step
+        if since_yield >= slice then since_yield = 0 end
+    end
+end
+"""
+
+API_CALL = """
+function()
+    local api = {}
+    function api.get(objects, names) return {} end
+    return api
+end
+"""
+
+BIND_CALL = """function(chunk, env) debug.setupvalue(chunk, 1, env) return chunk end"""
+
+SCRIPTS = [
+    "local total = 0 for i = 1, 200 do total = total + i end return total",
+    "local t = {} for i = 1, 50 do t[i] = tostring(i) end return #t",
+    "local s = 'a' for i = 1, 20 do s = s .. 'b' end return s",
+]
+
+ALLOWED = ("assert", "error", "ipairs", "next", "pairs", "pcall", "select", "tonumber", "tostring", "type")
+
+
+class Runtime:
+    def __init__(self):
+        self.runtime = LuaRuntime(register_eval=False)
+        self.globals = {k: v for k, v in self.runtime.globals().items()}
+        self.loader = self.globals["load"]
+        self.hook_factory = self.runtime.eval(HOOK_CALL)
+        self.api_factory = self.runtime.eval(API_CALL)
+        self.bind = self.runtime.eval(BIND_CALL)
+        self.chunks = OrderedDict()
+
+    def compile(self, code: str, env, cache: bool):
+        if not cache:
+            return self.loader(code, "bench", "t", env)
+        key = hashlib.blake2b(code.encode("utf-8"), digest_size=16).digest()
+        if (chunk := self.chunks.get(key, None)) is not None:
+            self.chunks.move_to_end(key)
+            return self.bind(chunk, env)
+        chunk = self.chunks[key] = self.loader(code, "bench", "t", env)
+        return chunk
+
+    def run(self, code: str, cache: bool):
+        env = self.runtime.table()
+        for key in ALLOWED:
+            env[key] = self.globals[key]
+        env["game"] = self.api_factory()
+        chunk = self.compile(code, env, cache)
+        debug = self.globals["debug"]
+        debug.sethook(self.hook_factory(1000, 100000, 1000000), "", 1000)
+        try:
+            return chunk()
+        finally:
+            debug.sethook()
+
+
+def fresh(tasks: int) -> float:
+    started = time.perf_counter()
+    for i in range(tasks):
+        Runtime().run(SCRIPTS[i % len(SCRIPTS)], cache=False)
+    return time.perf_counter() - started
+
+
+def pooled(tasks: int) -> float:
+    runtime = Runtime()
+    started = time.perf_counter()
+    for i in range(tasks):
+        runtime.run(SCRIPTS[i % len(SCRIPTS)], cache=True)
+    return time.perf_counter() - started
+
+
+def main():
+    tasks = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    # Warm up imports and allocators before timing either.
+    fresh(50)
+    pooled(50)
+    for name, func in (("fresh", fresh), ("pooled", pooled)):
+        elapsed = func(tasks)
+        print(f"{name:>7}: {tasks} tasks in {elapsed:.3f}s, {tasks / elapsed:,.0f} tasks/s, "
+              f"{elapsed / tasks * 1e6:.1f} us/task")
+
+
+if __name__ == "__main__":
+    main()
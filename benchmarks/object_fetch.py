@@ -0,0 +1,82 @@
+"""
+Times hydrating every row of a synthetic SQLite world: one get_object() per key, as searches used
+to, against one get_objects() call and ObjectCache.get_many(), cold and warm.
+
+Usage:
+    python benchmarks/object_fetch.py [objects]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import types
+
+from uuid import uuid4
+
+import rapidjson
+
+from pymush.cache import ObjectCache
+from pymush.db import sqlite
+
+
+class _App:
+    def __init__(self, path: str):
+        self.config = types.SimpleNamespace(database_config={"path": path})
+
+
+def _game(db) -> types.SimpleNamespace:
+    """
+    Just what ObjectCache needs: no snapshot, nothing waiting to be written, no stats.
+    """
+    return types.SimpleNamespace(
+        db=db,
+        snapshot=types.SimpleNamespace(get_row=lambda key: None),
+        writeback=types.SimpleNamespace(pending_fields=lambda key: None),
+        stats=types.SimpleNamespace(charge_db=lambda elapsed: None),
+        options={"object_cache_size": 0},
+    )
+
+
+async def populate(db, count: int):
+    now = int(time.time())
+    rows = list()
+    for i in range(count):
+        name = f"Object {i}"
+        rows.append(
+            (str(uuid4()), "THING", name, rapidjson.dumps({"text": name}), now, now, None, 0, 0, None, i, None)
+        )
+    await db.conn.executemany(sqlite.INSERT_OBJECT, rows)
+    await db.conn.commit()
+
+
+async def main(count: int):
+    with tempfile.TemporaryDirectory() as folder:
+        db = sqlite.SQLiteDatabase(_App(os.path.join(folder, "bench.sqlite3")))
+        await db.async_setup()
+        await populate(db, count)
+        keys = [key for _, key in (await db.list_objects()).data]
+
+        timings = list()
+        started = time.perf_counter()
+        for key in keys:
+            await db.get_object(key)
+        timings.append(("get_object per key", time.perf_counter() - started))
+
+        started = time.perf_counter()
+        await db.get_objects(keys)
+        timings.append(("get_objects", time.perf_counter() - started))
+
+        cache = ObjectCache(_game(db))
+        for label in ("get_many (cold)", "get_many (warm)"):
+            started = time.perf_counter()
+            await cache.get_many(keys)
+            timings.append((label, time.perf_counter() - started))
+        await db.close()
+
+    for label, elapsed in timings:
+        print(f"{label:>20}: {elapsed:.3f}s, {elapsed / count * 1e6:.1f} us/object")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000))
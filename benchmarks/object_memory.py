@@ -0,0 +1,64 @@
+"""
+Measures the memory held per modules.GameObject with tracemalloc, key strings included. Objects
+are built bare, as most props and items stay, and then again with their contents manager,
+saved locations and both queues forced into existence, as for a room that holds things and
+runs code. Each layout is built in its own process so one can't hide in the other's freed
+memory.
+
+Usage:
+    python benchmarks/object_memory.py [objects]
+"""
+import gc
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from pymush.modules import GameObject
+
+LAYOUTS = ("bare", "active")
+
+
+def build(layout: str, count: int) -> list:
+    held = list()
+    for i in range(count):
+        obj = GameObject(None, None, f"object{i}")
+        if layout == "active":
+            obj.contents
+            obj.saved_locations
+            obj.action_queue
+            obj.cmd_queue
+        held.append(obj)
+    return held
+
+
+def measure(layout: str, count: int):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    held = build(layout, count)
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    grown = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f"{layout:>6}: {grown / 2**20:8.1f} MiB, {grown / count:7.1f} bytes/object, built in {elapsed:.2f}s")
+    return held
+
+
+def main(count: int):
+    print(f"{count} objects")
+    for layout in LAYOUTS:
+        subprocess.run([sys.executable, __file__, "--layout", layout, str(count)], check=True)
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    layout = None
+    if args[:1] == ["--layout"]:
+        layout, args = args[1], args[2:]
+    count = int(args[0]) if len(args) > 0 else 100000
+    if layout:
+        measure(layout, count)
+    else:
+        main(count)
@@ -0,0 +1,108 @@
+"""
+Compares booting a synthetic world from SQL with booting it from a snapshot. Each side indexes
+every key into an ObjectRegistry, as load_game does, then reads every row and every object's
+attributes back, as a game touching its whole world eventually would. Also times taking the
+snapshot.
+
+Usage:
+    python benchmarks/snapshot_boot.py [objects] [attributes per object]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import types
+
+from uuid import uuid4
+
+import rapidjson
+
+from pymush.db import sqlite
+from pymush.registry import ObjectRegistry
+from pymush.scheduler import DeadlineScheduler
+from pymush.snapshot import SnapshotManager
+
+PAGE = 1000
+
+
+def _game(db, folder: str) -> types.SimpleNamespace:
+    game = types.SimpleNamespace(
+        db=db,
+        options={"load_page_size": PAGE, "snapshot_interval": 3600.0, "snapshot_dir": os.path.join(folder, "snapshots")},
+        scheduler=DeadlineScheduler(),
+        objects=ObjectRegistry(lambda key: key),
+        writeback=types.SimpleNamespace(flush=lambda: asyncio.sleep(0)),
+    )
+    game.snapshot = SnapshotManager(game)
+    return game
+
+
+async def populate(db, count: int, per_object: int):
+    now = int(time.time())
+    objects, attributes = list(), list()
+    for i in range(count):
+        uuid, name = str(uuid4()), f"Object {i}"
+        objects.append((uuid, "THING", name, rapidjson.dumps({"text": name}), now, now, None, 0, 0, None, i, None))
+        for a in range(per_object):
+            attributes.append((uuid, f"ATTR{a}", rapidjson.dumps({"text": f"value {a} of {i} " * 3})))
+    await db.conn.executemany(sqlite.INSERT_OBJECT, objects)
+    await db.conn.executemany(sqlite.SET_ATTRIBUTE, attributes)
+    await db.conn.commit()
+
+
+async def main(count: int, per_object: int):
+    timings = list()
+    with tempfile.TemporaryDirectory() as folder:
+        app = types.SimpleNamespace(config=types.SimpleNamespace(database_config={"path": os.path.join(folder, "world.sqlite3")}))
+        db = sqlite.SQLiteDatabase(app)
+        await db.async_setup()
+        await populate(db, count, per_object)
+
+        game = _game(db, folder)
+        started = time.perf_counter()
+        position = 0
+        while True:
+            page = (await db.list_objects(after=position, limit=PAGE)).data
+            for position, key in page:
+                game.objects.add_key(key)
+            if len(page) < PAGE:
+                break
+        timings.append(("SQL: index keys", time.perf_counter() - started))
+        keys = list(game.objects.all_keys())
+        started = time.perf_counter()
+        for i in range(0, len(keys), PAGE):
+            await db.get_objects(keys[i:i + PAGE])
+            await db.get_attributes_many(keys[i:i + PAGE])
+        timings.append(("SQL: read rows and attributes", time.perf_counter() - started))
+
+        game.snapshot.boot()
+        await game.snapshot.take()
+        timings.append(("snapshot: take", game.snapshot.last_duration))
+        game.snapshot.close()
+
+        game = _game(db, folder)
+        started = time.perf_counter()
+        found = game.snapshot.boot()
+        found.sort(key=lambda x: x[0] is None)
+        for dbid, key in found:
+            game.objects.add_key(key, dbid)
+        timings.append(("snapshot: map, replay and index keys", time.perf_counter() - started))
+        started = time.perf_counter()
+        for key in game.objects.all_keys():
+            game.snapshot.get_row(key)
+            game.snapshot.get_attributes(key)
+        timings.append(("snapshot: read rows and attributes", time.perf_counter() - started))
+        game.snapshot.close()
+        await db.close()
+
+    print(f"{count} objects, {count * per_object} attributes")
+    for label, elapsed in timings:
+        print(f"{label:>38}: {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 50000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 10,
+    ))
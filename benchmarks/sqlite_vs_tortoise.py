@@ -0,0 +1,128 @@
+"""
+Runs the same workload through the native SQLite backend and through Tortoise models over the
+same SQLite table layout: point reads of every object, bulk reads in chunks, and a batch of
+name updates.
+
+pymush.db.tortoise isn't part of this tree, so the Tortoise side is a model declared here that
+mirrors the objects table, with name_text as a MudTextField like the game's models. That covers
+what the backend pays for per row - model instantiation and JSON decoding - but not anything
+else the real backend may do.
+
+Usage:
+    python benchmarks/sqlite_vs_tortoise.py [objects]
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import types
+
+from uuid import uuid4
+
+from mudrich.text import Text
+from tortoise import Tortoise, fields
+from tortoise.models import Model
+from tortoise.transactions import in_transaction
+
+from pymush.db import sqlite
+from pymush.models import MudTextField
+
+CHUNK = sqlite.IN_CHUNK
+UPDATES = 1000
+
+
+class BenchTextField(MudTextField):
+    """
+    MudTextField hands JSONField's encoder a dict it then doesn't encode, which current Tortoise
+    won't bind. Encode it as the game's backend must.
+    """
+
+    def to_db_value(self, value, instance):
+        return fields.JSONField.to_db_value(self, super().to_db_value(value, instance), instance)
+
+
+class BenchObject(Model):
+    id = fields.UUIDField(pk=True)
+    type_name = fields.CharField(max_length=100, index=True)
+    name = fields.CharField(max_length=255, index=True)
+    name_text = BenchTextField()
+    created = fields.BigIntField()
+    modified = fields.BigIntField()
+    user = fields.UUIDField(null=True)
+    admin_level = fields.IntField(default=0)
+    quota_cost = fields.IntField(default=0)
+    userdata = fields.JSONField(null=True)
+
+    class Meta:
+        table = "objects"
+
+
+def timed(results: list, label: str):
+    class Timer:
+        def __enter__(self):
+            self.started = time.perf_counter()
+
+        def __exit__(self, *args):
+            results.append((label, time.perf_counter() - self.started))
+
+    return Timer()
+
+
+async def run_native(path: str, keys: list, results: list):
+    db = sqlite.SQLiteDatabase(types.SimpleNamespace(config=types.SimpleNamespace(database_config={"path": path})))
+    await db.async_setup()
+    with timed(results, "native point reads"):
+        for key in keys:
+            await db.get_object(key)
+    with timed(results, "native bulk reads"):
+        for i in range(0, len(keys), CHUNK):
+            await db.get_objects(keys[i:i + CHUNK])
+    with timed(results, f"native {len(keys[:UPDATES])} updates"):
+        await db.write_batch({key: {"name_text": Text(f"Renamed {i}")} for i, key in enumerate(keys[:UPDATES])}, dict())
+    await db.close()
+
+
+async def run_tortoise(path: str, keys: list, results: list):
+    await Tortoise.init(db_url=f"sqlite://{path}", modules={"models": ["__main__"]})
+    try:
+        await _run_tortoise(keys, results)
+    finally:
+        await Tortoise.close_connections()
+
+
+async def _run_tortoise(keys: list, results: list):
+    ids = [key.uuid for key in keys]
+    with timed(results, "tortoise point reads"):
+        for uuid in ids:
+            await BenchObject.get(id=uuid)
+    with timed(results, "tortoise bulk reads"):
+        for i in range(0, len(ids), CHUNK):
+            await BenchObject.filter(id__in=ids[i:i + CHUNK])
+    with timed(results, f"tortoise {len(ids[:UPDATES])} updates"):
+        async with in_transaction():
+            for i, uuid in enumerate(ids[:UPDATES]):
+                name = Text(f"Renamed {i}")
+                await BenchObject.filter(id=uuid).update(name=name.plain, name_text=name)
+
+
+async def main(count: int):
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "bench.sqlite3")
+        db = sqlite.SQLiteDatabase(types.SimpleNamespace(config=types.SimpleNamespace(database_config={"path": path})))
+        await db.async_setup()
+        for i in range(count):
+            await db.create_object("THING", Text(f"Object {i}"))
+        keys = [key for _, key in (await db.list_objects()).data]
+        await db.close()
+
+        results = list()
+        await run_native(path, keys, results)
+        await run_tortoise(path, keys, results)
+
+    for label, elapsed in results:
+        print(f"{label:>24}: {elapsed:.3f}s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000))
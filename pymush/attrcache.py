@@ -0,0 +1,212 @@
+import asyncio
+import contextvars
+import time
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Optional, Set
+
+from pymush.db.base import GameObjectKey
+from pymush.db.exceptions import DatabaseUnavailable
+
+
+class PinScope:
+    """
+    The handlers one task has asked for. Tasks started from inside a scope share it, so it is
+    closed when its own block ends and pins nothing after that.
+    """
+
+    __slots__ = ["uuids", "open"]
+
+    def __init__(self):
+        self.uuids: Set[Any] = set()
+        self.open = True
+
+
+# The PinScope of the task running in this asyncio context, if any.
+PINS = contextvars.ContextVar("attribute_pins", default=None)
+
+
+class AttributeLoader:
+    """
+    Pages objects' attributes in from the database the first time they're needed, rather than
+    holding every object's attributes for the life of the process.
+
+    Handlers that ask to be loaded during the same tick are fetched together, with one
+    db.get_attributes_many() call. When the attribute_cache_size option is non-zero, the least
+    recently used handlers beyond it drop their values again. Handlers with changes the
+    WriteBehind hasn't written yet are never dropped, and neither are handlers a task still
+    running inside pinned() has asked for, so values loaded before an await are there after it.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.resident: OrderedDict[Any, "AttributeHandler"] = OrderedDict()
+        self._pending: Dict[Any, asyncio.Future] = dict()
+        self._batch: Dict[Any, "AttributeHandler"] = dict()
+        self._batch_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.loads = 0
+        self.batches = 0
+        self.evictions = 0
+        self.last_batch = 0
+        self.max_batch = 0
+        # How many open PinScopes hold each handler.
+        self.pins: Dict[Any, int] = dict()
+
+    @property
+    def size_limit(self) -> int:
+        return self.game.options["attribute_cache_size"]
+
+    def __len__(self):
+        return len(self.resident)
+
+    async def ensure(self, handlers: Iterable["AttributeHandler"]):
+        """
+        Returns once every handler given has its attributes loaded. Raises DatabaseUnavailable if
+        they could not be read.
+        """
+        waiting = list()
+        scope = PINS.get()
+        for handler in handlers:
+            uuid = handler.owner.uuid
+            if scope is not None and scope.open and uuid not in scope.uuids:
+                scope.uuids.add(uuid)
+                self.pins[uuid] = self.pins.get(uuid, 0) + 1
+            if handler.loaded:
+                self.hits += 1
+                if uuid in self.resident:
+                    self.resident.move_to_end(uuid)
+                continue
+            if (fut := self._pending.get(uuid, None)) is None:
+                fut = self._enqueue(handler)
+            waiting.append(fut)
+        if waiting:
+            await asyncio.gather(*[asyncio.shield(fut) for fut in waiting])
+
+    @contextmanager
+    def pinned(self):
+        """
+        Keeps every handler ensure()d inside the block resident until the block ends.
+        """
+        scope = PinScope()
+        token = PINS.set(scope)
+        try:
+            yield scope
+        finally:
+            PINS.reset(token)
+            scope.open = False
+            for uuid in scope.uuids:
+                if (count := self.pins.get(uuid, 0)) > 1:
+                    self.pins[uuid] = count - 1
+                else:
+                    self.pins.pop(uuid, None)
+            scope.uuids.clear()
+            self.evict()
+
+    def _enqueue(self, handler: "AttributeHandler") -> asyncio.Future:
+        uuid = handler.owner.uuid
+        fut = asyncio.get_event_loop().create_future()
+        self._pending[uuid] = fut
+        self._batch[uuid] = handler
+        # The batch is read once the current tick yields, so everything asked for until then
+        # shares the query.
+        if self._batch_task is None:
+            self._batch_task = asyncio.create_task(self._load_batch())
+        return fut
+
+    async def _fetch(self, keys: Dict[Any, GameObjectKey]) -> Dict[Any, Dict[str, dict]]:
+        out = dict()
+        missing = list()
+        for uuid, key in keys.items():
+            if (found := self.game.snapshot.get_attributes(key)) is not None:
+                out[uuid] = found
+            else:
+                missing.append(key)
+        if not missing:
+            return out
+
+        db = self.game.db
+        started = time.perf_counter()
+        try:
+            if hasattr(db, "get_attributes_many"):
+                result = await db.get_attributes_many(missing)
+                if result.error:
+                    raise DatabaseUnavailable(result.error)
+                out.update(result.data)
+            else:
+                results = await asyncio.gather(*[db.get_attributes(key) for key in missing])
+                for key, result in zip(missing, results):
+                    if result.error:
+                        raise DatabaseUnavailable(result.error)
+                    out[key.uuid] = result.data
+        finally:
+            self.game.stats.charge_db(time.perf_counter() - started)
+        return out
+
+    async def _load_batch(self):
+        batch, self._batch, self._batch_task = self._batch, dict(), None
+        try:
+            found = await self._fetch({uuid: handler.owner.key for uuid, handler in batch.items()})
+        except Exception as err:
+            for uuid in batch.keys():
+                if (fut := self._pending.pop(uuid, None)) is not None:
+                    fut.set_exception(err)
+                    fut.exception()
+            return
+
+        self.batches += 1
+        self.last_batch = len(batch)
+        self.max_batch = max(self.max_batch, len(batch))
+        for uuid, handler in batch.items():
+            # Anything written in the meantime is newer than what was read, and load() keeps it.
+            handler.load(found.get(uuid, None) or dict())
+            self.loads += 1
+            self.resident[uuid] = handler
+            if (fut := self._pending.pop(uuid, None)) is not None:
+                fut.set_result(True)
+        # The handlers just loaded are about to be read; don't drop them on their way out.
+        self.evict(keep=batch)
+
+    def evict(self, keep: Iterable[Any] = ()):
+        if not (limit := self.size_limit) or len(self.resident) <= limit:
+            return
+        # A batch being written may not have reached the database yet; dropping one of its
+        # handlers now could page the old values back in.
+        if self.game.writeback.in_flush:
+            return
+        busy = self.game.writeback.handlers
+        for uuid in list(self.resident.keys()):
+            if len(self.resident) <= limit:
+                break
+            handler = self.resident[uuid]
+            if handler.dirty or uuid in busy or uuid in keep or uuid in self.pins:
+                continue
+            del self.resident[uuid]
+            handler.unload()
+            self.evictions += 1
+
+    def discard(self, uuid):
+        self.resident.pop(uuid, None)
+
+    def clear(self):
+        self.resident.clear()
+        self.pins.clear()
+        self._pending.clear()
+        self._batch.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.loads
+        return {
+            "size": len(self.resident),
+            "limit": self.size_limit,
+            "hits": self.hits,
+            "misses": self.loads,
+            "batches": self.batches,
+            "last_batch": self.last_batch,
+            "max_batch": self.max_batch,
+            "avg_batch": (self.loads / self.batches) if self.batches else 0.0,
+            "evictions": self.evictions,
+            "pinned": len(self.pins),
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
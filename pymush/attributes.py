@@ -1,17 +1,30 @@
+import re
 import sys
 
-from dataclasses import dataclass, field
-from typing import Optional, Union, List, Dict, Set
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from functools import lru_cache
+from dataclasses import dataclass
+from typing import Optional, Union, List, Dict, Set, Tuple, Iterable
 from enum import IntEnum
 
+import rapidjson
+
 from mudrich.text import Text
 
 
-@dataclass
 class Attribute:
-    manager: "AttributeManager"
-    name: str
-    holders: Set = field(default_factory=set)
+    """
+    One per distinct attribute name, shared by every object that has that attribute. The id is
+    what AttributeHandlers actually key their values by.
+    """
+
+    __slots__ = ["manager", "name", "id"]
+
+    def __init__(self, manager: "AttributeManager", name: str, id: int):
+        self.manager = manager
+        self.name = name
+        self.id = id
 
     def __hash__(self):
         return hash(self.name)
@@ -19,26 +32,39 @@ class Attribute:
     def __eq__(self, other):
         return (other is self) or (other.name == self.name)
 
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: {self.name}>"
+
 
 class AttributeManager:
     attr_class = Attribute
+    # How many decoded values to keep around, across every handler using this manager.
+    hot_size = 4096
 
-    __slots__ = ["owner", "attributes", "roots"]
+    __slots__ = ["owner", "attributes", "roots", "by_id", "hot"]
 
     def __init__(self, owner):
         self.owner = owner
         self.attributes: Dict[str, Attribute] = dict()
         self.roots: Dict[str, Attribute] = dict()
+        self.by_id: List[Attribute] = list()
+        self.hot: OrderedDict[Tuple["AttributeHandler", int], "AttributeValue"] = OrderedDict()
+
+    def _add(self, name: str) -> Attribute:
+        s = sys.intern(name)
+        a = self.attr_class(manager=self, name=s, id=len(self.by_id))
+        self.attributes[s] = a
+        self.by_id.append(a)
+        return a
 
     def create(self, name: Union[str, Text]) -> Attribute:
         plain = name.plain if isinstance(name, Text) else name
         name = plain.upper()
         if not self.valid_name(name):
             raise ValueError("Bad Name for an Attribute")
-        s = sys.intern(name.upper())
-        a = self.attr_class(manager=self, name=s)
-        self.attributes[s] = a
-        return a
+        if (a := self.attributes.get(name, None)) :
+            return a
+        return self._add(name)
 
     def get(self, name: str) -> Optional[Attribute]:
         plain = name.plain if isinstance(name, Text) else name
@@ -49,21 +75,39 @@ class AttributeManager:
         name = plain.upper()
         if not self.valid_name(name):
             raise ValueError("Bad Name for an Attribute")
-        s = sys.intern(name.upper())
-        if (a := self.attributes.get(s, None)) :
+        if (a := self.attributes.get(name, None)) :
             return a
-        a = self.attr_class(manager=self, name=s)
-        self.attributes[s] = a
-        return a
+        return self._add(name)
 
     def valid_name(self, name: str):
         return True
 
+    def hot_get(self, handler: "AttributeHandler", attr_id: int) -> Optional["AttributeValue"]:
+        if (found := self.hot.get((handler, attr_id), None)) is not None:
+            self.hot.move_to_end((handler, attr_id))
+        return found
+
+    def hot_put(self, handler: "AttributeHandler", attr_id: int, value: "AttributeValue"):
+        self.hot[(handler, attr_id)] = value
+        self.hot.move_to_end((handler, attr_id))
+        while len(self.hot) > self.hot_size:
+            self.hot.popitem(last=False)
+
+    def hot_discard(self, handler: "AttributeHandler", attr_id: int):
+        self.hot.pop((handler, attr_id), None)
+
 
-@dataclass
 class AttributeValue:
-    attribute: Attribute
-    value: Text
+    """
+    A decoded attribute value. These are built on access and may be shared through the hot
+    cache, so change values through the AttributeHandler rather than by assigning to one.
+    """
+
+    __slots__ = ["attribute", "value"]
+
+    def __init__(self, attribute: Attribute, value: Text):
+        self.attribute = attribute
+        self.value = value
 
     def can_see(self, request: "AttributeRequest", handler: "AttributeHandler"):
         return True
@@ -77,6 +121,40 @@ class AttributeValue:
 
 EMPTY = Text("")
 
+# Separates branches of tree attributes, as in FOO`BAR`BAZ.
+TREE_SEP = "`"
+
+
+@lru_cache(maxsize=256)
+def compile_pattern(pattern: str) -> Tuple[str, "re.Pattern"]:
+    """
+    Turns an attribute wildcard into (literal prefix, regex). * and ? don't cross a tree
+    separator, so FOO`* is FOO's immediate branches only; ** matches anything, so FOO`** is the
+    whole tree.
+    """
+    pattern = pattern.upper()
+    out = list()
+    prefix = None
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "*":
+            if prefix is None:
+                prefix = pattern[:i]
+            if pattern.startswith("**", i):
+                out.append(".*")
+                i += 2
+                continue
+            out.append(f"[^{TREE_SEP}]*")
+        elif c == "?":
+            if prefix is None:
+                prefix = pattern[:i]
+            out.append(f"[^{TREE_SEP}]")
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return (pattern if prefix is None else prefix), re.compile("".join(out) + r"\Z")
+
 
 class AttributeRequestType(IntEnum):
     GET = 0
@@ -97,43 +175,206 @@ class AttributeRequest:
 
 
 class AttributeHandler:
+    """
+    Holds an object's attribute values in serialized form, keyed by the shared Attribute ids.
+    They are decoded into AttributeValues only when read, and the most recently read are kept
+    in the manager's hot cache.
+    """
+
     attr_class = AttributeValue
 
     def __init__(self, owner: "GameObject", manager: AttributeManager):
         self.owner: "GameObject" = owner
         self.manager: AttributeManager = manager
-        self.attributes: Dict[Attribute, AttributeValue] = dict()
+        self.values: Dict[int, str] = dict()
+        # Attributes changed since the last write-behind flush.
+        self.dirty: Set[Attribute] = set()
+        # Names of every attribute held, sorted, so wildcards with a literal prefix and whole
+        # trees (every leaf shares the prefix BRANCH`) are range scans.
+        self.order: List[str] = list()
+        # Whether values holds what the database has. Set by load(), which the game's
+        # AttributeLoader calls the first time anything asks.
+        self.loaded = False
+        # Attributes this object lacks, by id, mapped to the ancestor's handler that supplies
+        # them, or None if no ancestor does. The game's InheritanceIndex clears entries when an
+        # ancestor's attribute or the parent chain changes.
+        self.resolved: Dict[int, Optional["AttributeHandler"]] = dict()
 
     def __len__(self):
-        return len(self.attributes)
+        return len(self.values)
 
     def __bool__(self):
-        return bool(self.attributes)
+        return bool(self.values)
 
     def count(self):
         return len(self)
 
+    @staticmethod
+    def encode(value: Union[str, Text]) -> str:
+        if isinstance(value, str):
+            value = Text(value)
+        return rapidjson.dumps(value.serialize())
+
+    def decode(self, attr: Attribute, raw: str) -> AttributeValue:
+        return self.attr_class(attr, Text.deserialize(rapidjson.loads(raw)))
+
     def serialize(self) -> dict:
-        return {attr.name: val.serialize() for attr, val in self.attributes.items()}
+        by_id = self.manager.by_id
+        return {by_id[attr_id].name: {"value": rapidjson.loads(raw)} for attr_id, raw in self.values.items()}
+
+    def load(self, data: Dict[str, dict]):
+        """
+        Fills values from their serialized form, {name: {"value": ...}}. Attributes changed
+        locally since are newer than the database's copy and are left alone.
+        """
+        for name, entry in data.items():
+            attr = self.manager.get_or_create(name)
+            if attr in self.dirty:
+                continue
+            if attr.id not in self.values:
+                insort(self.order, attr.name)
+            self.values[attr.id] = rapidjson.dumps(entry["value"])
+        self.loaded = True
+        self.owner.game.inheritance.attributes_loaded(self.owner.uuid)
+
+    def unload(self):
+        for attr_id in self.values.keys():
+            self.manager.hot_discard(self, attr_id)
+        self.values.clear()
+        self.order.clear()
+        self.loaded = False
+        self.owner.game.inheritance.attributes_loaded(self.owner.uuid)
+
+    def mark_dirty(self, attr: Attribute):
+        self.dirty.add(attr)
+        self.owner.game.writeback.mark_attributes(self)
+
+    def collect_dirty(self) -> Dict[str, Optional[dict]]:
+        """
+        Returns and clears the pending changes as {name: serialized value}, with None for
+        attributes that were removed.
+        """
+        out = dict()
+        for attr in self.dirty:
+            raw = self.values.get(attr.id, None)
+            out[attr.name] = {"value": rapidjson.loads(raw)} if raw is not None else None
+        self.dirty.clear()
+        return out
+
+    def restore_dirty(self, changes: Dict[str, Optional[dict]]):
+        for name in changes.keys():
+            if (attr := self.manager.get(name)) :
+                self.dirty.add(attr)
+
+    def has(self, attr: Attribute) -> bool:
+        return attr.id in self.values
+
+    def lookup(self, attr: Attribute) -> Optional[AttributeValue]:
+        if (raw := self.values.get(attr.id, None)) is None:
+            return None
+        if (found := self.manager.hot_get(self, attr.id)) is not None:
+            return found
+        found = self.decode(attr, raw)
+        self.manager.hot_put(self, attr.id, found)
+        return found
+
+    def store(self, attr: Attribute, value: Union[str, Text]):
+        if isinstance(value, str):
+            value = Text(value)
+        if attr.id not in self.values:
+            insort(self.order, attr.name)
+        self.values[attr.id] = self.encode(value)
+        self.manager.hot_put(self, attr.id, self.attr_class(attr, value))
+        self.mark_dirty(attr)
+        self.owner.game.inheritance.attribute_changed(self.owner.uuid, attr.id)
+
+    def remove(self, attr: Attribute) -> bool:
+        if self.values.pop(attr.id, None) is None:
+            return False
+        if (i := bisect_left(self.order, attr.name)) < len(self.order) and self.order[i] == attr.name:
+            del self.order[i]
+        self.manager.hot_discard(self, attr.id)
+        self.mark_dirty(attr)
+        self.owner.game.inheritance.attribute_changed(self.owner.uuid, attr.id)
+        return True
+
+    def names(self) -> Iterable[Attribute]:
+        """
+        Every attribute held, in name order.
+        """
+        attributes = self.manager.attributes
+        return [attributes[name] for name in self.order]
+
+    def items(self) -> Iterable[Tuple[Attribute, AttributeValue]]:
+        for attr in self.names():
+            yield attr, self.lookup(attr)
+
+    def _range(self, prefix: str) -> Iterable[str]:
+        """
+        Yields the held names starting with prefix, in order. The list may change between yields,
+        so the scan resumes from the last name rather than an index.
+        """
+        last = prefix
+        i = bisect_left(self.order, last)
+        while i < len(self.order) and (name := self.order[i]).startswith(prefix):
+            yield name
+            last = name
+            i = bisect_left(self.order, last)
+            if i < len(self.order) and self.order[i] == last:
+                i += 1
+
+    def match(self, pattern: Union[str, Text]) -> Iterable[Attribute]:
+        """
+        Yields the attributes whose names match a wildcard pattern, in order. Only the names
+        sharing the pattern's literal prefix are tested, and nothing is decoded, so this is safe
+        to stream over objects with many attributes.
+        """
+        plain = pattern.plain if isinstance(pattern, Text) else pattern
+        prefix, regex = compile_pattern(plain)
+        attributes = self.manager.attributes
+        for name in self._range(prefix):
+            if regex.match(name):
+                yield attributes[name]
+
+    def match_items(self, pattern: Union[str, Text]) -> Iterable[Tuple[Attribute, AttributeValue]]:
+        for attr in self.match(pattern):
+            if (found := self.lookup(attr)) is not None:
+                yield attr, found
+
+    def tree(self, name: Union[str, Text]) -> List[Attribute]:
+        """
+        The attribute and every leaf beneath it.
+        """
+        plain = (name.plain if isinstance(name, Text) else name).upper()
+        attributes = self.manager.attributes
+        out = [attributes[plain]] if (attr := attributes.get(plain, None)) and self.has(attr) else list()
+        out.extend(attributes[leaf] for leaf in self._range(plain + TREE_SEP))
+        return out
 
     def get(self, name: Union[str, Text]) -> Optional[AttributeValue]:
         attr = self.manager.get(name)
         if attr:
-            return self.attributes.get(attr, None)
+            return self.lookup(attr)
         return None
 
     def set_or_create(self, name: Union[str, Text], value: Text):
         attr = self.manager.get_or_create(name)
         if attr:
-            val = self.attributes.get(attr, None)
-            if val:
-                val.value = value
-            else:
-                val = self.attr_class(attr, value)
-                self.attributes[attr] = val
-
-    def wipe(self, pattern):
-        pass
+            self.store(attr, value)
+
+    def wipe(self, pattern: Union[str, Text] = "**") -> int:
+        """
+        Removes every attribute matching pattern, along with the leaves of any branch it removes.
+        Returns how many were removed.
+        """
+        doomed = list()
+        for attr in list(self.match(pattern)):
+            doomed.extend(self.tree(attr.name))
+        removed = 0
+        for attr in dict.fromkeys(doomed):
+            if self.remove(attr):
+                removed += 1
+        return removed
 
     def get_value(self, name: str) -> Text:
         attr = self.get(name)
@@ -153,14 +394,21 @@ class AttributeHandler:
         if not attr_base:
             return
         request.attr_base = attr_base
-        attr = self.attributes.get(attr_base, None)
-        if attr:
+        if (attr := self.lookup(attr_base)) :
             request.attr = attr
-        else:
-            for ancestor in self.owner.ancestors:
-                attr = ancestor.attributes.attributes.get(attr_base, None)
-                if attr:
-                    request.attr = attr
+            return
+        if attr_base.id in self.resolved:
+            if (source := self.resolved[attr_base.id]) is not None:
+                request.attr = source.lookup(attr_base)
+            return
+        source = None
+        for ancestor in self.owner.ancestors:
+            if (handler := getattr(ancestor, "attributes", None)) is not None and handler.has(attr_base):
+                source = handler
+                break
+        self.resolved[attr_base.id] = source
+        if source is not None:
+            request.attr = source.lookup(attr_base)
 
     def api_get(self, request: AttributeRequest):
         self._get_inherit(request)
@@ -179,26 +427,48 @@ class AttributeHandler:
         except ValueError as err:
             request.error = Text(f"#-1 {str(err).upper()}")
             return
-        attr = self.attributes.get(attr_base, None)
+        attr = self.lookup(attr_base)
         if attr:
             request.attr = attr
             if not attr.can_set(request, self):
                 request.error = Text("#-1 NO PERMISSION TO SET ATTRIBUTE")
                 return
-            attr.value = request.value
-        else:
-            attr = self.attr_class(attr_base, request.value)
-            self.attributes[attr_base] = attr
-        return
+        self.store(attr_base, request.value)
+
+    def api_wipe(self, request: AttributeRequest):
+        """
+        Wipes the attributes matching request.name the accessor may set. request.value is how
+        many were removed.
+        """
+        doomed = list()
+        for attr in list(self.match(request.name)):
+            for leaf in self.tree(attr.name):
+                if (found := self.lookup(leaf)) is not None and not found.can_set(request, self):
+                    request.error = Text(f"#-1 NO PERMISSION TO WIPE {leaf.name}")
+                    return
+                doomed.append(leaf)
+        removed = sum(1 for attr in dict.fromkeys(doomed) if self.remove(attr))
+        request.value = Text(str(removed))
 
     async def api_request(self, request: AttributeRequest):
         if not self.api_access(request):
             request.error = Text("PERMISSION DENIED FOR ATTRIBUTES")
             return
 
+        loader = self.owner.game.attribute_loader
+        if request.req_type == AttributeRequestType.GET:
+            await self.owner.load_ancestors()
+            handlers = [self]
+            handlers.extend(h for a in self.owner.ancestors if (h := getattr(a, "attributes", None)) is not None)
+            await loader.ensure(handlers)
+        else:
+            await loader.ensure([self])
+
         if request.req_type == AttributeRequestType.SET:
             self.api_set(request)
         elif request.req_type == AttributeRequestType.GET:
             self.api_get(request)
+        elif request.req_type == AttributeRequestType.WIPE:
+            self.api_wipe(request)
         else:
             request.error = Text("Malformed API request!")
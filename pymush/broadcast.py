@@ -0,0 +1,104 @@
+import io
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from mudrich.console import Console
+from mudrich.text import Text
+
+from pymush.conn import COLOR_MAP
+from pymush.utils import formatter as fmt
+
+
+class _Collected(fmt.FormatList):
+    """
+    A FormatList that travels the usual send() and relay path, but stops at each Connection and
+    files it for the Broadcaster to write to instead of rendering there.
+    """
+
+    def __init__(self, source, groups: Optional[Dict] = None, **kwargs):
+        super().__init__(source, **kwargs)
+        self.groups = groups
+
+    def relay(self, obj):
+        c = super().relay(obj)
+        c.groups = self.groups
+        return c
+
+    def send(self, conn: "Connection", user=None, character=None):
+        # Recipients seeing the same Text were handed the same Line, so it identifies the text.
+        line = self.messages[0]
+        self.groups.setdefault((id(line), conn.render_profile), (line.data, list()))[1].append(conn)
+
+
+class Broadcaster:
+    """
+    Delivers one message to many objects while rendering it as few times as possible. Each
+    recipient is sent the message as recipient.msg(text) would, so its send(), listeners and
+    relays behave as usual. Only where the message reaches a Connection is it collected rather
+    than rendered. Connections are grouped by render profile (color system, width, MXP, screen
+    reader) and by which Text they are to see. Each group is rendered once, on a console kept
+    for that profile, and the output is written to every connection in it.
+
+    Callers that compose per-recipient text (as with dubs) should hand the same Text object to
+    recipients who see the same thing; that's what lets them share a render.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.consoles: Dict[Tuple, Console] = dict()
+        self.messages = 0
+        self.renders = 0
+        self.deliveries = 0
+
+    def console_for(self, profile: Tuple) -> Console:
+        if (console := self.consoles.get(profile, None)) is None:
+            color, width, mxp, _ = profile
+            # Built the same way Connection builds its own, so output matches theirs exactly.
+            console = Console(
+                color_system=COLOR_MAP[color] if color else None, mxp=mxp, file=io.StringIO(), width=width
+            )
+            self.consoles[profile] = console
+        return console
+
+    def render(self, profile: Tuple, text: Text) -> str:
+        console = self.console_for(profile)
+        with console.capture() as capture:
+            console.print(text, highlight=False)
+        self.renders += 1
+        return capture.get()
+
+    def send(self, deliveries: Iterable[Tuple[Any, Text]]):
+        """
+        Sends each (recipient, text) pair as recipient.msg(text) would.
+        """
+        self.messages += 1
+        lines: Dict[int, fmt.Line] = dict()
+        groups: Dict[Tuple, Tuple[Text, List[Any]]] = dict()
+        for target, text in deliveries:
+            if not text:
+                continue
+            if (line := lines.get(id(text), None)) is None:
+                line = lines[id(text)] = fmt.Line(text)
+            flist = _Collected(target, groups)
+            flist.add(line)
+            target.send(flist)
+
+        for (_, profile), (text, conns) in groups.items():
+            rendered = self.render(profile, text)
+            for conn in conns:
+                conn.print_rendered(rendered)
+            self.deliveries += len(conns)
+
+    def send_all(self, targets: Iterable[Any], text: Text):
+        self.send((target, text) for target in targets)
+
+    def clear(self):
+        self.consoles.clear()
+
+    def stats(self) -> dict:
+        return {
+            "messages": self.messages,
+            "renders": self.renders,
+            "deliveries": self.deliveries,
+            "profiles": len(self.consoles),
+        }
@@ -0,0 +1,213 @@
+import asyncio
+import time
+
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+from pymush.db.base import GameObjectKey
+
+
+class CachedRow:
+    """
+    A copy of one object's database row. version is bumped on every write-through, so callers
+    that derive data from the row can tell whether what they derived is still current.
+    """
+
+    __slots__ = ["data", "version"]
+
+    def __init__(self, data: dict, version: int = 0):
+        self.data = data
+        self.version = version
+
+
+class ObjectCache:
+    """
+    In-process cache of GameObject rows, so that the getters on GameObject don't round-trip to the
+    database every time they're called.
+
+    Reads go through get(). Writes must go through write(), which updates the database and then
+    the cached row, or stage(), which updates only the cached row on behalf of the WriteBehind.
+    Anything that changes rows behind the cache's back must call invalidate().
+
+    When the object_cache_size option is non-zero, the least recently used rows are evicted to stay
+    within it.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.rows: OrderedDict[Any, CachedRow] = OrderedDict()
+        self._pending: Dict[Any, asyncio.Future] = dict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def size_limit(self) -> int:
+        return self.game.options["object_cache_size"]
+
+    def __len__(self):
+        return len(self.rows)
+
+    async def get(self, key: GameObjectKey) -> Optional[dict]:
+        """
+        Returns the row for key, or None if it does not exist.
+        """
+        if (row := self.rows.get(key.uuid, None)) is not None:
+            self.hits += 1
+            self.rows.move_to_end(key.uuid)
+            return row.data
+
+        self.misses += 1
+        # Several tasks missing on the same object at once share a single query.
+        if (fut := self._pending.get(key.uuid, None)) is not None:
+            return await asyncio.shield(fut)
+
+        fut = asyncio.get_event_loop().create_future()
+        self._pending[key.uuid] = fut
+        try:
+            data = await self._fetch(key)
+        except Exception as err:
+            if self._pending.get(key.uuid, None) is fut:
+                del self._pending[key.uuid]
+            fut.set_exception(err)
+            # Nobody else may be awaiting it; don't complain about an unretrieved exception.
+            fut.exception()
+            raise
+
+        # If the row was written or invalidated while we were fetching, what we hold may be stale.
+        # Hand it to those already waiting, but don't keep it.
+        if self._pending.get(key.uuid, None) is fut:
+            del self._pending[key.uuid]
+            if data is not None:
+                self.store(key, data)
+        fut.set_result(data)
+        return data
+
+    async def _fetch(self, key: GameObjectKey) -> Optional[dict]:
+        if (row := self.game.snapshot.get_row(key)) is not None:
+            return self.overlay(key, row)
+        started = time.perf_counter()
+        result = await self.game.db.get_object(key)
+        self.game.stats.charge_db(time.perf_counter() - started)
+        if result.error:
+            return None
+        return self.overlay(key, result.data)
+
+    def overlay(self, key: GameObjectKey, data: dict) -> dict:
+        """
+        Applies changes that are waiting in the WriteBehind to a row freshly read from the database.
+        """
+        if (pending := self.game.writeback.pending_fields(key)) :
+            data = {**data, **pending}
+        return data
+
+    async def get_many(self, keys: Iterable[GameObjectKey], store: bool = True) -> Dict[Any, dict]:
+        """
+        Returns {uuid: row} for every key that exists. Rows not already cached are fetched in a
+        single bulk query, and kept unless store is False - as for whole-world scans that would
+        otherwise flood the cache.
+        """
+        out = dict()
+        missing = list()
+        for key in keys:
+            if (row := self.rows.get(key.uuid, None)) is not None:
+                self.hits += 1
+                self.rows.move_to_end(key.uuid)
+                out[key.uuid] = row.data
+            elif (data := self.game.snapshot.get_row(key)) is not None:
+                self.misses += 1
+                data = self.overlay(key, data)
+                if store:
+                    self.store(key, data)
+                out[key.uuid] = data
+            else:
+                missing.append(key)
+        if not missing:
+            return out
+
+        self.misses += len(missing)
+        started = time.perf_counter()
+        if hasattr(self.game.db, "get_objects"):
+            result = await self.game.db.get_objects(missing)
+            fetched = dict() if result.error else result.data
+        else:
+            # Backends without a bulk call still get their queries issued concurrently.
+            results = await asyncio.gather(*[self.game.db.get_object(key) for key in missing])
+            fetched = {key.uuid: r.data for key, r in zip(missing, results) if not r.error}
+        self.game.stats.charge_db(time.perf_counter() - started)
+
+        for key in missing:
+            if (data := fetched.get(key.uuid, None)) is not None:
+                data = self.overlay(key, data)
+                # Anything stored meanwhile came from a write or a fresher read; keep that.
+                if store and key.uuid not in self._pending and key.uuid not in self.rows:
+                    self.store(key, data)
+                out[key.uuid] = data
+        return out
+
+    def store(self, key: GameObjectKey, data: dict):
+        if (row := self.rows.get(key.uuid, None)) is not None:
+            row.data = data
+            row.version += 1
+            self.rows.move_to_end(key.uuid)
+        else:
+            self.rows[key.uuid] = CachedRow(data)
+            self.evict()
+
+    def evict(self):
+        if not (limit := self.size_limit):
+            return
+        while len(self.rows) > limit:
+            self.rows.popitem(last=False)
+            self.evictions += 1
+
+    async def write(self, key: GameObjectKey, **kwargs):
+        """
+        Writes the given fields to the database and, if that worked, to the cached row.
+        Returns the QueryResult from the database.
+        """
+        self._pending.pop(key.uuid, None)
+        result = await self.game.db.update_object(key, **kwargs)
+        if result.error:
+            self.invalidate(key)
+            return result
+        if (row := self.rows.get(key.uuid, None)) is not None:
+            data = dict(row.data)
+            data.update(kwargs)
+            self.store(key, data)
+        return result
+
+    def stage(self, key: GameObjectKey, **kwargs):
+        """
+        Applies fields to the cached row, if there is one, without touching the database.
+        """
+        self._pending.pop(key.uuid, None)
+        if (row := self.rows.get(key.uuid, None)) is not None:
+            data = dict(row.data)
+            data.update(kwargs)
+            self.store(key, data)
+
+    def invalidate(self, key: GameObjectKey):
+        self._pending.pop(key.uuid, None)
+        if (row := self.rows.pop(key.uuid, None)) is not None:
+            row.version += 1
+
+    def version(self, key: GameObjectKey) -> int:
+        if (row := self.rows.get(key.uuid, None)) is not None:
+            return row.version
+        return -1
+
+    def clear(self):
+        self._pending.clear()
+        self.rows.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.rows),
+            "limit": self.size_limit,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
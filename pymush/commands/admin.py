@@ -0,0 +1,252 @@
+import re
+import time
+
+from pymush.utils import formatter as fmt
+
+from .base import Command, CommandException, PythonCommandMatcher
+
+
+class _AdminCommand(Command):
+    help_category = "Administration"
+
+    @classmethod
+    async def access(cls, entry):
+        return entry.get_alevel() >= 8
+
+    @property
+    def switches(self):
+        switches = self.match_obj.groupdict().get("switches", None)
+        if not switches:
+            return set()
+        return {sw.strip().lower() for sw in switches.strip("/").split("/") if sw}
+
+    async def owner_name(self, owner):
+        if (found := self.game.cpu.owner_object(owner)) is not None:
+            if hasattr(found, "get_name"):
+                return (await found.get_name()).plain
+            return str(found.name)
+        return str(owner)
+
+
+class QuotaCommand(_AdminCommand):
+    """
+    Displays resource usage for each root owner.
+
+    Usage:
+        @quota/cpu
+    """
+
+    name = "@quota"
+    re_match = re.compile(
+        r"^(?P<cmd>@quota)(?P<switches>(?:/\w+)*)(?: +(?P<args>.+)?)?", flags=re.IGNORECASE
+    )
+
+    async def execute(self):
+        if "cpu" in self.switches:
+            await self.display_cpu()
+        else:
+            raise CommandException("Usage: @quota/cpu")
+
+    async def display_cpu(self):
+        cpu = self.game.cpu
+        out = fmt.FormatList(self.executor)
+        out.add(fmt.Header("CPU Quota Usage"))
+        table = fmt.Table()
+        for col in ("Owner", "Tasks", "Used", "Remaining", "Quota", "Throttled"):
+            table.add_column(col)
+        for account in cpu.report():
+            table.add_row(
+                await self.owner_name(account.owner),
+                str(account.tasks),
+                f"{account.used:.3f}",
+                f"{account.bucket:.3f}",
+                f"{cpu.quota_for(account.owner):.3f}",
+                str(account.throttled),
+            )
+        out.add(table)
+        out.add(fmt.Footer(f"{cpu.running} running, {cpu.waiting} waiting"))
+        self.executor.send(out)
+
+
+class StatsCommand(_AdminCommand):
+    """
+    Displays latency percentiles per command, broken down into time spent waiting in a queue,
+    executing, and waiting on the database, followed by the deepest live queues.
+
+    Usage:
+        @stats/latency
+        @stats/cache
+        @stats/flush
+        @stats/load
+        @stats/reset
+    """
+
+    name = "@stats"
+    re_match = re.compile(
+        r"^(?P<cmd>@stats)(?P<switches>(?:/\w+)*)(?: +(?P<args>.+)?)?", flags=re.IGNORECASE
+    )
+
+    async def execute(self):
+        if "reset" in self.switches:
+            self.game.stats.commands.clear()
+            self.msg("Latency statistics cleared.")
+        elif "latency" in self.switches:
+            await self.display_latency()
+        elif "cache" in self.switches:
+            await self.display_cache()
+        elif "flush" in self.switches:
+            await self.display_flush()
+        elif "load" in self.switches:
+            await self.display_load()
+        else:
+            raise CommandException(
+                "Usage: @stats/latency, @stats/cache, @stats/flush, @stats/load or @stats/reset"
+            )
+
+    @staticmethod
+    def ms(value: float) -> str:
+        return f"{value * 1000:.2f}"
+
+    async def display_latency(self):
+        stats = self.game.stats
+        out = fmt.FormatList(self.executor)
+        out.add(fmt.Header("Command Latency (ms)"))
+        table = fmt.Table()
+        for col in ("Matcher", "Command", "Count", "p50", "p95", "p99", "Max", "Queue p95", "DB p95"):
+            table.add_column(col)
+        for (matcher, command), data in sorted(
+            stats.commands.items(), key=lambda x: x[1].execute.total, reverse=True
+        ):
+            ex = data.execute
+            table.add_row(
+                matcher,
+                command,
+                str(ex.count),
+                self.ms(ex.percentile(50)),
+                self.ms(ex.percentile(95)),
+                self.ms(ex.percentile(99)),
+                self.ms(ex.max),
+                self.ms(data.queue.percentile(95)),
+                self.ms(data.db.percentile(95)),
+            )
+        out.add(table)
+
+        objects, sessions = stats.queue_depths()
+        out.add(fmt.Header("Queue Depths"))
+        depths = fmt.Table()
+        depths.add_column("Holder")
+        depths.add_column("Queued")
+        for name, depth in objects + sessions:
+            depths.add_row(name, str(depth))
+        out.add(depths)
+
+        sched = self.game.scheduler.stats()
+        out.add(
+            fmt.Footer(
+                f"Timers: {sched['depth']} pending, {self.ms(sched['lateness_max'])}ms worst lateness. "
+                f"CPU: {self.game.cpu.running} running, {self.game.cpu.waiting} waiting"
+            )
+        )
+        self.executor.send(out)
+
+    async def display_cache(self):
+        out = fmt.FormatList(self.executor)
+        out.add(fmt.Header("Caches"))
+        table = fmt.Table()
+        for col in ("Cache", "Size", "Limit", "Hits", "Misses", "Evictions", "Hit Rate"):
+            table.add_column(col)
+        for name, data in self.game.cache_stats():
+            table.add_row(
+                name,
+                str(data["size"]),
+                str(data["limit"] or "-"),
+                str(data["hits"]),
+                str(data["misses"]),
+                str(data["evictions"]),
+                f"{data['hit_rate'] * 100:.1f}%",
+            )
+        out.add(table)
+        attrs = self.game.attribute_loader.stats()
+        out.add(
+            fmt.Footer(
+                f"Attribute loads: {attrs['batches']} batches, {attrs['avg_batch']:.1f} avg/{attrs['max_batch']} max objects, {attrs['pinned']} pinned"
+            )
+        )
+        self.executor.send(out)
+
+    async def display_flush(self):
+        data = self.game.writeback.stats()
+        out = fmt.FormatList(self.executor)
+        out.add(fmt.Header("Write-Behind"))
+        table = fmt.Table()
+        table.add_column("Statistic")
+        table.add_column("Value")
+        table.add_row("Pending Objects", str(data["pending"]))
+        table.add_row("Flushes", str(data["flushes"]))
+        table.add_row("Failed Flushes", str(data["failures"]))
+        table.add_row("Objects Written", str(data["rows_written"]))
+        table.add_row("Batch Size (last/avg/max)", f"{data['last_size']}/{data['avg_size']:.1f}/{data['max_size']}")
+        table.add_row(
+            "Duration ms (p50/p95/max)",
+            "/".join(self.ms(data[k]) for k in ("duration_p50", "duration_p95", "duration_max")),
+        )
+        out.add(table)
+        out.add(fmt.Footer())
+        self.executor.send(out)
+
+    async def display_load(self):
+        stats = self.game.stats
+        out = fmt.FormatList(self.executor)
+        out.add(fmt.Header("World Load"))
+        table = fmt.Table()
+        table.add_column("Phase")
+        table.add_column("ms")
+        for name, elapsed in stats.load_phases:
+            table.add_row(name, self.ms(elapsed))
+        out.add(table)
+        total = sum(elapsed for _, elapsed in stats.load_phases)
+        out.add(fmt.Footer(f"{stats.load_objects} objects in {self.ms(total)}ms"))
+
+        snap = self.game.snapshot.stats()
+        out.add(fmt.Header("Snapshots"))
+        snapshots = fmt.Table()
+        snapshots.add_column("Statistic")
+        snapshots.add_column("Value")
+        snapshots.add_row("Journal Generation", str(snap["generation"]))
+        snapshots.add_row("Taken", str(snap["taken"]))
+        snapshots.add_row("Failed", str(snap["failures"]))
+        snapshots.add_row("Last Objects", str(snap["last_count"]))
+        snapshots.add_row("Last Duration ms", self.ms(snap["last_duration"]))
+        snapshots.add_row(
+            "Last Taken",
+            time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snap["last_taken"])) if snap["last_taken"] else "-",
+        )
+        out.add(snapshots)
+        out.add(fmt.Footer())
+        self.executor.send(out)
+
+
+class DumpCommand(_AdminCommand):
+    """
+    Writes every pending change to the database now, rather than waiting for the next
+    write-behind flush.
+
+    Usage:
+        @dump
+    """
+
+    name = "@dump"
+    re_match = re.compile(r"^(?P<cmd>@dump)(?: +(?P<args>.+)?)?", flags=re.IGNORECASE)
+
+    async def execute(self):
+        pending = len(self.game.writeback)
+        if not await self.game.writeback.flush():
+            raise CommandException("Dump failed! Changes are kept and will be retried.")
+        self.msg(f"Dump complete! {pending} objects written.")
+
+
+class AdminCommandMatcher(PythonCommandMatcher):
+    def at_cmdmatcher_creation(self):
+        self.add(QuotaCommand)
+        self.add(StatsCommand)
+        self.add(DumpCommand)
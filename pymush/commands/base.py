@@ -16,6 +16,8 @@ class Command:
     aliases = []
     help_category = None
     timestamp_after = True
+    # Name of the CommandMatcher that produced this command. Set on match.
+    matcher = None
 
     @classmethod
     async def access(cls, entry: "TaskEntry"):
@@ -141,7 +143,9 @@ class PythonCommandMatcher(BaseCommandMatcher):
     async def match(self, entry: "TaskEntry", text: Text):
         for cmd in self.cmds:
             if await cmd.access(entry) and (result := await cmd.match(entry, text)):
-                return cmd(entry, text, result)
+                found = cmd(entry, text, result)
+                found.matcher = self.name
+                return found
 
     async def populate_help(self, entry: "TaskEntry", data):
         for cmd in self.cmds:
@@ -14,88 +14,65 @@ class _RoleplayCommand(Command):
         if not targets:
             return
 
+        deliveries = list()
         for target in targets:
             can_send, err = target.can_receive_text(
                 self.executor, self.interpreter, to_send, mode=self.name
             )
             if not can_send:
                 continue
-            target.receive_text(self.executor, self.interpreter, to_send)
+            deliveries.append((target, to_send))
+        self.game.broadcaster.send(deliveries)
+
+
+class _BroadcastCommand(Command):
+    def broadcast(self, you_see: Text, compose):
+        """
+        Sends you_see to the executor and compose(name) to every neighbor, where name is what
+        that neighbor calls the executor. Text is composed once per distinct name, so neighbors
+        who call the executor the same thing share a render.
+        """
+        neighbors = self.executor.neighbors(include_exits=True)
+        composed = dict()
+        deliveries = [(self.executor, you_see)]
+        for neighbor, name in self.game.display_names.seen_as(self.executor, neighbors).items():
+            if (neighbor_sees := composed.get(name, None)) is None:
+                neighbor_sees = composed[name] = compose(name)
+            can_send, err = neighbor.can_receive_text(
+                self.executor, self.interpreter, neighbor_sees, mode=self.name
+            )
+            if not can_send:
+                continue
+            deliveries.append((neighbor, neighbor_sees))
+        self.game.broadcaster.send(deliveries)
 
 
-class SayCommand(Command):
+class SayCommand(_BroadcastCommand):
     name = "say"
 
     async def execute(self):
         end_quote = Text('"')
         to_send = await self.parser.evaluate(self.args)
         you_see = Text('You say, "') + to_send + end_quote
-        self.executor.receive_text(
-            self.executor, self.interpreter, you_see, mode=self.name
-        )
-
-        for neighbor in self.executor.neighbors(include_exits=True):
-            neighbor_sees = (
-                Text(f'{neighbor.get_dub_or_keyphrase_for(self.executor)} says, "')
-                + to_send
-                + end_quote
-            )
-            can_send, err = neighbor.can_receive_text(
-                self.executor, self.interpreter, neighbor_sees, mode=self.name
-            )
-            if not can_send:
-                continue
-            neighbor.receive_text(
-                self.executor, self.interpreter, neighbor_sees, mode=self.name
-            )
+        self.broadcast(you_see, lambda name: Text(f'{name} says, "') + to_send + end_quote)
 
 
-class PoseCommand(Command):
+class PoseCommand(_BroadcastCommand):
     name = "pose"
 
     async def execute(self):
         to_send = await self.parser.evaluate(self.args)
         you_see = Text("You ") + to_send
-        self.executor.receive_text(
-            self.executor, self.interpreter, you_see, mode=self.name
-        )
-
-        for neighbor in self.executor.neighbors(include_exits=True):
-            neighbor_sees = (
-                Text(f"{neighbor.get_dub_or_keyphrase_for(self.executor)} ") + to_send
-            )
-            can_send, err = neighbor.can_receive_text(
-                self.executor, self.interpreter, neighbor_sees, mode=self.name
-            )
-            if not can_send:
-                continue
-            neighbor.receive_text(
-                self.executor, self.interpreter, neighbor_sees, mode=self.name
-            )
+        self.broadcast(you_see, lambda name: Text(f"{name} ") + to_send)
 
 
-class SemiPoseCommand(Command):
+class SemiPoseCommand(_BroadcastCommand):
     name = "semipose"
 
     async def execute(self):
         to_send = await self.parser.evaluate(self.args)
         you_see = Text("You") + to_send
-        self.executor.receive_text(
-            self.executor, self.interpreter, you_see, mode=self.name
-        )
-
-        for neighbor in self.executor.neighbors(include_exits=True):
-            neighbor_sees = (
-                Text(f"{neighbor.get_dub_or_keyphrase_for(self.executor)}") + to_send
-            )
-            can_send, err = neighbor.can_receive_text(
-                self.executor, self.interpreter, neighbor_sees, mode=self.name
-            )
-            if not can_send:
-                continue
-            neighbor.receive_text(
-                self.executor, self.interpreter, neighbor_sees, mode=self.name
-            )
+        self.broadcast(you_see, lambda name: Text(f"{name}") + to_send)
 
 
 class RoleplayCommandMatcher(PythonCommandMatcher):
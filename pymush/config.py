@@ -13,6 +13,8 @@ class Config(BaseConfig):
         self.gather_modules = defaultdict(list)
         self.game_options = dict()
         self.database_config = dict()
+        # "tortoise" for the ORM backend, "sqlite" for the native SQLite one.
+        self.database_engine = "tortoise"
         self.sqlite_fs_file = "fs.sqlite3"
 
     def setup(self):
@@ -30,6 +32,7 @@ class Config(BaseConfig):
         self.classes["game"]["prompthandler"] = "pymush.conn.PromptHandler"
         self.classes['game']["gameobject"] = "pymush.objects.base.GameObject"
         self.classes["tasks"]["lua"] = "pymush.lua.LuaTask"
+        self.classes["game"]["luapool"] = "pymush.lua.LuaRuntimePool"
         self.classes["tasks"]["mush"] = "pymush.mushcode.task.MushcodeTask"
         self.classes["services"]["game"] = "pymush.game.GameService"
         self.classes["services"]["database"] = "pymush.db.tortoise.TortoiseDatabase"
@@ -46,6 +49,7 @@ class Config(BaseConfig):
 
         m["basic"] = {
             "ic": "pymush.commands.ic.SessionCommandMatcher",
+            "admin": "pymush.commands.admin.AdminCommandMatcher",
         }
 
         m["thing"] = {
@@ -96,8 +100,49 @@ class Config(BaseConfig):
         o["function_invocation_limit"] = 10000
         o["function_recursion_limit"] = 3000
         o["max_cpu_time"] = 4.0
+        o["prompt_delay"] = 0.5
+        o["idle_timeout"] = 0.0
+        o["linkdead_timeout"] = 600.0
+        # Seconds of CPU each root owner may use per cpu_quota_period before being deprioritized.
+        o["cpu_quota"] = 10.0
+        o["cpu_quota_period"] = 60.0
+        o["cpu_overquota_weight"] = 0.1
+        o["cpu_throttle"] = False
+        o["cpu_throttle_max"] = 5.0
+        o["cpu_slots"] = 8
+        o["lua_offload_all"] = False
+        o["lua_pool_size"] = 16
+        o["lua_chunk_cache_size"] = 256
+        o["lua_slice_instructions"] = 100000
+        o["offload_workers"] = 2
+        o["offload_cpu_limit"] = 10.0
+        o["offload_memory_limit"] = 256 * 1024 * 1024
+        # Maximum object rows kept in memory. 0 keeps every row that has been read.
+        o["object_cache_size"] = 0
+        # Maximum objects whose attributes are kept in memory. 0 keeps every set that has been read.
+        o["attribute_cache_size"] = 0
+        # Maximum viewer/target display names kept in memory. 0 keeps every one that has been asked for.
+        o["display_name_cache_size"] = 50000
+        # Object keys are read in pages of this size at startup.
+        o["load_page_size"] = 1000
+        # UUIDs of objects whose wrappers are built and started at load, rather than on first use.
+        o["load_eager"] = list()
+        # Dirty objects are written to the database this many seconds after they change, or as soon
+        # as this many are waiting.
+        o["writeback_interval"] = 5.0
+        o["writeback_max_pending"] = 500
+        # Seconds between binary world snapshots, used for fast restarts. 0 disables them.
+        o["snapshot_interval"] = 3600.0
+        o["snapshot_dir"] = "snapshots"
 
     def _config_database(self):
+        if self.database_engine == "sqlite":
+            self.classes["services"]["database"] = "pymush.db.sqlite.SQLiteDatabase"
+            self.database_config = {
+                "path": "db.sqlite3",
+                "cached_statements": 256,
+            }
+            return
         self.database_config = {
             "db_url": "sqlite://db.sqlite3",
             "modules": {
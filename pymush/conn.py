@@ -31,6 +31,7 @@ from .utils import formatter as fmt
 from .selectscreen import render_select_screen
 from .utils.styling import StyleHandler
 from .commands.base import CommandException
+from .stats import DbTimer
 
 
 COLOR_MAP = {
@@ -72,6 +73,15 @@ class Connection(BaseConnection):
             return self.user.style
         return self.conn_style
 
+    @property
+    def render_profile(self) -> tuple:
+        """
+        Everything that affects how text renders for this connection. Connections with the same
+        profile get identical output for the same text, so broadcasts render once per profile.
+        """
+        details = self.details
+        return (details.color, details.width, details.mxp_active, getattr(details, "screen_reader", False))
+
     @property
     def game(self):
         return self.service.app.game
@@ -116,10 +126,15 @@ class Connection(BaseConnection):
             else:
                 cmd = await self.find_login_cmd(cmd_text)
             if cmd:
+                started = time.time()
                 try:
-                    await cmd.at_pre_execute()
-                    await cmd.execute()
-                    await cmd.at_post_execute()
+                    with DbTimer() as timer, self.game.attribute_loader.pinned():
+                        await cmd.at_pre_execute()
+                        await cmd.execute()
+                        await cmd.at_post_execute()
+                    self.game.stats.record_command(
+                        (cmd.matcher or "none", cmd.name), time.time() - started, timer.db_time
+                    )
                 except CommandException as err:
                     self.msg(text=str(err))
                 except Exception as err:
@@ -132,6 +147,13 @@ class Connection(BaseConnection):
         self._print_mode = "line"
         self.console.print(*args, highlight=False, **kwargs)
 
+    def print_rendered(self, rendered: str):
+        """
+        Sends output already rendered for this connection's render_profile, as by a Broadcaster.
+        """
+        self._print_mode = "line"
+        self.write(rendered)
+
     def print_prompt(self, *args, **kwargs):
         self._print_mode = "prompt"
         self.console.print(*args, highlight=False, **kwargs)
@@ -284,19 +306,41 @@ class Connection(BaseConnection):
 
 
 class PromptHandler:
+    """
+    Sends a prompt once output to the session has gone quiet for prompt_delay seconds. Rather than
+    being polled every tick, it keeps at most one deadline in the game's scheduler and pushes it
+    back lazily when more output arrives.
+    """
+
     def __init__(self, owner: "GameSession"):
         self.owner = owner
         self.last_activity = 0.0
         self.last_prompt = 0.0
-        self.delta = 0.0
+        self.timer = None
+
+    @property
+    def delay(self) -> float:
+        return self.owner.game.app.config.game_options["prompt_delay"]
 
-    def update(self, now: float, delta: float):
-        diff = self.last_activity - self.last_prompt
-        if diff:
-            diff2 = now - self.last_activity
-            if diff2 > self.owner.game.app.config.game_options["prompt_delay"]:
-                self.send_prompt()
-                self.last_prompt = now
+    def touch(self, now: float):
+        self.last_activity = now
+        if not self.timer:
+            self.timer = self.owner.game.scheduler.call_at(now + self.delay, self.elapsed)
+
+    def elapsed(self):
+        due = self.last_activity + self.delay
+        now = time.time()
+        if due > now:
+            self.timer = self.owner.game.scheduler.call_at(due, self.elapsed)
+            return
+        self.timer = None
+        self.send_prompt()
+        self.last_prompt = now
+
+    def cancel(self):
+        if self.timer:
+            self.timer.cancel()
+            self.timer = None
 
     def send_prompt(self):
         pass
@@ -318,6 +362,8 @@ class GameSession(TaskMaster):
         now = time.time()
         self.last_cmd = now
         self.created = now
+        self.idle_timer = None
+        self.linkdead_timer = None
 
     @lazy_property
     def prompt(self):
@@ -348,11 +394,15 @@ class GameSession(TaskMaster):
                 listener.send(message.relay(self))
 
     def receive_msg(self, message: fmt.FormatList):
-        self.prompt.last_activity = time.time()
+        self.prompt.touch(time.time())
 
     async def on_first_connection(self, connection: "Connection"):
+        if self.linkdead_timer:
+            self.linkdead_timer.cancel()
+            self.linkdead_timer = None
         await self.puppet.announce_login(from_linkdead=self.linkdead)
         self.linkdead = False
+        self.schedule_idle_check(self.last_cmd)
 
     def _find_cmd(self, entry: "TaskEntry", cmd_text: str, matcher_categories):
         for matcher_name in matcher_categories:
@@ -380,8 +430,33 @@ class GameSession(TaskMaster):
         self._gather_help(entry, data, self.session_matchers)
         self.puppet.gather_help(entry, data)
 
-    def update(self, now: float, delta: float):
-        self.prompt.update(now, delta)
+    def schedule_idle_check(self, since: float):
+        timeout = self.game.app.config.game_options["idle_timeout"]
+        if timeout > 0 and not self.idle_timer:
+            self.idle_timer = self.game.scheduler.call_at(since + timeout, self.idle_elapsed)
+
+    def idle_elapsed(self):
+        self.idle_timer = None
+        timeout = self.game.app.config.game_options["idle_timeout"]
+        if self.last_cmd + timeout > time.time():
+            # There's been activity since this was scheduled. Push the deadline back.
+            self.schedule_idle_check(self.last_cmd)
+            return
+        asyncio.create_task(self.on_idle_timeout())
+
+    async def on_idle_timeout(self):
+        for conn in list(self.connections):
+            conn.msg(text="You have been idle too long.")
+        await self.end_safely()
+
+    def linkdead_elapsed(self):
+        self.linkdead_timer = None
+        if self.linkdead and not self.connections:
+            asyncio.create_task(self.on_linkdead_timeout())
+
+    async def on_linkdead_timeout(self):
+        self.user.game.sessions.pop(self.character.dbid, None)
+        await self.cleanup()
 
     async def on_connection_leave(self, connection: Connection):
         pass
@@ -392,8 +467,15 @@ class GameSession(TaskMaster):
         else:
             self.linkdead = True
             await self.puppet.announce_linkdead()
+            timeout = self.game.app.config.game_options["linkdead_timeout"]
+            if timeout > 0:
+                self.linkdead_timer = self.game.scheduler.call_later(timeout, self.linkdead_elapsed)
 
     async def cleanup(self):
+        self.prompt.cancel()
+        if self.idle_timer:
+            self.idle_timer.cancel()
+            self.idle_timer = None
         self.puppet.session = None
         if self.character.session:
             self.character.session = None
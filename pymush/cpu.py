@@ -0,0 +1,216 @@
+import asyncio
+import heapq
+import itertools
+import time
+import types
+
+from typing import Any, Dict, Optional, List, Tuple
+
+
+class OwnerAccount:
+    """
+    CPU bookkeeping for a single root owner. The bucket is refilled lazily at quota/period seconds
+    per second, up to quota, and drained by the measured run time of each task.
+    """
+
+    __slots__ = ["owner", "bucket", "last_refill", "used", "tasks", "throttled", "vfinish", "avg_cost"]
+
+    def __init__(self, owner: Any, bucket: float, now: float):
+        self.owner = owner
+        self.bucket = bucket
+        self.last_refill = now
+        self.used = 0.0
+        self.tasks = 0
+        self.throttled = 0
+        self.vfinish = 0.0
+        self.avg_cost = 0.001
+
+
+class CpuScheduler:
+    """
+    Weighted fair queuing across root owners. GameObject.run_task hands its task to run(), which
+    steps the task's coroutine one slice at a time - from one await to the next - and holds one
+    of the cpu_slots only while the task is runnable. When slots are contended, the owner with
+    the smallest virtual finish time goes next, and owners who have exhausted their quota count
+    for only a fraction of a normal share - so one player's runaway bots can't starve everybody
+    else.
+
+    A task awaiting a future (a database query, a timer, a lock) gives its slot up until it is
+    resumed, and each slice is charged the CPU time of the event loop thread while it ran, so
+    time spent waiting costs the owner nothing.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.accounts: Dict[Any, OwnerAccount] = dict()
+        self.running = 0
+        self.vtime = 0.0
+        self._waiting: List[Tuple[float, int, asyncio.Future, float]] = list()
+        self._counter = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiting)
+
+    @property
+    def options(self):
+        return self.game.options
+
+    def owner_object(self, owner: Any) -> Optional[Any]:
+        """
+        Root owners are users, as GameObject.get_root_owner() answers, or an unowned object that
+        answers for itself.
+        """
+        if (user := self.game.users.get(owner, None)) is not None:
+            return user
+        return self.game.objects.get(owner, None)
+
+    def quota_for(self, owner: Any) -> float:
+        if (found := self.owner_object(owner)) is not None and getattr(found, "cpu_quota", 0.0) > 0:
+            return found.cpu_quota
+        return self.options["cpu_quota"]
+
+    def account(self, owner: Any) -> OwnerAccount:
+        if not (account := self.accounts.get(owner, None)):
+            account = OwnerAccount(owner, self.quota_for(owner), time.time())
+            self.accounts[owner] = account
+        return account
+
+    def refill(self, account: OwnerAccount, now: float):
+        quota = self.quota_for(account.owner)
+        elapsed = now - account.last_refill
+        account.last_refill = now
+        account.bucket = min(quota, account.bucket + elapsed * (quota / self.options["cpu_quota_period"]))
+
+    def weight(self, account: OwnerAccount) -> float:
+        if account.bucket >= 0:
+            return 1.0
+        return self.options["cpu_overquota_weight"]
+
+    async def acquire(self, owner: Any) -> OwnerAccount:
+        account = self.account(owner)
+        self.refill(account, time.time())
+
+        if account.bucket < 0 and self.options["cpu_throttle"]:
+            account.throttled += 1
+            rate = self.quota_for(owner) / self.options["cpu_quota_period"]
+            await asyncio.sleep(min(-account.bucket / rate, self.options["cpu_throttle_max"]))
+            self.refill(account, time.time())
+
+        if (fut := self._enqueue(account)) is not None:
+            await self._wait_for(fut)
+        return account
+
+    def _enqueue(self, account: OwnerAccount) -> Optional[asyncio.Future]:
+        """
+        Takes a free slot if nobody is queued for one, and returns None. Otherwise joins the queue
+        and returns the future that is resolved when a slot is handed over.
+        """
+        start_tag = max(self.vtime, account.vfinish)
+        finish_tag = start_tag + account.avg_cost / self.weight(account)
+        account.vfinish = finish_tag
+
+        if self.running < self.options["cpu_slots"] and not self._waiting:
+            self.running += 1
+            self.vtime = start_tag
+            return None
+
+        fut = asyncio.get_event_loop().create_future()
+        heapq.heappush(self._waiting, (finish_tag, next(self._counter), fut, start_tag))
+        return fut
+
+    async def _wait_for(self, fut: asyncio.Future):
+        try:
+            await fut
+        except asyncio.CancelledError:
+            # If we were handed a slot just before being cancelled, pass it along.
+            if fut.done() and not fut.cancelled():
+                self.running -= 1
+                self._dispatch()
+            raise
+
+    def release(self, account: OwnerAccount, cost: float):
+        """
+        Gives up a slot that was held for <cost> seconds of CPU.
+        """
+        account.avg_cost = (account.avg_cost * 0.8) + (cost * 0.2)
+        self.running -= 1
+        self._dispatch()
+
+    def charge(self, account: OwnerAccount, elapsed: float):
+        account.used += elapsed
+        account.bucket -= elapsed
+
+    @types.coroutine
+    def run(self, owner: Any, coro):
+        """
+        Awaits <coro> on behalf of <owner>, one slice at a time. A slice that ends by awaiting a
+        future releases the slot until the task is resumed. One that merely yields to the loop
+        keeps it, unless other tasks are queued for a slot - then it queues again alongside them,
+        and whoever has the smallest finish tag goes next.
+        """
+        account = self.account(owner)
+        holding = False
+        held_cost = 0.0
+        value, error = None, None
+        try:
+            while True:
+                if not holding and error is None:
+                    try:
+                        yield from self.acquire(owner).__await__()
+                        holding, held_cost = True, 0.0
+                    except BaseException as err:
+                        # Cancelled while queued: let the task see it, without a slot.
+                        error = err
+                started = time.thread_time()
+                try:
+                    if error is None:
+                        yielded = coro.send(value)
+                    else:
+                        yielded = coro.throw(error)
+                except StopIteration as stop:
+                    return stop.value
+                finally:
+                    elapsed = time.thread_time() - started
+                    held_cost += elapsed
+                    self.charge(account, elapsed)
+
+                if holding and yielded is None and self._waiting:
+                    # Queue before releasing, so the slot goes to the best of us and them.
+                    self.refill(account, time.time())
+                    fut = self._enqueue(account)
+                    self.release(account, held_cost)
+                    holding, held_cost = False, 0.0
+                    try:
+                        yield from self._wait_for(fut).__await__()
+                        holding, value, error = True, None, None
+                    except BaseException as err:
+                        value, error = None, err
+                    continue
+                if holding and yielded is not None:
+                    holding = False
+                    self.release(account, held_cost)
+                try:
+                    value, error = (yield yielded), None
+                except BaseException as err:
+                    value, error = None, err
+        finally:
+            if holding:
+                self.release(account, held_cost)
+            account.tasks += 1
+            coro.close()
+
+    def _dispatch(self):
+        while self._waiting and self.running < self.options["cpu_slots"]:
+            finish_tag, _, fut, start_tag = heapq.heappop(self._waiting)
+            if fut.done():
+                continue
+            self.running += 1
+            self.vtime = max(self.vtime, start_tag)
+            fut.set_result(None)
+
+    def report(self) -> List[OwnerAccount]:
+        now = time.time()
+        for account in self.accounts.values():
+            self.refill(account, now)
+        return sorted(self.accounts.values(), key=lambda x: x.used, reverse=True)
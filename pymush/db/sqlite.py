@@ -0,0 +1,290 @@
+import asyncio
+import time
+import rapidjson
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+import aiosqlite
+
+from mudrich.text import Text
+
+from .base import Database, GameObjectKey, QueryResult
+from .exceptions import DatabaseUnavailable
+
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS objects (
+        id TEXT PRIMARY KEY,
+        type_name TEXT NOT NULL,
+        name TEXT NOT NULL,
+        name_text TEXT NOT NULL,
+        created INTEGER NOT NULL,
+        modified INTEGER NOT NULL,
+        user TEXT NULL,
+        admin_level INTEGER NOT NULL DEFAULT 0,
+        quota_cost INTEGER NOT NULL DEFAULT 0,
+        userdata TEXT NULL,
+        dbid INTEGER NULL,
+        parent TEXT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS objects_type_name ON objects (type_name)",
+    "CREATE INDEX IF NOT EXISTS objects_name ON objects (name COLLATE NOCASE)",
+    """CREATE TABLE IF NOT EXISTS attributes (
+        holder TEXT NOT NULL REFERENCES objects (id) ON DELETE CASCADE,
+        name TEXT NOT NULL,
+        value TEXT NOT NULL,
+        PRIMARY KEY (holder, name)
+    ) WITHOUT ROWID""",
+]
+
+# Columns added to objects since it was first released, and added to older databases on open.
+ADDED_COLUMNS = (
+    ("dbid", "INTEGER NULL"),
+    ("parent", "TEXT NULL"),
+)
+
+PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    # WAL with synchronous=NORMAL only risks the last transactions on power loss, never corruption.
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+]
+
+# Every statement is a constant string, so sqlite3's per-connection statement cache always hits.
+OBJECT_COLUMNS = (
+    "id", "type_name", "name", "name_text", "created", "modified", "user", "admin_level", "quota_cost",
+    "userdata", "dbid", "parent",
+)
+SELECT_OBJECT = f"SELECT {', '.join(OBJECT_COLUMNS)} FROM objects WHERE id = ?"
+SELECT_OBJECTS = f"SELECT {', '.join(OBJECT_COLUMNS)} FROM objects WHERE id IN (%s)"
+LIST_OBJECTS = "SELECT rowid, id, created, dbid FROM objects WHERE rowid > ? ORDER BY rowid LIMIT ?"
+INSERT_OBJECT = f"INSERT INTO objects ({', '.join(OBJECT_COLUMNS)}) VALUES ({', '.join('?' * len(OBJECT_COLUMNS))})"
+SET_ATTRIBUTE = "INSERT OR REPLACE INTO attributes (holder, name, value) VALUES (?, ?, ?)"
+DELETE_ATTRIBUTE = "DELETE FROM attributes WHERE holder = ? AND name = ?"
+SELECT_ATTRIBUTES = "SELECT holder, name, value FROM attributes WHERE holder IN (%s)"
+UPDATABLE = frozenset(OBJECT_COLUMNS[2:])
+
+# SQLite's default limit on bound parameters is 999 in older builds.
+IN_CHUNK = 500
+
+
+class SQLiteDatabase(Database):
+    """
+    A Database that talks to SQLite through aiosqlite directly, skipping Tortoise's model
+    instantiation on the hot paths. Rows come back as tuples and are only turned into the dicts
+    GameObject expects at the edge. Bulk writes use executemany inside one transaction.
+
+    Configure with Config.database_engine = "sqlite" and database_config["path"].
+    """
+
+    ex_database_unavailable = DatabaseUnavailable
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.path = app.config.database_config.get("path", "db.sqlite3")
+        self.conn: Optional[aiosqlite.Connection] = None
+        self._write_lock = asyncio.Lock()
+
+    async def async_setup(self):
+        await super().async_setup()
+        self.conn = await aiosqlite.connect(
+            self.path, cached_statements=self.app.config.database_config.get("cached_statements", 256)
+        )
+        for pragma in PRAGMAS:
+            await self.conn.execute(pragma)
+        for statement in SCHEMA:
+            await self.conn.execute(statement)
+        await self.migrate()
+        await self.conn.commit()
+
+    async def migrate(self):
+        async with self.conn.execute("PRAGMA table_info(objects)") as cursor:
+            existing = {row[1] for row in await cursor.fetchall()}
+        for name, definition in ADDED_COLUMNS:
+            if name not in existing:
+                await self.conn.execute(f"ALTER TABLE objects ADD COLUMN {name} {definition}")
+
+    async def close(self):
+        if self.conn:
+            await self.conn.close()
+            self.conn = None
+
+    def _check(self):
+        if not self.conn:
+            raise DatabaseUnavailable("SQLite connection is not open")
+
+    @staticmethod
+    def make_key(uuid: str, created: int, dbid: Optional[int] = None) -> GameObjectKey:
+        return GameObjectKey(uuid=UUID(uuid), created=created, dbid=dbid)
+
+    @staticmethod
+    def unpack_object(row: Tuple) -> dict:
+        data = dict(zip(OBJECT_COLUMNS, row))
+        data["name_text"] = Text.deserialize(rapidjson.loads(data["name_text"]))
+        if data["userdata"] is not None:
+            data["userdata"] = rapidjson.loads(data["userdata"])
+        if data["user"] is not None:
+            data["user"] = UUID(data["user"])
+        if data["parent"] is not None:
+            data["parent"] = UUID(data["parent"])
+        return data
+
+    @staticmethod
+    def pack_field(name: str, value: Any) -> Any:
+        if name == "name_text":
+            if isinstance(value, str):
+                value = Text(value)
+            return rapidjson.dumps(value.serialize())
+        if name == "userdata":
+            return None if value is None else rapidjson.dumps(value)
+        if name in ("user", "parent"):
+            return None if value is None else str(value)
+        return value
+
+    async def get_object(self, key: GameObjectKey) -> QueryResult:
+        self._check()
+        async with self.conn.execute(SELECT_OBJECT, (str(key.uuid),)) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return QueryResult(error="Object does not exist")
+        return QueryResult(data=self.unpack_object(row))
+
+    async def get_objects(self, keys: Iterable[GameObjectKey]) -> QueryResult:
+        self._check()
+        ids = [str(key.uuid) for key in keys]
+        out: Dict[UUID, dict] = dict()
+        for i in range(0, len(ids), IN_CHUNK):
+            chunk = ids[i:i + IN_CHUNK]
+            async with self.conn.execute(SELECT_OBJECTS % ",".join("?" * len(chunk)), chunk) as cursor:
+                for row in await cursor.fetchall():
+                    data = self.unpack_object(row)
+                    out[UUID(data["id"])] = data
+        return QueryResult(data=out)
+
+    async def list_objects(self, after: int = 0, limit: int = -1) -> QueryResult:
+        """
+        Returns up to limit (position, key) pairs in creation order, starting after the given
+        position. Pages seek straight to where the last one ended, so walking the whole table
+        costs the same per page however deep into it the walk is.
+        """
+        self._check()
+        async with self.conn.execute(LIST_OBJECTS, (after, limit)) as cursor:
+            rows = await cursor.fetchall()
+        return QueryResult(data=[(rowid, self.make_key(*row)) for rowid, *row in rows])
+
+    async def create_object(self, type_name: str, name: Text, **kwargs) -> QueryResult:
+        self._check()
+        if isinstance(name, str):
+            name = Text(name)
+        now = int(time.time())
+        data = {
+            "id": str(uuid4()),
+            "type_name": type_name,
+            "name": name.plain,
+            "name_text": name,
+            "created": now,
+            "modified": now,
+            "user": kwargs.get("user", None),
+            "admin_level": kwargs.get("admin_level", 0),
+            "quota_cost": kwargs.get("quota_cost", 0),
+            "userdata": kwargs.get("userdata", None),
+            "dbid": kwargs.get("dbid", None),
+            "parent": kwargs.get("parent", None),
+        }
+        row = tuple(self.pack_field(col, data[col]) for col in OBJECT_COLUMNS)
+        async with self._write_lock:
+            await self.conn.execute(INSERT_OBJECT, row)
+            await self.conn.commit()
+        return QueryResult(data=self.make_key(data["id"], now, data["dbid"]))
+
+    async def update_object(self, key: GameObjectKey, **kwargs) -> QueryResult:
+        return await self.write_batch(objects={key: kwargs}, attributes=dict())
+
+    async def write_batch(
+        self,
+        objects: Dict[GameObjectKey, Dict[str, Any]],
+        attributes: Dict[GameObjectKey, Dict[str, Optional[dict]]],
+    ) -> QueryResult:
+        """
+        Applies a batch of object field changes and attribute sets/deletes in one transaction.
+        Statements are grouped so that each distinct shape runs as one executemany.
+        """
+        self._check()
+        now = int(time.time())
+        updates: Dict[Tuple[str, ...], List[tuple]] = dict()
+        for key, fields in objects.items():
+            fields = {k: v for k, v in fields.items() if k in UPDATABLE}
+            if "name_text" in fields and "name" not in fields:
+                fields["name"] = fields["name_text"].plain if isinstance(fields["name_text"], Text) else str(fields["name_text"])
+            fields["modified"] = now
+            columns = tuple(sorted(fields.keys()))
+            updates.setdefault(columns, list()).append(
+                tuple(self.pack_field(col, fields[col]) for col in columns) + (str(key.uuid),)
+            )
+
+        sets, deletes = list(), list()
+        for key, changes in attributes.items():
+            holder = str(key.uuid)
+            for name, value in changes.items():
+                if value is None:
+                    deletes.append((holder, name))
+                else:
+                    sets.append((holder, name, rapidjson.dumps(value)))
+
+        async with self._write_lock:
+            try:
+                await self.conn.execute("BEGIN")
+                for columns, rows in updates.items():
+                    statement = f"UPDATE objects SET {', '.join(f'{c} = ?' for c in columns)} WHERE id = ?"
+                    await self.conn.executemany(statement, rows)
+                if sets:
+                    await self.conn.executemany(SET_ATTRIBUTE, sets)
+                if deletes:
+                    await self.conn.executemany(DELETE_ATTRIBUTE, deletes)
+                await self.conn.commit()
+            except Exception as err:
+                await self.conn.rollback()
+                return QueryResult(error=str(err))
+        return QueryResult(data=len(objects) + len(attributes))
+
+    async def get_attributes(self, key: GameObjectKey) -> QueryResult:
+        self._check()
+        async with self.conn.execute(
+            "SELECT name, value FROM attributes WHERE holder = ?", (str(key.uuid),)
+        ) as cursor:
+            rows = await cursor.fetchall()
+        return QueryResult(data={name: rapidjson.loads(value) for name, value in rows})
+
+    async def get_attributes_many(self, keys: Iterable[GameObjectKey]) -> QueryResult:
+        """
+        Returns {uuid: {name: value}} for every key. Objects without attributes get an empty dict.
+        """
+        self._check()
+        keys = list(keys)
+        ids = [str(key.uuid) for key in keys]
+        out: Dict[UUID, dict] = {key.uuid: dict() for key in keys}
+        for i in range(0, len(ids), IN_CHUNK):
+            chunk = ids[i:i + IN_CHUNK]
+            async with self.conn.execute(SELECT_ATTRIBUTES % ",".join("?" * len(chunk)), chunk) as cursor:
+                for holder, name, value in await cursor.fetchall():
+                    out[UUID(holder)][name] = rapidjson.loads(value)
+        return QueryResult(data=out)
+
+    async def list_users(self, name: Optional[str] = None) -> QueryResult:
+        self._check()
+        if name is None:
+            statement, args = "SELECT id, created, dbid FROM objects WHERE type_name = 'USER'", ()
+        else:
+            statement = "SELECT id, created, dbid FROM objects WHERE type_name = 'USER' AND name = ? COLLATE NOCASE"
+            args = (name,)
+        async with self.conn.execute(statement, args) as cursor:
+            rows = await cursor.fetchall()
+        return QueryResult(data=[self.make_key(*row) for row in rows])
+
+    async def get_user(self, key: GameObjectKey) -> QueryResult:
+        return await self.get_object(key)
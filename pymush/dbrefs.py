@@ -0,0 +1,75 @@
+import heapq
+
+from array import array
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from pymush.db.base import GameObjectKey
+
+
+class DbrefTable:
+    """
+    Dense table from integer dbref to object uuid, so #123 resolves by indexing a list. Each slot
+    also carries the created timestamp of its occupant, which is what an objid (#123:456)
+    checks against - a recycled dbref never matches an old objid.
+
+    Dbrefs are given explicitly (as when restoring a snapshot) or come from the object's key when
+    it has one. Otherwise the lowest free slot is reused, as MUSHes traditionally do.
+    """
+
+    def __init__(self):
+        self.slots: List[Optional[Any]] = list()
+        self.stamps = array("q")
+        self.by_uuid: Dict[Any, int] = dict()
+        self.free: List[int] = list()
+
+    def __len__(self):
+        return len(self.by_uuid)
+
+    def _grow(self, dbid: int):
+        while len(self.slots) <= dbid:
+            heapq.heappush(self.free, len(self.slots))
+            self.slots.append(None)
+            self.stamps.append(0)
+
+    def assign(self, key: "GameObjectKey", dbid: Optional[int] = None) -> int:
+        if (found := self.by_uuid.get(key.uuid, None)) is not None:
+            return found
+        if dbid is None:
+            dbid = getattr(key, "dbid", None)
+        if dbid is None or (dbid < len(self.slots) and self.slots[dbid] is not None):
+            while self.free and self.slots[self.free[0]] is not None:
+                heapq.heappop(self.free)
+            dbid = heapq.heappop(self.free) if self.free else len(self.slots)
+        self._grow(dbid)
+        self.slots[dbid] = key.uuid
+        self.stamps[dbid] = int(getattr(key, "created", 0) or 0)
+        self.by_uuid[key.uuid] = dbid
+        return dbid
+
+    def release(self, uuid) -> Optional[int]:
+        if (dbid := self.by_uuid.pop(uuid, None)) is None:
+            return None
+        self.slots[dbid] = None
+        self.stamps[dbid] = 0
+        heapq.heappush(self.free, dbid)
+        return dbid
+
+    def dbid_of(self, uuid) -> Optional[int]:
+        return self.by_uuid.get(uuid, None)
+
+    def lookup(self, dbid: int, created: Optional[int] = None) -> Tuple[Optional[Any], Optional[str]]:
+        """
+        Returns (uuid, None) or (None, error).
+        """
+        if dbid < 0 or dbid >= len(self.slots) or (uuid := self.slots[dbid]) is None:
+            return None, "Dbref Not Found!"
+        if created is not None and created != self.stamps[dbid]:
+            return None, "Objid not found!"
+        return uuid, None
+
+    def clear(self):
+        self.slots.clear()
+        self.stamps = array("q")
+        self.by_uuid.clear()
+        self.free.clear()
@@ -0,0 +1,118 @@
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Set
+
+
+class DisplayNameCache:
+    """
+    What each viewer calls each target - its dub for them if it has one, its keyphrase otherwise -
+    as computed by viewer.get_dub_or_keyphrase_for(target). A say in a crowded room needs every
+    listener's name for the speaker, and a look sorts contents on the viewer's names for them,
+    so the same answers are wanted over and over until a dub or a name changes.
+
+    set_sub drops one viewer's entry for one target. A rename drops every viewer's entry for the
+    renamed object, found through the by_target reverse index.
+
+    When the display_name_cache_size option is non-zero, the least recently active viewers have
+    all their entries evicted to keep the total within it.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.names: OrderedDict[Any, Dict[Any, str]] = OrderedDict()
+        self.by_target: Dict[Any, Set[Any]] = dict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @property
+    def size_limit(self) -> int:
+        return self.game.options["display_name_cache_size"]
+
+    def __len__(self):
+        return self.size
+
+    def name_for(self, viewer: "GameObject", target: "GameObject") -> str:
+        if (seen := self.names.get(viewer.uuid, None)) is not None:
+            self.names.move_to_end(viewer.uuid)
+            if (found := seen.get(target.uuid, None)) is not None:
+                self.hits += 1
+                return found
+        else:
+            seen = self.names[viewer.uuid] = dict()
+        self.misses += 1
+        found = viewer.get_dub_or_keyphrase_for(target)
+        seen[target.uuid] = found
+        self.size += 1
+        self.by_target.setdefault(target.uuid, set()).add(viewer.uuid)
+        self.evict()
+        return found
+
+    def names_for(self, viewer: "GameObject", targets: Iterable["GameObject"]) -> List[str]:
+        """
+        The viewer's names for each of targets, in order.
+        """
+        return [self.name_for(viewer, target) for target in targets]
+
+    def seen_as(self, target: "GameObject", viewers: Iterable["GameObject"]) -> Dict["GameObject", str]:
+        """
+        What each of viewers calls target, as a broadcast from target needs.
+        """
+        return {viewer: self.name_for(viewer, target) for viewer in viewers}
+
+    def changed_dub(self, viewer, target):
+        if (seen := self.names.get(viewer.uuid, None)) is not None:
+            if seen.pop(target.uuid, None) is not None:
+                self.size -= 1
+                self.invalidations += 1
+        if (viewers := self.by_target.get(target.uuid, None)) is not None:
+            viewers.discard(viewer.uuid)
+
+    def renamed(self, uuid):
+        for viewer in self.by_target.pop(uuid, ()):
+            if (seen := self.names.get(viewer, None)) is not None and seen.pop(uuid, None) is not None:
+                self.size -= 1
+                self.invalidations += 1
+
+    def forget_viewer(self, uuid) -> int:
+        """
+        Drops every entry held for one viewer. Returns how many there were.
+        """
+        seen = self.names.pop(uuid, dict())
+        for target in seen.keys():
+            if (viewers := self.by_target.get(target, None)) is not None:
+                viewers.discard(uuid)
+                if not viewers:
+                    del self.by_target[target]
+        self.size -= len(seen)
+        return len(seen)
+
+    def discard(self, uuid):
+        """
+        Forgets a destroyed object, as both viewer and target.
+        """
+        self.renamed(uuid)
+        self.forget_viewer(uuid)
+
+    def evict(self):
+        if not (limit := self.size_limit):
+            return
+        while self.size > limit and self.names:
+            self.evictions += self.forget_viewer(next(iter(self.names)))
+
+    def clear(self):
+        self.names.clear()
+        self.by_target.clear()
+        self.size = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self),
+            "limit": self.size_limit,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions + self.invalidations,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
@@ -1,6 +1,7 @@
 import asyncio
 import time
 import weakref
+from dataclasses import replace
 from uuid import UUID
 from typing import Optional, Iterable, Union, Dict
 from collections import OrderedDict, defaultdict
@@ -15,6 +16,23 @@ from athanor.utils import import_from_module
 from athanor.utils import partial_match
 
 from .utils.misc import callables_from_module
+from .scheduler import DeadlineScheduler
+from .semaphore import SemaphoreManager
+from .cpu import CpuScheduler
+from .offload import OffloadPool
+from .stats import StatsManager
+from .cache import ObjectCache
+from .registry import ObjectRegistry
+from .writeback import WriteBehind
+from .snapshot import SnapshotManager
+from .names import NameIndex
+from .inheritance import InheritanceIndex
+from .keywords import KeywordIndex
+from .perception import VisibilityCache
+from .displaynames import DisplayNameCache
+from .broadcast import Broadcaster
+from .attributes import AttributeManager
+from .attrcache import AttributeLoader
 from .db.base import GameObjectKey, QueryResult
 from .db.exceptions import DatabaseUnavailable
 from .objects.base import GameObject
@@ -35,12 +53,29 @@ class GameService(Service):
         self.in_events: Optional[asyncio.Queue] = None
         self.out_events: Optional[asyncio.Queue] = None
         self.users: Dict[UUID, dict] = dict()
-        self.objects: Dict[UUID, dict] = dict()
+        self.objects: ObjectRegistry = ObjectRegistry(self.make_object)
         self.crypt_con = CryptContext(schemes=["argon2"])
         self.command_matchers = dict()
         self.option_classes = dict()
         self.functions = dict()
         self.update_subscribers = weakref.WeakSet()
+        self.scheduler = DeadlineScheduler()
+        self.semaphores = SemaphoreManager(self)
+        self.cpu = CpuScheduler(self)
+        self.offload = OffloadPool(self)
+        self.lua_pool = None
+        self.stats = StatsManager(self)
+        self.object_cache = ObjectCache(self)
+        self.writeback = WriteBehind(self)
+        self.snapshot = SnapshotManager(self)
+        self.names = NameIndex(self)
+        self.inheritance = InheritanceIndex(self)
+        self.keywords = KeywordIndex(self)
+        self.visibility = VisibilityCache(self)
+        self.display_names = DisplayNameCache(self)
+        self.broadcaster = Broadcaster(self)
+        self.attribute_manager = AttributeManager(self)
+        self.attribute_loader = AttributeLoader(self)
         self.options = app.config.game_options
         self.queue = None
         self.loaded = False
@@ -55,6 +90,7 @@ class GameService(Service):
 
     def setup(self):
         super().setup()
+        self.lua_pool = self.app.classes["game"]["luapool"](self)
 
         for k, v in self.app.config.command_matchers.items():
             match_list = list()
@@ -99,25 +135,98 @@ class GameService(Service):
         result = await self.db.create_object(type_name, name, **kwargs)
         if result.error:
             return result
+        key = self.index_key(result.data)
+        if self.names.built:
+            plain = name.plain if isinstance(name, Text) else name
+            self.names.add(key.uuid, {"name": plain, "type_name": type_name})
+        self.snapshot.journal_create(key, key.dbid)
         if register:
-            await self.register_object(result.data)
-        return result
+            await self.register_object(key)
+        return QueryResult(data=key)
+
+    def unregister_object(self, key: GameObjectKey):
+        """
+        Forgets a destroyed object, freeing its dbref for reuse.
+        """
+        if (obj := self.objects.pop(key.uuid, None)) is not None:
+            obj.stop()
+        self.names.remove(key.uuid)
+        self.inheritance.remove(key.uuid)
+        self.keywords.discard(key.uuid)
+        self.visibility.bump()
+        self.display_names.discard(key.uuid)
+        self.attribute_loader.discard(key.uuid)
+        self.object_cache.invalidate(key)
+
+    def make_object(self, key: GameObjectKey) -> GameObject:
+        return self.app.classes['game']['gameobject'](self, key)
 
     async def register_object(self, key: GameObjectKey):
-        obj_class = self.app.classes['game']['gameobject']
-        obj = obj_class(self, key)
+        obj = self.make_object(key)
         self.objects[key.uuid] = obj
         obj.start()
 
+    def index_key(self, key: GameObjectKey, dbid: Optional[int] = None) -> GameObjectKey:
+        """
+        Adds key to the registry and returns the key as registered. If it ends up with a
+        different dbref than the database has for it - it had none yet, or its slot was taken -
+        the registry gets a copy of the key carrying the new one, and it is written back, so
+        that it keeps its dbref across restarts and snapshots.
+        """
+        if (assigned := self.objects.add_key(key, dbid)) != getattr(key, "dbid", None):
+            key = replace(key, dbid=assigned)
+            self.objects.add_key(key)
+            self.writeback.mark(key, dbid=assigned)
+        return key
+
+    async def stream_object_keys(self, page_size: int):
+        """
+        Yields every object key in the database, a page at a time. Each page asks for what comes
+        after the last position seen, rather than skipping an ever-growing offset.
+        """
+        position = 0
+        while True:
+            results = await self.db.list_objects(after=position, limit=page_size)
+            if results.error:
+                raise DatabaseUnavailable(results.error)
+            for position, key in results.data:
+                yield key
+            if len(results.data) < page_size:
+                break
+
     async def load_game(self):
+        """
+        Indexes every object's key. GameObject wrappers are only built, and started, when
+        something first looks them up.
+        """
         try:
-            obj_class = self.app.classes['game']['gameobject']
-            results = await self.db.list_objects()
-            if results.data:
-                for key in results.data:
-                    self.objects[key.uuid] = obj_class(self, key)
-                for obj in self.objects.values():
-                    obj.start()
+            timings = list()
+            phase = time.perf_counter()
+            if (keys := self.snapshot.boot()) is not None:
+                # Restore recorded dbrefs first, so objects without one can't take their slots.
+                keys.sort(key=lambda x: x[0] is None)
+                for dbid, key in keys:
+                    self.index_key(key, dbid)
+                timings.append(("map snapshot and replay journal", time.perf_counter() - phase))
+            else:
+                unnumbered = list()
+                async for key in self.stream_object_keys(self.options["load_page_size"]):
+                    if getattr(key, "dbid", None) is None:
+                        unnumbered.append(key)
+                    else:
+                        self.index_key(key)
+                # Likewise, only once every stored dbref has its slot back.
+                for key in unnumbered:
+                    self.index_key(key)
+                timings.append(("index keys from database", time.perf_counter() - phase))
+
+            phase = time.perf_counter()
+            for uuid in self.options["load_eager"]:
+                self.objects.get(uuid)
+            timings.append(("start eager objects", time.perf_counter() - phase))
+
+            self.stats.record_load(len(self.objects), timings)
+            self.snapshot.schedule()
         except Exception as e:
             for obj in self.objects.values():
                 obj.stop()
@@ -125,9 +234,19 @@ class GameService(Service):
             raise e
 
     async def unload_game(self):
+        await self.writeback.flush()
+        self.snapshot.close()
         for obj in self.objects.values():
             obj.stop()
         self.objects.clear()
+        self.names = NameIndex(self)
+        self.inheritance = InheritanceIndex(self)
+        self.keywords.clear()
+        self.visibility.bump()
+        self.display_names.clear()
+        self.attribute_loader.clear()
+        self.object_cache.clear()
+        self.offload.stop()
 
     def locate_dbref(self, text):
         if not text.startswith("#"):
@@ -148,17 +267,7 @@ class GameService(Service):
             return None, "Invalid dbref or objid format!"
 
         if dbid >= 0:
-            found = self.objects.get(dbid, None)
-            if found:
-                if secs is not None:
-                    if secs == int(found.created):
-                        return found, None
-                    else:
-                        return None, "Objid not found!"
-                else:
-                    return found, None
-            else:
-                return None, "Dbref Not Found!"
+            return self.objects.by_dbref(dbid, secs)
         else:
             return None, "Invalid dbref!"
 
@@ -178,13 +287,17 @@ class GameService(Service):
             name = name.plain
 
         if candidates is None:
-            candidates = [obj.key for obj in self.objects.values()]
-
-        search_candidates = list()
-        for can in candidates:
-            results = await self.db.get_object(can)
-            if results.data:
-                search_candidates.append((can, results.data))
+            # The whole world: go through the name index rather than every row.
+            await self.names.ensure_built()
+            if (found := self.names.search(name, exact=exact, limit=1)):
+                key = self.objects.keys[found[0]]
+                if (row := await self.object_cache.get(key)) is not None:
+                    return (key, row), None
+            return None, f"Sorry, nothing matches: {name}"
+
+        candidates = list(candidates)
+        rows = await self.object_cache.get_many(candidates)
+        search_candidates = [(can, rows[can.uuid]) for can in candidates if can.uuid in rows]
 
         name_lower = name.strip().lower()
         if exact:
@@ -209,9 +322,18 @@ class GameService(Service):
         await connection.join_session(sess)
 
     def update(self, now: float, delta: float):
+        self.scheduler.update(now)
         for obj in self.update_subscribers:
             obj.update(now, delta)
 
+    def cache_stats(self):
+        return [
+            ("objects", self.object_cache.stats()),
+            ("attributes", self.attribute_loader.stats()),
+            ("perception", self.visibility.stats()),
+            ("display names", self.display_names.stats()),
+        ]
+
     def get_start_location(self, type_name: str):
         o = self.app.config.game_options
         type_start = o["type_start"].get(type_name, o.get("default_start", 0))
@@ -223,12 +345,17 @@ class GameService(Service):
         if isinstance(check, GameObject):
             return check
         elif isinstance(check, int):
-            return self.objects.get(check, None)
-        elif isinstance(check, str):
-            return self.db_objects.get(check, None)
-        elif isinstance(check, Text):
+            return self.objects.by_dbref(check)[0]
+        if isinstance(check, Text):
             check = check.plain
-            return self.db_objects.get(check, None)
+        if isinstance(check, str):
+            check = check.strip()
+            if check.startswith("#"):
+                return self.locate_dbref(check)[0]
+            if check.isdigit():
+                return self.objects.by_dbref(int(check))[0]
+            if self.names.built and len(found := self.names.exact(check, limit=2)) == 1:
+                return self.objects.get(found[0])
 
     def alevel_of(self, type_name: str):
         if type_name in self.app.config.game_options["type_alevel"]:
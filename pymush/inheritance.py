@@ -0,0 +1,126 @@
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+
+class InheritanceIndex:
+    """
+    Parent links between objects, in both directions. The reverse (children) index lets a change
+    on one object reach exactly the descendants whose resolved attribute caches depend on it,
+    rather than every object in the game.
+
+    Links are read from the 'parent' field of each object's row the first time its chain is
+    needed, and kept current by GameObject.set_parent after that.
+    """
+
+    # Parent chains deeper than this are treated as broken; it also guards against cycles.
+    max_depth = 20
+
+    def __init__(self, game):
+        self.game = game
+        self.parents: Dict[Any, Any] = dict()
+        self.children: Dict[Any, Set[Any]] = defaultdict(set)
+        # Objects whose parent link has been read from their row.
+        self.known: Set[Any] = set()
+
+    def parent_of(self, uuid) -> Optional[Any]:
+        return self.parents.get(uuid, None)
+
+    def ancestors(self, uuid) -> List[Any]:
+        out = list()
+        while (uuid := self.parents.get(uuid, None)) is not None and len(out) < self.max_depth:
+            if uuid in out:
+                break
+            out.append(uuid)
+        return out
+
+    def descendants(self, uuid) -> Iterable[Any]:
+        seen = set()
+        pending = list(self.children.get(uuid, ()))
+        while pending:
+            child = pending.pop()
+            if child in seen:
+                continue
+            seen.add(child)
+            yield child
+            pending.extend(self.children.get(child, ()))
+
+    async def load_chain(self, uuid):
+        """
+        Makes sure the links from uuid up to its root are known.
+        """
+        depth = 0
+        while uuid is not None and uuid not in self.known and depth < self.max_depth:
+            if (key := self.game.objects.keys.get(uuid, None)) is None:
+                break
+            row = await self.game.object_cache.get(key)
+            self.known.add(uuid)
+            parent = row.get("parent", None) if row else None
+            if parent is not None and parent in self.game.objects and not self.would_loop(uuid, parent):
+                self._link(uuid, parent)
+                # Anything resolved below here before the link was known may be wrong.
+                self.invalidate(uuid)
+            uuid = parent
+            depth += 1
+
+    def would_loop(self, uuid, parent) -> bool:
+        return parent == uuid or uuid in self.ancestors(parent)
+
+    def set_parent(self, uuid, parent: Optional[Any]):
+        """
+        Links uuid to parent (or unlinks it, for None). Everything below uuid loses its resolved
+        attributes, since any of them may now come from somewhere else.
+        """
+        self._link(uuid, parent)
+        self.known.add(uuid)
+        self.invalidate(uuid)
+
+    def _link(self, uuid, parent: Optional[Any]):
+        if (old := self.parents.pop(uuid, None)) is not None:
+            if (siblings := self.children.get(old, None)) is not None:
+                siblings.discard(uuid)
+                if not siblings:
+                    del self.children[old]
+        if parent is not None:
+            self.parents[uuid] = parent
+            self.children[parent].add(uuid)
+
+    def remove(self, uuid):
+        """
+        Forgets a destroyed object. Its children are left without a parent.
+        """
+        for child in list(self.children.get(uuid, ())):
+            self.set_parent(child, None)
+        self.set_parent(uuid, None)
+        self.children.pop(uuid, None)
+        self.known.discard(uuid)
+
+    def _handlers(self, uuids: Iterable[Any]):
+        loaded = self.game.objects.loaded
+        for uuid in uuids:
+            if (obj := loaded.get(uuid, None)) is None:
+                continue
+            if (handler := getattr(obj, "attributes", None)) is not None:
+                yield handler
+
+    def invalidate(self, uuid):
+        for handler in self._handlers([uuid, *self.descendants(uuid)]):
+            handler.resolved.clear()
+
+    def attribute_changed(self, uuid, attr_id: int):
+        """
+        An attribute was set or removed on uuid; descendants that resolved it must look again.
+        """
+        if uuid not in self.children:
+            return
+        for handler in self._handlers(self.descendants(uuid)):
+            handler.resolved.pop(attr_id, None)
+
+    def attributes_loaded(self, uuid):
+        """
+        uuid's attributes were read in or dropped. Descendants that resolved against it while it
+        held something else must look again.
+        """
+        if uuid not in self.children:
+            return
+        for handler in self._handlers(self.descendants(uuid)):
+            handler.resolved.clear()
@@ -0,0 +1,158 @@
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from pymush.names import NameIndex
+
+
+# Words too common to be worth matching on their own.
+SIMPLE_WORDS = frozenset(("the", "of", "an", "a", "or", "and"))
+
+
+class LocationKeywords:
+    """
+    The names, aliases and name words of everything in one location, each mapped to the
+    occupants that have it. Key lists are sorted on demand so a partial name is a bisect.
+    """
+
+    __slots__ = ["entries", "names", "words", "_name_keys", "_word_keys"]
+
+    def __init__(self):
+        self.entries: Dict[Any, Tuple[List[str], List[str]]] = dict()
+        self.names: Dict[str, Set[Any]] = dict()
+        self.words: Dict[str, Set[Any]] = dict()
+        self._name_keys: Optional[List[str]] = None
+        self._word_keys: Optional[List[str]] = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, uuid):
+        return uuid in self.entries
+
+    def add(self, uuid, whole: Iterable[str], words: Iterable[str]):
+        if uuid in self.entries:
+            self.remove(uuid)
+        whole = list(whole)
+        words = [w for w in words if w not in SIMPLE_WORDS]
+        for name in whole:
+            self.names.setdefault(name, set()).add(uuid)
+        for word in words:
+            self.words.setdefault(word, set()).add(uuid)
+        self.entries[uuid] = (whole, words)
+        self._name_keys = self._word_keys = None
+
+    def remove(self, uuid):
+        if (entry := self.entries.pop(uuid, None)) is None:
+            return
+        whole, words = entry
+        for index, keys in ((self.names, whole), (self.words, words)):
+            for key in keys:
+                if (found := index.get(key, None)) is not None:
+                    found.discard(uuid)
+                    if not found:
+                        del index[key]
+        self._name_keys = self._word_keys = None
+
+    @staticmethod
+    def _partial(text: str, index: Dict[str, Set[Any]], keys: List[str]) -> List[Tuple[str, Set[Any]]]:
+        """
+        Every key starting with text, with its occupants, shortest key first as partial_match
+        would try them. An exact key is the shortest possible, so it comes first when present.
+        """
+        out = list()
+        i = bisect_left(keys, text)
+        while i < len(keys) and keys[i].startswith(text):
+            out.append((keys[i], index[keys[i]]))
+            i += 1
+        out.sort(key=lambda x: len(x[0]))
+        return out
+
+    def match(self, text: str, exact: bool = False, quoted: bool = False) -> List[Tuple[str, Set[Any]]]:
+        """
+        Mirrors locate_object's matching: an exact full name, a partial full name when the
+        search was quoted, and a partial keyword otherwise. Returns every candidate key with its
+        occupants, in the order they should be tried, since the viewer may not be able to use
+        the occupants of the first.
+        """
+        if exact:
+            return [(text, found)] if (found := self.names.get(text, None)) else list()
+        if quoted:
+            if self._name_keys is None:
+                self._name_keys = sorted(self.names.keys())
+            return self._partial(text, self.names, self._name_keys)
+        if self._word_keys is None:
+            self._word_keys = sorted(self.words.keys())
+        return self._partial(text, self.words, self._word_keys)
+
+
+class KeywordIndex:
+    """
+    A LocationKeywords for every location something has searched, so that locate_object looks up
+    a name rather than rebuilding keyword tables from every occupant on every call.
+
+    A location's index is built from its contents the first time it is searched, and kept
+    current by GameObject.move_to and renames after that.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.locations: Dict[Any, LocationKeywords] = dict()
+        # Which indexed location each indexed object is in.
+        self.where: Dict[Any, Any] = dict()
+        self.builds = 0
+
+    async def get(self, location: "GameObject") -> LocationKeywords:
+        if (found := self.locations.get(location.uuid, None)) is not None:
+            return found
+        index = LocationKeywords()
+        tried: Set[Any] = set()
+        # Anything that moves in while rows are being read isn't in the first list, and moved()
+        # can't add it to an index that doesn't exist yet, so go round until nothing is new.
+        while (occupants := [x for x in location.contents if x.uuid not in tried]) :
+            tried.update(x.uuid for x in occupants)
+            rows = await self.game.object_cache.get_many([x.key for x in occupants])
+            # Another task may have built it while the rows were being read.
+            if (found := self.locations.get(location.uuid, None)) is not None:
+                return found
+            for obj in occupants:
+                if (row := rows.get(obj.uuid, None)) is not None:
+                    index.add(obj.uuid, *NameIndex.identifiers(row))
+        # And anything that left meanwhile shouldn't be there.
+        for uuid in set(index.entries.keys()).difference(x.uuid for x in location.contents):
+            index.remove(uuid)
+        for uuid in index.entries.keys():
+            self.where[uuid] = location.uuid
+        self.locations[location.uuid] = index
+        self.builds += 1
+        return index
+
+    async def moved(self, obj: "GameObject", destination: Optional["GameObject"]):
+        if (old := self.where.pop(obj.uuid, None)) is not None:
+            if (index := self.locations.get(old, None)) is not None:
+                index.remove(obj.uuid)
+        if destination is None or (index := self.locations.get(destination.uuid, None)) is None:
+            return
+        if (row := await self.game.object_cache.get(obj.key)) is None:
+            return
+        index.add(obj.uuid, *NameIndex.identifiers(row))
+        self.where[obj.uuid] = destination.uuid
+
+    def renamed(self, uuid, row: dict):
+        if (where := self.where.get(uuid, None)) is not None:
+            if (index := self.locations.get(where, None)) is not None:
+                index.add(uuid, *NameIndex.identifiers(row))
+
+    def discard(self, uuid):
+        """
+        Forgets a destroyed object, both as an occupant and as a location.
+        """
+        if (where := self.where.pop(uuid, None)) is not None:
+            if (index := self.locations.get(where, None)) is not None:
+                index.remove(uuid)
+        if (index := self.locations.pop(uuid, None)) is not None:
+            for occupant in index.entries.keys():
+                self.where.pop(occupant, None)
+
+    def clear(self):
+        self.locations.clear()
+        self.where.clear()
@@ -2,8 +2,10 @@ import sys
 import time
 import traceback
 import asyncio
+import hashlib
 
-from typing import Optional, Set, Tuple, Union
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple, Union, List
 
 from asynclupa import AsyncLuaRuntime
 
@@ -16,29 +18,219 @@ from .commands.base import CommandException
 from pymush.utils import formatter as fmt
 
 from pymush.task import BreakTaskException, CPUTimeExceeded, BaseTask
+from pymush.offload import run_lua_job
+from pymush.attributes import AttributeRequest, AttributeRequestType
+
+
+class PooledLuaRuntime:
+    """
+    A Lua runtime that is set up once and lent out to one LuaTask at a time. It keeps its own LRU
+    of compiled chunks, since Lua functions can't be shared between runtimes.
+    """
+
+    # Main chunks have _ENV as their first upvalue. Rebinding it lets a cached chunk run against
+    # a different task's globals without being recompiled.
+    bind_call = """function(chunk, env) debug.setupvalue(chunk, 1, env) return chunk end"""
+
+    def __init__(self, pool: "LuaRuntimePool"):
+        self.pool = pool
+        self.runtime = AsyncLuaRuntime()
+        self.globals = {k: v for k, v in self.runtime.globals().items()}
+        self.loader = self.globals["load"]
+        self.chunks = OrderedDict()
+        self.hook_factory = None
+        self.api_factory = None
+        self.bind = None
+
+    async def setup(self, hook_call: str, api_call: str):
+        self.hook_factory = await self.runtime.eval(hook_call)
+        self.api_factory = await self.runtime.eval(api_call)
+        self.bind = await self.runtime.eval(self.bind_call)
+
+    def compile(self, code: str, name: str, env):
+        key = hashlib.blake2b(code.encode("utf-8"), digest_size=16).digest()
+        if (chunk := self.chunks.get(key, None)) is not None:
+            self.chunks.move_to_end(key)
+            self.pool.chunk_hits += 1
+            return self.bind(chunk, env)
+        self.pool.chunk_misses += 1
+        chunk = self.loader(code, name, "t", env)
+        if chunk is None:
+            return None
+        self.chunks[key] = chunk
+        if len(self.chunks) > self.pool.chunk_cache_size:
+            self.chunks.popitem(last=False)
+        return chunk
+
+    def lend(self, task: "LuaTask"):
+        lua_globals = self.runtime.globals()
+        lua_globals["sanity_check"] = task.sanity_check
+        lua_globals["yield_slice"] = task.yield_slice
+        lua_globals["await"] = self.globals["python"]["await"]
+
+    def reset(self):
+        """
+        Called when a task is done with this runtime. Scripts run with the task as their _ENV, so
+        only the per-task hooks need clearing.
+        """
+        self.globals["debug"].sethook()
+        lua_globals = self.runtime.globals()
+        lua_globals["sanity_check"] = None
+        lua_globals["yield_slice"] = None
+        lua_globals["await"] = None
+
+
+class LuaRuntimePool:
+    """
+    Pre-initialized Lua runtimes for LuaTask, so a short script doesn't pay for creating and
+    configuring a runtime each time it runs.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.idle: List[PooledLuaRuntime] = list()
+        self.created = 0
+        self.reused = 0
+        self.chunk_hits = 0
+        self.chunk_misses = 0
+
+    @property
+    def max_idle(self) -> int:
+        return self.game.options["lua_pool_size"]
+
+    @property
+    def chunk_cache_size(self) -> int:
+        return self.game.options["lua_chunk_cache_size"]
+
+    async def acquire(self, task: "LuaTask") -> PooledLuaRuntime:
+        if self.idle:
+            pooled = self.idle.pop()
+            self.reused += 1
+        else:
+            pooled = PooledLuaRuntime(self)
+            await pooled.setup(task.hook_call, task.api_call)
+            self.created += 1
+        pooled.lend(task)
+        return pooled
+
+    def release(self, pooled: PooledLuaRuntime):
+        pooled.reset()
+        if len(self.idle) < self.max_idle:
+            self.idle.append(pooled)
 
 
 class LuaTask(BaseTask):
     allowed_globals = ('assert', 'error', 'ipairs', 'next', 'pairs', 'pcall', 'select', 'tonumber', 'tostring', 'type',
                        'unpack', '_VERSION', 'xpcall')
-    protected_globals = ('sanity_check', 'await')
-    sanity_call = """function() await(sanity_check()) end"""
+    protected_globals = ('sanity_check', 'yield_slice', 'await', 'game', 'registers')
+    # Builds a count-only debug hook. The instruction budget is tallied inside Lua, and Python is
+    # only called when a slice of the budget is used up (to yield to the game loop) or when the
+    # whole budget is exceeded.
+    hook_call = """
+    function(step, slice, budget, flush)
+        local used, since_yield = 0, 0
+        return function()
+            used = used + step
+            if budget > 0 and used > budget then
+                await(sanity_check(used))
+            end
+            since_yield = since_yield + step
+            if since_yield >= slice then
+                since_yield = 0
+                flush()
+                await(yield_slice(used))
+            end
+        end
+    end
+    """
+    # Scripts starting with this line run in the offload pool instead of on the event loop.
+    offload_pragma = "--!offload"
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, registers: Optional[Dict[str, Union[str, int, float, bool]]] = None, **kwargs):
         super().__init__(*args, **kwargs)
-        self.runtime = AsyncLuaRuntime()
-        self._original_globals = {k: v for k, v in self.runtime.globals().items()}
+        self.pooled: Optional[PooledLuaRuntime] = None
         self._globals = dict()
+        # Values handed to the script by whatever started it, seen in Lua as the registers table
+        # whether it runs here or in the offload pool.
+        self.registers: Dict[str, Union[str, int, float, bool]] = dict(registers or ())
         self._instructions_per_check = self.holder.instructions_per_check
         self._instruction_count = 0
-        self.loader = self._original_globals['load']
+        self._api = None
+        self.api_dispatches = 0
         self.code = ""
+        # Seconds the script itself has run. Time spent suspended - yielded to the event loop,
+        # sleeping or waiting on the database - is other tasks' time and doesn't count.
+        self.run_time = 0.0
+        self._resumed_at: Optional[float] = None
+
+    # Builds the 'game' table scripts use to touch game objects. Everything is bulk: set() and
+    # msg() calls are buffered in Lua and handed to Python as one batch when a slice ends, when
+    # the script ends, or before a get() that might need to see them. Both sides are awaited, as
+    # the objects involved may need their attributes read in first.
+    api_call = """
+    function(dispatch, fetch)
+        local pending, count = {}, 0
+        local api = {}
+        local function as_list(value)
+            if type(value) == "table" then return value end
+            return {value}
+        end
+        function api.flush()
+            if count > 0 then
+                local batch = pending
+                pending, count = {}, 0
+                await(dispatch(batch))
+            end
+        end
+        function api.get(objects, names)
+            api.flush()
+            return await(fetch(as_list(objects), as_list(names)))
+        end
+        function api.run(chunk)
+            chunk()
+            api.flush()
+        end
+        function api.set(object, values)
+            count = count + 1
+            pending[count] = {"set", object, values}
+        end
+        function api.msg(targets, text)
+            count = count + 1
+            pending[count] = {"msg", as_list(targets), text}
+        end
+        return api
+    end
+    """
 
-    async def sanity_check(self):
-        self._instruction_count += self._instructions_per_check
+    async def sanity_check(self, used: int):
+        self._instruction_count = used
         if self._instruction_count > self.holder.max_lua_instructions:
             raise CPUTimeExceeded(f"Lua Instructions have exceeded holder's {self.holder.max_lua_instructions}")
 
+    async def yield_slice(self, used: int):
+        """
+        Called from the debug hook each time the script has run another slice of instructions. It
+        really does hand control back to the event loop, so long scripts share it fairly.
+        """
+        self._instruction_count = used
+        self.suspend_clock()
+        if self.run_time >= self.game.options["max_cpu_time"]:
+            raise CPUTimeExceeded(f"Lua script exceeded {self.game.options['max_cpu_time']} seconds")
+        await asyncio.sleep(0)
+        self.resume_clock()
+
+    def resume_clock(self):
+        self._resumed_at = time.perf_counter()
+
+    def suspend_clock(self):
+        """
+        Adds the time since the script last resumed to run_time. Call before anything that
+        awaits, and resume_clock() once it returns.
+        """
+        if self._resumed_at is not None:
+            self.run_time += time.perf_counter() - self._resumed_at
+            self._resumed_at = None
+
     def __getitem__(self, item):
         return self._globals.get(item, None)
 
@@ -50,25 +242,161 @@ class LuaTask(BaseTask):
     async def sleep(self, duration: Union[int, float]):
         if not isinstance(duration, (int, float)):
             return
-        await asyncio.sleep(abs(duration))
+        self.suspend_clock()
+        try:
+            await asyncio.sleep(abs(duration))
+        finally:
+            self.resume_clock()
 
     async def setup(self):
+        if self.offloadable:
+            return
+        self.pooled = await self.game.lua_pool.acquire(self)
+        original_globals = self.pooled.globals
         for key in self.allowed_globals:
-            if (found := self._original_globals.get(key, None)):
+            if (found := original_globals.get(key, None)):
                 self._globals[key] = found
 
         self._globals['sleep'] = self.sleep
-        self._globals["await"] = self._original_globals["python"]["await"]
+        self._globals["await"] = original_globals["python"]["await"]
         self._globals["print"] = self.print
+        self._api = self.pooled.api_factory(self.api_dispatch, self.api_fetch)
+        self._globals["game"] = self._api
+        self._globals["registers"] = self.pooled.runtime.table_from(self.registers)
+
+        debug = original_globals['debug']
+        hook = self.pooled.hook_factory(
+            self._instructions_per_check,
+            self.game.options["lua_slice_instructions"],
+            self.holder.max_lua_instructions,
+            self._api.flush,
+        )
+        debug.sethook(hook, '', self._instructions_per_check)
+
+    async def execute(self):
+        try:
+            await super().execute()
+        finally:
+            if self.pooled:
+                self.game.lua_pool.release(self.pooled)
+                self.pooled = None
 
-        sanity = await self.runtime.eval(self.sanity_call)
-        debug = self._original_globals['debug']
-        debug.sethook(sanity, 'l', self._instructions_per_check)
+    @property
+    def offloadable(self) -> bool:
+        if self.game.options["lua_offload_all"]:
+            return True
+        return self.code.lstrip().startswith(self.offload_pragma)
+
+    def make_job(self) -> dict:
+        """
+        Packages up everything an offloaded script is allowed to see.
+        """
+        return {
+            "code": self.code,
+            "name": f"{self.holder.dbref}/{self.pid}",
+            "allowed_globals": self.allowed_globals,
+            "attributes": {attr.name: val.value.plain for attr, val in self.holder.attributes.items()},
+            "registers": {k: v for k, v in self.registers.items() if isinstance(v, (str, int, float, bool))},
+            "max_instructions": self.holder.max_lua_instructions,
+        }
+
+    async def execute_offloaded(self):
+        await self.holder.load_attributes()
+        result = await self.game.offload.submit(run_lua_job, self.make_job())
+        # The worker couldn't check anything, so its writes go through the same permission checks
+        # as a set() from a script running here.
+        for name, value in result["writes"].items():
+            self.api_request(self.holder, AttributeRequestType.SET, name, Text(value))
+        for line in result["output"]:
+            self.holder.msg(text=line)
+        if result["error"]:
+            self.holder.msg(text=f"#-1 LUA ERROR: {result['error']}")
 
     async def do_execute(self):
-        compiled_code = self.loader(self.code, f"{self.holder.dbref}/{self.pid}", 't', self)
+        if self.offloadable:
+            await self.execute_offloaded()
+            return
+        compiled_code = self.pooled.compile(self.code, f"{self.holder.dbref}/{self.pid}", self)
         self._globals['compiled'] = compiled_code
-        await self.runtime.eval('compiled()')
+        self.resume_clock()
+        try:
+            await self.pooled.runtime.eval('game.run(compiled)')
+        finally:
+            self.suspend_clock()
+
+    def api_resolve(self, target) -> Optional["GameObject"]:
+        if not isinstance(target, str):
+            return None
+        if target.lower() == "me":
+            return self.holder
+        found, err = self.game.locate_dbref(target)
+        return found
+
+    def api_request(self, obj: "GameObject", req_type: AttributeRequestType, name: str, value=None):
+        req = AttributeRequest(accessor=self.holder, req_type=req_type, name=name, entry=self, value=value)
+        if not obj.attributes.api_access(req):
+            req.error = Text("PERMISSION DENIED FOR ATTRIBUTES")
+        elif req_type == AttributeRequestType.SET:
+            obj.attributes.api_set(req)
+        else:
+            obj.attributes.api_get(req)
+        return req
+
+    async def api_load(self, objects: List["GameObject"], inherit: bool):
+        """
+        Reads in the attributes of objects, and of their ancestors if inherit, in one batch. The
+        script isn't running while this waits, so its clock is stopped.
+        """
+        self.suspend_clock()
+        try:
+            handlers = list()
+            for obj in objects:
+                handlers.append(obj.attributes)
+                if inherit:
+                    await obj.load_ancestors()
+                    handlers.extend(h for a in obj.ancestors if (h := getattr(a, "attributes", None)) is not None)
+            await self.game.attribute_loader.ensure(handlers)
+        finally:
+            self.resume_clock()
+
+    async def api_fetch(self, objects, names):
+        """
+        Handles game.get(objects, names) for a whole list of objects and attributes in one call.
+        Returns a table of {object: {attribute: value}}.
+        """
+        self.api_dispatches += 1
+        names = [str(name) for name in names.values()]
+        found = {target: obj for target in objects.values() if (obj := self.api_resolve(target))}
+        await self.api_load(list(found.values()), True)
+        out = dict()
+        for target, obj in found.items():
+            values = dict()
+            for name in names:
+                req = self.api_request(obj, AttributeRequestType.GET, name)
+                if not req.error:
+                    values[name] = req.value.plain
+            out[target] = self.pooled.runtime.table_from(values)
+        return self.pooled.runtime.table_from(out)
+
+    async def api_dispatch(self, batch):
+        """
+        Applies a batch of buffered set() and msg() calls from the script.
+        """
+        self.api_dispatches += 1
+        ops = list(batch.values())
+        targets = {op[2]: obj for op in ops if op[1] == "set" and (obj := self.api_resolve(op[2]))}
+        await self.api_load(list(targets.values()), False)
+        for op in ops:
+            if op[1] == "set":
+                if not (obj := targets.get(op[2], None)):
+                    continue
+                for name, value in op[3].items():
+                    self.api_request(obj, AttributeRequestType.SET, str(name), Text(str(value)))
+            elif op[1] == "msg":
+                text = str(op[3])
+                for target in op[2].values():
+                    if (obj := self.api_resolve(target)):
+                        obj.msg(text=text)
 
     def print(self, *args):
         self.holder.msg(text="".join([str(arg) for arg in args]))
\ No newline at end of file
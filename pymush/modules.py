@@ -259,12 +259,14 @@ class RoomTemplate:
 
 
 class ExitManager:
+    __slots__ = ["room"]
 
     def __init__(self, room):
         self.room = room
 
 
 class Room:
+    __slots__ = ["manager", "coordinates", "template", "exits", "_data"]
 
     def __init__(self, manager, coordinates: Tuple[int, ...]):
         self.manager = manager
@@ -282,6 +284,12 @@ class Room:
 
 
 class ContentsManager:
+    """
+    Tracks what an object holds, by grid or space coordinates. Only built for objects that are
+    actually used as containers; see GameObject.contents.
+    """
+
+    __slots__ = ["obj", "rooms", "grid_contents", "grid_reverse", "space_contents", "space_reverse"]
 
     def __init__(self, obj):
         self.obj = obj
@@ -301,6 +309,7 @@ class ContentsManager:
 
 
 class BasicQueue:
+    __slots__ = ["obj", "next_id", "pending_queue", "queue", "_task", "running"]
 
     def __init__(self, obj):
         self.obj = obj
@@ -332,16 +341,26 @@ class BasicQueue:
 
 
 class ActionQueue(BasicQueue):
-    pass
+    __slots__ = ()
 
 
 class CommandQueue(BasicQueue):
-    pass
+    __slots__ = ()
 
 
 class GameObject:
+    """
+    Most objects - props, items - never hold anything, travel or run code, so the contents
+    manager, saved locations and queues are only built the first time they're asked for.
+    """
+
     type_name = None
 
+    __slots__ = [
+        "key", "module", "prototype", "_data", "session", "cpu_quota", "created", "modified", "holder",
+        "_contents", "_saved_locations", "_action_queue", "_cmd_queue", "__weakref__",
+    ]
+
     def __init__(self, module: Module, prototype: Prototype, key: str):
         self.key = key
         self.module = module
@@ -355,23 +374,49 @@ class GameObject:
         self.created: float = 0.0
         self.modified: float = 0.0
 
-        self.contents = ContentsManager(self)
-
         self.holder: Optional["GameObject"] = None
 
-        self.saved_locations: Dict[str, Tuple[str, str, Union[Tuple[int, ...], Tuple[float, ...]]]] = dict()
+        self._contents: Optional[ContentsManager] = None
+        self._saved_locations: Optional[Dict[str, Tuple[str, str, Union[Tuple[int, ...], Tuple[float, ...]]]]] = None
+        self._action_queue: Optional[ActionQueue] = None
+        self._cmd_queue: Optional[CommandQueue] = None
 
-        self.action_queue = ActionQueue(self)
-        self.cmd_queue = CommandQueue(self)
+    @property
+    def contents(self) -> ContentsManager:
+        if self._contents is None:
+            self._contents = ContentsManager(self)
+        return self._contents
+
+    @property
+    def has_contents(self) -> bool:
+        return self._contents is not None
+
+    @property
+    def saved_locations(self) -> Dict[str, Tuple[str, str, Union[Tuple[int, ...], Tuple[float, ...]]]]:
+        if self._saved_locations is None:
+            self._saved_locations = dict()
+        return self._saved_locations
+
+    @property
+    def action_queue(self) -> ActionQueue:
+        if self._action_queue is None:
+            self._action_queue = ActionQueue(self)
+        return self._action_queue
+
+    @property
+    def cmd_queue(self) -> CommandQueue:
+        if self._cmd_queue is None:
+            self._cmd_queue = CommandQueue(self)
+        return self._cmd_queue
 
     def serialize_location(self):
-        if not self.holder:
+        if not self.holder or not self.holder.has_contents:
             return None
         return self.holder.contents.coordinates_of(self)
 
     @property
     def room(self):
-        if not self.holder:
+        if not self.holder or not self.holder.has_contents:
             return None
         if not (loc := self.holder.contents.grid_contents.get(self, None)):
             return None
@@ -18,6 +18,8 @@ class MushCommand(BaseApi):
     help_category = None
     timestamp_after = True
     available_switches = []
+    # Name of the MushCommandMatcher that produced this command. Set on match.
+    matcher = None
 
     @classmethod
     async def access(cls, task):
@@ -137,7 +139,9 @@ class MushCommandMatcher:
     async def match(self, task, text: Text):
         for cmd in self.cmds:
             if await cmd.access(task) and (result := await cmd.match(task, text)):
-                return cmd(task, text, result)
+                found = cmd(task, text, result)
+                found.matcher = self.name
+                return found
 
     async def populate_help(self, task, data: dict):
         for cmd in self.cmds:
@@ -1,6 +1,6 @@
 from mudrich.text import Text
 
-from pymush.utils.text import case_match, truthy
+from pymush.utils.text import case_match, truthy, to_number
 
 from .base import MushCommand, MushCommandException, MushCommandMatcher
 
@@ -71,6 +71,90 @@ class BreakCommand(_FlowCommand):
             self.entry.parser.frame.break_after = True
 
 
+class _SemaphoreCommand(_FlowCommand):
+    async def parse_semaphore(self, text: Text):
+        """
+        Splits <object>[/<attribute>][/<timeout>] into its parts. Returns (obj, attr, timeout).
+        """
+        parts = [part.strip() for part in text.plain.split("/")]
+        if not parts[0] or len(parts) > 3:
+            raise MushCommandException("Malformed semaphore. Use <object>[/<attribute>][/<timeout>]")
+        found, err = await self.executor.locate_object(self.entry, name=parts[0], first_only=True)
+        if not found:
+            raise MushCommandException(err)
+
+        attr, timeout = None, None
+        if len(parts) == 3:
+            attr = parts[1]
+            if (timeout := to_number(Text(parts[2]))) is None:
+                raise MushCommandException("Semaphore timeout must be a number.")
+        elif len(parts) == 2:
+            if (timeout := to_number(Text(parts[1]))) is None:
+                attr = parts[1]
+        return found[0], attr, timeout
+
+
+class WaitCommand(_SemaphoreCommand):
+    name = "@wait"
+    aliases = ["@wa", "@wai"]
+
+    async def execute(self):
+        lsargs, rsargs = self.eqsplit_args(self.args)
+        lsargs = await self.parser.evaluate(lsargs)
+        if not rsargs:
+            raise MushCommandException("@wait requires an action list.")
+        task = self.game.app.classes["tasks"]["mush"](
+            self.executor, enactor=self.enactor, caller=self.executor
+        )
+        task.actions = rsargs
+
+        if (duration := to_number(lsargs)) is not None:
+            self.executor.wait_task(task, duration)
+            return
+
+        obj, attr, timeout = await self.parse_semaphore(lsargs)
+        self.game.semaphores.wait(obj, self.executor, task, attr=attr, timeout=timeout)
+
+
+class NotifyCommand(_SemaphoreCommand):
+    name = "@notify"
+    aliases = ["@no", "@not", "@noti", "@notif"]
+    available_switches = ["all"]
+
+    async def execute(self):
+        lsargs, rsargs = self.eqsplit_args(self.args)
+        obj, attr, timeout = await self.parse_semaphore(await self.parser.evaluate(lsargs))
+        if timeout is not None:
+            raise MushCommandException("@notify does not take a timeout.")
+
+        if "all" in self.switches:
+            self.game.semaphores.notify_all(obj, attr)
+            return
+
+        count = 1
+        if rsargs:
+            count = to_number(await self.parser.evaluate(rsargs))
+            if count is None or count < 1:
+                raise MushCommandException("@notify count must be a positive number.")
+        self.game.semaphores.notify(obj, attr, count=int(count))
+
+
+class DrainCommand(_SemaphoreCommand):
+    name = "@drain"
+    aliases = ["@dr", "@dra", "@drai"]
+    available_switches = ["all"]
+
+    async def execute(self):
+        obj, attr, timeout = await self.parse_semaphore(await self.parser.evaluate(self.args))
+        if timeout is not None:
+            raise MushCommandException("@drain does not take a timeout.")
+        if "all" in self.switches:
+            attr = None
+        elif attr is None:
+            attr = self.game.semaphores.default_attribute
+        self.game.semaphores.drain(obj, attr)
+
+
 class TriggerCommand(_FlowCommand):
     name = "@trigger"
     aliases = ["@tr", "@tri", "@trig", "@trigg", "@trigge"]
@@ -48,6 +48,7 @@ class _EmitCommand(_MessageCommand):
         if not targets:
             self.executor.msg("Nobody to hear it.")
 
+        deliveries = list()
         for target in targets:
             can_send, err = target.can_receive_text(
                 self.executor, self.interpreter, to_send
@@ -55,7 +56,8 @@ class _EmitCommand(_MessageCommand):
             if not can_send:
                 self.executor.msg(err)
                 continue
-            target.receive_text(self.executor, self.interpreter, to_send)
+            deliveries.append((target, to_send))
+        self.game.broadcaster.send(deliveries)
 
 
 class PemitCommand(_EmitCommand):
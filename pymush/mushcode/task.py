@@ -648,10 +648,18 @@ class MushcodeTask(BaseTask):
             if cmd:
                 try:
                     cmd.noeval = options.get("noeval", False)
+                    cmd_started = time.time()
+                    db_before = self.db_time
                     await cmd.at_pre_execute()
                     await cmd.execute()
                     await cmd.at_post_execute()
                     after_time = time.time()
+                    stat_key = (cmd.matcher or "none", cmd.name)
+                    if self.stat_key is None:
+                        self.stat_key = stat_key
+                    self.game.stats.record_command(
+                        stat_key, after_time - cmd_started, self.db_time - db_before
+                    )
                     if cmd.timestamp_after and self.session:
                         self.session.last_cmd = after_time
                     total_time = after_time - self.start_timer
@@ -0,0 +1,171 @@
+import asyncio
+
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from mudrich.text import Text
+
+
+class NameIndex:
+    """
+    In-memory index of every object's name and aliases. Names and their individual words are
+    kept in two sorted lists of (lowercase text, uuid), so exact, prefix and word-prefix lookups
+    are a bisect plus a scan over the matches rather than a pass over the world.
+
+    It is built from every row on first use and then kept current by GameService on create,
+    rename and destroy.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.names: List[Tuple[str, Any]] = list()
+        self.words: List[Tuple[str, Any]] = list()
+        self.entries: Dict[Any, Tuple[List[str], List[str]]] = dict()
+        self.types: Dict[Any, str] = dict()
+        self.built = False
+        self._building: Optional[asyncio.Task] = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def identifiers(row: dict) -> Tuple[List[str], List[str]]:
+        name = row.get("name", None)
+        if name is None:
+            name = row["name_text"].plain if isinstance(row.get("name_text", None), Text) else ""
+        whole = [name.lower()] if name else list()
+        whole.extend(alias.lower() for alias in (row.get("aliases", None) or ()))
+        words = sorted({word for phrase in whole for word in phrase.split()})
+        return sorted(set(whole)), words
+
+    def add(self, uuid, row: dict):
+        if uuid in self.entries:
+            self.remove(uuid)
+        whole, words = self.identifiers(row)
+        for name in whole:
+            insort(self.names, (name, uuid))
+        for word in words:
+            insort(self.words, (word, uuid))
+        self.entries[uuid] = (whole, words)
+        self.types[uuid] = row.get("type_name", None)
+
+    def remove(self, uuid):
+        if (entry := self.entries.pop(uuid, None)) is None:
+            return
+        self.types.pop(uuid, None)
+        whole, words = entry
+        for name in whole:
+            self._discard(self.names, (name, uuid))
+        for word in words:
+            self._discard(self.words, (word, uuid))
+
+    @staticmethod
+    def _discard(index: List[Tuple[str, Any]], item: Tuple[str, Any]):
+        i = bisect_left(index, item)
+        if i < len(index) and index[i] == item:
+            del index[i]
+
+    def rename(self, uuid, row: dict):
+        self.add(uuid, row)
+
+    async def build(self):
+        """
+        Indexes every object, a page of rows at a time.
+        """
+        self.names.clear()
+        self.words.clear()
+        self.entries.clear()
+        self.types.clear()
+        keys = list(self.game.objects.all_keys())
+        page_size = self.game.options["load_page_size"]
+        names, words = list(), list()
+        for i in range(0, len(keys), page_size):
+            rows = await self.game.object_cache.get_many(keys[i:i + page_size], store=False)
+            for uuid, row in rows.items():
+                whole, ids = self.identifiers(row)
+                names.extend((n, uuid) for n in whole)
+                words.extend((w, uuid) for w in ids)
+                self.entries[uuid] = (whole, ids)
+                self.types[uuid] = row.get("type_name", None)
+        # One sort at the end is far cheaper than an insort per entry.
+        names.sort()
+        words.sort()
+        self.names, self.words = names, words
+        self.built = True
+
+        # Objects created while the build was paging weren't in its key list.
+        if (late := [key for uuid, key in self.game.objects.keys.items() if uuid not in self.entries]) :
+            for uuid, row in (await self.game.object_cache.get_many(late, store=False)).items():
+                self.add(uuid, row)
+
+    async def ensure_built(self):
+        if self.built:
+            return
+        if self._building is None:
+            self._building = asyncio.create_task(self.build())
+        try:
+            await asyncio.shield(self._building)
+        finally:
+            if self._building is not None and self._building.done():
+                self._building = None
+
+    @staticmethod
+    def _scan(index: List[Tuple[str, Any]], prefix: str, exact: bool) -> Iterable[Any]:
+        i = bisect_left(index, (prefix,))
+        while i < len(index):
+            text, uuid = index[i]
+            if exact:
+                if text != prefix:
+                    break
+            elif not text.startswith(prefix):
+                break
+            yield uuid
+            i += 1
+
+    def _collect(self, found: Iterable[Any], type_name: Optional[str], limit: int) -> List[Any]:
+        out = list()
+        seen: Set[Any] = set()
+        for uuid in found:
+            if uuid in seen or (type_name and self.types.get(uuid, None) != type_name):
+                continue
+            seen.add(uuid)
+            out.append(uuid)
+            if limit and len(out) >= limit:
+                break
+        return out
+
+    def exact(self, name: str, type_name: Optional[str] = None, limit: int = 0) -> List[Any]:
+        return self._collect(self._scan(self.names, name.strip().lower(), True), type_name, limit)
+
+    def prefix(self, name: str, type_name: Optional[str] = None, limit: int = 0) -> List[Any]:
+        return self._collect(self._scan(self.names, name.strip().lower(), False), type_name, limit)
+
+    def word_prefix(self, name: str, type_name: Optional[str] = None, limit: int = 0) -> List[Any]:
+        """
+        Objects where every word of name is a prefix of some word in theirs, as in 'bl sw' for
+        'Big Blue Sword'.
+        """
+        parts = name.strip().lower().split()
+        if not parts:
+            return list()
+        # Narrow with the rarest-looking (longest) part, then check the rest against the entry.
+        parts.sort(key=len, reverse=True)
+        out = list()
+        for uuid in self._collect(self._scan(self.words, parts[0], False), type_name, 0):
+            words = self.entries[uuid][1]
+            if all(any(w.startswith(p) for w in words) for p in parts[1:]):
+                out.append(uuid)
+                if limit and len(out) >= limit:
+                    break
+        return out
+
+    def search(self, name: str, exact: bool = False, type_name: Optional[str] = None, limit: int = 0) -> List[Any]:
+        """
+        Exact matches if exact, otherwise the first non-empty of exact, name prefix and word
+        prefix matches.
+        """
+        if (found := self.exact(name, type_name, limit)) or exact:
+            return found
+        if (found := self.prefix(name, type_name, limit)):
+            return found
+        return self.word_prefix(name, type_name, limit)
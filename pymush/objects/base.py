@@ -1,8 +1,9 @@
 import sys
+import time
 import weakref
 
 from collections import defaultdict, OrderedDict
-from typing import Union, Set, Optional, List, Dict, Tuple, Iterable
+from typing import Any, Union, Set, Optional, List, Dict, Tuple, Iterable
 
 from athanor.utils import lazy_property, partial_match
 
@@ -14,6 +15,8 @@ from pymush.utils.styling import StyleHandler
 from pymush.db.base import GameObjectKey
 from pymush.db import exceptions as ex
 from pymush.task import BreakTaskException
+from pymush.attributes import AttributeHandler
+from pymush.perception import VISIBILITY_FIELDS
 
 
 class GameObject:
@@ -22,7 +25,12 @@ class GameObject:
     around the database though. It's not meant to store very much.
     """
 
-    __slots__ = ['game', 'key', 'session', 'cpu_quota', '_pid', 'style_holder']
+    __slots__ = ['game', 'key', 'session', 'cpu_quota', '_pid', 'style_holder', '_attributes']
+
+    # Whether locate_object may use the game's per-location keyword indexes. Those only know
+    # names and aliases from the rows, so subclasses whose generate_identifiers_for() sees
+    # something else should turn this off.
+    indexed_locate = True
 
     def __init__(self, game, key: GameObjectKey):
         # has ref back to the game service for API calls.
@@ -39,6 +47,9 @@ class GameObject:
         # queue-relevant data
         self._pid: int = 0
 
+        # Built on first use; see the attributes property.
+        self._attributes: Optional[AttributeHandler] = None
+
     @property
     def db(self):
         return self.game.db
@@ -46,6 +57,9 @@ class GameObject:
     def start(self):
         pass
 
+    def stop(self):
+        pass
+
     def db_check(func):
         async def wrapper(*args, **kwargs):
             self = args[0]
@@ -66,11 +80,80 @@ class GameObject:
     def uuid(self):
         return self.key.uuid
 
+    @property
+    def dbid(self) -> Optional[int]:
+        return self.game.objects.dbrefs.dbid_of(self.key.uuid)
+
+    @property
+    def dbref(self) -> str:
+        return f"#{self.dbid}"
+
     async def _get_data(self):
-        result = await self.db.get_object(self.key)
-        if result.error:
+        if (data := await self.game.object_cache.get(self.key)) is None:
             raise ex.ObjectDoesNotExist()
-        return result.data
+        return data
+
+    async def _set_data(self, **kwargs):
+        """
+        Changes fields of this object's row. They are visible to the getters at once and reach
+        the database with the next write-behind flush.
+        """
+        self.game.writeback.mark(self.key, **kwargs)
+        if VISIBILITY_FIELDS.intersection(kwargs):
+            self.game.visibility.bump()
+        if {"name", "name_text", "aliases"}.intersection(kwargs):
+            row = await self._get_data()
+            if self.game.names.built:
+                self.game.names.rename(self.uuid, row)
+            self.game.keywords.renamed(self.uuid, row)
+            self.game.display_names.renamed(self.uuid)
+
+    @property
+    def attributes(self) -> AttributeHandler:
+        """
+        This object's attributes. Their values are only read from the database when something
+        awaits load_attributes() - api_request does this itself - so synchronous callers on a
+        cold object see none.
+        """
+        if self._attributes is None:
+            self._attributes = AttributeHandler(self, self.game.attribute_manager)
+        return self._attributes
+
+    async def load_attributes(self):
+        await self.game.attribute_loader.ensure([self.attributes])
+
+    @property
+    def parent(self) -> Optional["GameObject"]:
+        if (uuid := self.game.inheritance.parent_of(self.uuid)) is None:
+            return None
+        return self.game.objects.get(uuid)
+
+    @property
+    def ancestors(self) -> List["GameObject"]:
+        """
+        Parent, grandparent and so on, nearest first. Only as complete as the inheritance index;
+        await load_ancestors() before relying on it.
+        """
+        out = list()
+        for uuid in self.game.inheritance.ancestors(self.uuid):
+            if (obj := self.game.objects.get(uuid)) is not None:
+                out.append(obj)
+        return out
+
+    async def load_ancestors(self):
+        await self.game.inheritance.load_chain(self.uuid)
+
+    async def set_parent(self, parent: Optional["GameObject"]):
+        """
+        Raises ValueError if parent would make a loop.
+        """
+        inheritance = self.game.inheritance
+        if parent is not None:
+            await inheritance.load_chain(parent.uuid)
+            if inheritance.would_loop(self.uuid, parent.uuid):
+                raise ValueError("That would create a parent loop.")
+        await self._set_data(parent=parent.uuid if parent else None)
+        inheritance.set_parent(self.uuid, parent.uuid if parent else None)
 
     @db_check
     async def get_name(self) -> Text:
@@ -141,6 +224,7 @@ class GameObject:
         else:
             dubs.pop(target.objid, None)
         self.sys_attributes["dubs"] = dubs
+        self.game.display_names.changed_dub(self, target)
 
     def generate_name_for(self, target):
         return target.name
@@ -171,6 +255,110 @@ class GameObject:
             pass
         return whole, words
 
+    async def _locate_indexed(
+        self, entry: "TaskEntry", nlower: str, loc: Optional["GameObject"], contents: bool, exact: bool,
+        quoted: bool, filter_visible: bool, include_inactive: bool
+    ) -> List["GameObject"]:
+        """
+        Looks the name up in the keyword indexes of the location and of this object's contents,
+        then applies the per-viewer checks to only the occupants that matched. As with
+        _locate_scan, the shortest matching key that has a usable occupant wins, so a match the
+        viewer can't see doesn't hide the ones it can.
+        """
+        scopes = list()
+        if loc:
+            scopes.append(loc)
+        if contents:
+            scopes.append(self)
+        groups: Dict[str, List[Any]] = dict()
+        for scope in scopes:
+            index = await self.game.keywords.get(scope)
+            for key, found in index.match(nlower, exact=exact, quoted=quoted):
+                groups.setdefault(key, list()).extend(found)
+        seen = {self.uuid}
+        for key in sorted(groups.keys(), key=len):
+            out = list()
+            for uuid in groups[key]:
+                if uuid in seen:
+                    continue
+                seen.add(uuid)
+                if (obj := self.game.objects.get(uuid)) is None:
+                    continue
+                if not include_inactive and not obj.active():
+                    continue
+                out.append(obj)
+            if filter_visible:
+                out = await self.can_perceive_many(entry, out)
+            if out:
+                return out
+        return list()
+
+    async def _locate_scan(
+        self, entry: "TaskEntry", nlower: str, loc: Optional["GameObject"], contents: bool, candidates,
+        use_names: bool, use_nicks: bool, use_aliases: bool, exact: bool, quoted: bool, filter_visible: bool,
+        include_inactive: bool
+    ) -> List["GameObject"]:
+        """
+        Builds keyword tables from every candidate. Used when explicit candidates are given or the
+        viewer generates its own identifiers, which the location indexes can't know about.
+        """
+        total_candidates = set()
+        if candidates:
+            total_candidates.update(candidates)
+        if loc:
+            total_candidates.update(loc.contents)
+        if contents:
+            total_candidates.update(self.contents)
+        if self in total_candidates:
+            total_candidates.remove(self)
+
+        total_candidates = list(total_candidates)
+
+        if not include_inactive:
+            total_candidates = filter(lambda x: x.active(), total_candidates)
+
+        if filter_visible:
+            total_candidates = await self.can_perceive_many(entry, total_candidates)
+
+        # Hydrate every candidate's row in one query rather than one per candidate, dropping any
+        # whose rows are gone.
+        total_candidates = list(total_candidates)
+        rows = await self.game.object_cache.get_many([x.key for x in total_candidates])
+        total_candidates = [x for x in total_candidates if x.uuid in rows]
+
+        keywords = defaultdict(list)
+        full_names = defaultdict(list)
+
+        simple_words = ("the", "of", "an", "a", "or", "and")
+
+        for can in total_candidates:
+            whole, words = self.generate_identifiers_for(
+                can, names=use_names, aliases=use_aliases, nicks=use_nicks
+            )
+            for word in words:
+                ilower = word.lower()
+                if ilower in simple_words:
+                    continue
+                keywords[ilower].append(can)
+            for n in whole:
+                full_names[n.lower()].append(can)
+
+        out = list()
+        if exact:
+            if (found := full_names.get(nlower, None)) :
+                out.extend(found)
+        else:
+            if quoted:
+                m = partial_match(nlower, full_names.keys())
+                if m:
+                    out.extend(full_names[m])
+            else:
+                m = partial_match(nlower, keywords.keys())
+                if m:
+                    out.extend(keywords[m])
+
+        return out
+
     async def locate_object(
         self,
         entry: "TaskEntry",
@@ -231,56 +419,17 @@ class GameObject:
         quoted = name.startswith('"') and name.endswith('"')
         name = name.strip('"')
 
-        total_candidates = set()
-        if candidates:
-            total_candidates.update(candidates)
-        if location and loc:
-            total_candidates.update(loc.contents)
-        if contents:
-            total_candidates.update(self.contents)
-        if self in total_candidates:
-            total_candidates.remove(self)
-
-        total_candidates = list(total_candidates)
-
-        if not include_inactive:
-            total_candidates = filter(lambda x: x.active(), total_candidates)
-
-        if filter_visible:
-            total_candidates = [
-                x for x in total_candidates if await self.can_perceive(entry, x)
-            ]
-
-        keywords = defaultdict(list)
-        full_names = defaultdict(list)
-
-        simple_words = ("the", "of", "an", "a", "or", "and")
-
-        for can in total_candidates:
-            whole, words = self.generate_identifiers_for(
-                can, names=use_names, aliases=use_aliases, nicks=use_nicks
-            )
-            for word in words:
-                ilower = word.lower()
-                if ilower in simple_words:
-                    continue
-                keywords[ilower].append(can)
-            for n in whole:
-                full_names[n.lower()].append(can)
-
         nlower = name.lower()
-        if exact:
-            if (found := full_names.get(nlower, None)) :
-                out.extend(found)
+        if candidates is None and use_names and use_aliases and self.indexed_locate:
+            out = await self._locate_indexed(
+                entry, nlower, loc if location else None, contents, exact, quoted, filter_visible,
+                include_inactive
+            )
         else:
-            if quoted:
-                m = partial_match(nlower, full_names.keys())
-                if m:
-                    out.extend(full_names[m])
-            else:
-                m = partial_match(nlower, keywords.keys())
-                if m:
-                    out.extend(keywords[m])
+            out = await self._locate_scan(
+                entry, nlower, loc if location else None, contents, candidates, use_names, use_nicks,
+                use_aliases, exact, quoted, filter_visible, include_inactive
+            )
 
         if not out:
             return out, "Nothing was found."
@@ -304,6 +453,39 @@ class GameObject:
     async def can_perceive(self, entry: "TaskEntry", target: "GameObject"):
         return True
 
+    async def check_perceive_many(self, entry: "TaskEntry", targets: List["GameObject"]) -> List[bool]:
+        """
+        Decides perception for a batch of targets, one verdict per target. Rules that can judge a
+        whole batch at once should override this; the default asks can_perceive about each.
+        """
+        return [await self.can_perceive(entry, target) for target in targets]
+
+    async def can_perceive_many(self, entry: "TaskEntry", targets: Iterable["GameObject"]) -> List["GameObject"]:
+        """
+        Returns the targets this object can perceive, in their original order. Verdicts are
+        remembered by the game's VisibilityCache until something moves or changes flags or locks,
+        so only targets without one are checked. Verdicts decided while the world changed under
+        the check are used this once but not remembered.
+        """
+        cache = self.game.visibility
+        targets = list(targets)
+        verdicts = dict()
+        unknown = list()
+        for target in targets:
+            if (found := cache.get(self, target)) is None:
+                unknown.append(target)
+            else:
+                verdicts[target.uuid] = found
+        if unknown:
+            generation = cache.generation
+            checked = await self.check_perceive_many(entry, unknown)
+            current = cache.generation == generation
+            for target, verdict in zip(unknown, checked):
+                if current:
+                    cache.put(self, target, verdict)
+                verdicts[target.uuid] = verdict
+        return [target for target in targets if verdicts[target.uuid]]
+
     async def can_interact_with(self, entry: "TaskEntry", target: "GameObject"):
         return True
 
@@ -312,11 +494,13 @@ class GameObject:
     ):
         parser = entry.parser
         out = fmt.FormatList(viewer)
+        await self.load_attributes()
 
         see_dbrefs = viewer.session.admin if viewer.session else True
+        names = self.game.display_names
 
         def format_name(obj, cmd=None):
-            name = viewer.get_dub_or_keyphrase_for(obj)
+            name = names.name_for(viewer, obj)
             display = ansi_fun("hw", name)
             if cmd:
                 display = send_menu(display, [(f"{cmd} {name}", cmd)])
@@ -358,15 +542,11 @@ class GameObject:
                 out.add(fmt.Line(desc_eval))
 
         if (
-            contents := [
-                x
-                for x in self.contents
-                if x.active() and await viewer.can_perceive(entry, x)
-            ]
+            contents := await viewer.can_perceive_many(entry, [x for x in self.contents if x.active()])
         ) :
-            contents = sorted(
-                contents, key=lambda x: viewer.get_dub_or_keyphrase_for(x)
-            )
+            contents = [
+                x for _, x in sorted(zip(names.names_for(viewer, contents), contents), key=lambda x: x[0])
+            ]
             if contents:
                 if (conformat := self.attributes.get_value("CONFORMAT")) :
                     contents_objids = " ".join([con.objid for con in contents])
@@ -384,15 +564,13 @@ class GameObject:
                         out.add(fmt.Line(Text("\n").join(con)))
 
         if (
-            contents := [
-                x
-                for x in self.namespaces["EXIT"]
-                if x.active() and await viewer.can_perceive(entry, x)
-            ]
-        ) :
-            contents = sorted(
-                contents, key=lambda x: viewer.get_dub_or_keyphrase_for(x)
+            contents := await viewer.can_perceive_many(
+                entry, [x for x in self.namespaces["EXIT"] if x.active()]
             )
+        ) :
+            contents = [
+                x for _, x in sorted(zip(names.names_for(viewer, contents), contents), key=lambda x: x[0])
+            ]
             if contents:
                 if (conformat := self.attributes.get_value("EXITFORMAT")) :
                     contents_objids = " ".join([con.objid for con in contents])
@@ -449,6 +627,8 @@ class GameObject:
             pass
 
         self.location = destination
+        self.game.visibility.moved(self, current_location, destination)
+        await self.game.keywords.moved(self, destination)
 
     def setup(self):
         pass
@@ -465,51 +645,80 @@ class GameObject:
         out.remove(self)
         return out
 
+    def announce(self, to_send: Text):
+        """
+        Sends to_send to every neighbor, prefixed with what that neighbor calls this object.
+        """
+        composed = dict()
+        deliveries = list()
+        for neighbor, name in self.game.display_names.seen_as(self, self.neighbors()).items():
+            if (neighbor_sees := composed.get(name, None)) is None:
+                neighbor_sees = composed[name] = name + to_send
+            deliveries.append((neighbor, neighbor_sees))
+        self.game.broadcaster.send(deliveries)
+
     async def announce_login(self, from_linkdead: bool = False):
         if from_linkdead:
             self.msg(Text("You return from link-dead!"))
-            to_send = Text(" is no longer link-dead!")
-            for neighbor in self.neighbors():
-                neighbor.msg(neighbor.get_dub_or_keyphrase_for(self) + to_send)
+            self.announce(Text(" is no longer link-dead!"))
         else:
             self.msg(Text("You have entered the game."))
-            to_send = Text(" has entered the game!")
-            for neighbor in self.neighbors():
-                neighbor.msg(neighbor.get_dub_or_keyphrase_for(self) + to_send)
+            self.announce(Text(" has entered the game!"))
 
     async def announce_linkdead(self):
-        to_send = Text(" has gone link-dead!")
-        for neighbor in self.neighbors():
-            neighbor.msg(neighbor.get_dub_or_keyphrase_for(self) + to_send)
+        self.announce(Text(" has gone link-dead!"))
 
     async def announce_logout(self, from_linkdead: bool = False):
         if from_linkdead:
-            to_send = Text(" has been idled-out due to link-deadedness!")
-            for neighbor in self.neighbors():
-                neighbor.msg(neighbor.get_dub_or_keyphrase_for(self) + to_send)
+            self.announce(Text(" has been idled-out due to link-deadedness!"))
         else:
             self.msg(Text("You have left the game."))
-            to_send = Text(" has left the game!")
-            for neighbor in self.neighbors():
-                neighbor.msg(neighbor.get_dub_or_keyphrase_for(self) + to_send)
+            self.announce(Text(" has left the game!"))
 
     def update(self, now: float, delta: float):
-        self.queue_elapsed(now, delta)
+        pass
+
+    def hold_task(self, task) -> int:
+        """
+        Registers a Task with this object without queueing it. Returns its pid, which can later be
+        handed to release_task() or discard_task().
+        """
+        self._pid += 1
+        task.pid = self._pid
+        self.queue_data[self._pid] = task
+        return self._pid
+
+    def release_task(self, pid: int, priority: int = 50):
+        if (task := self.queue_data.get(pid, None)) is not None:
+            task.queued = time.time()
+            self._queue.put_nowait((priority, pid))
+
+    def discard_task(self, pid: int):
+        return self.queue_data.pop(pid, None)
 
-    def queue_elapsed(self, now: float, delta: float):
-        if self.wait_queue:
-            elapsed = set()
-            for entry in self.wait_queue:
-                if (now - entry.created) > entry.wait:
-                    self._queue.put_nowait((50, entry.pid))
-                    elapsed.add(entry)
-            self.wait_queue -= elapsed
+    def wait_task(self, task, delay: float, priority: int = 50):
+        """
+        Registers a Task to be queued after <delay> seconds. The deadline lives in the game's
+        DeadlineScheduler, so nothing scans waiting entries every tick.
+        """
+        pid = self.hold_task(task)
+        return self.game.scheduler.call_later(delay, self.release_task, pid, priority)
+
+    async def get_root_owner(self):
+        """
+        The key that CPU usage is accounted against. Objects belonging to a User answer to it;
+        anything unowned answers to itself.
+        """
+        if (user := await self.get_user()) is not None:
+            return user
+        return self.uuid
 
     async def run_task(self, task):
         try:
             if (entry := self.queue_data.pop(task, None)) :
+                owner = await self.get_root_owner()
                 self.entry = entry
-                await entry.execute()
+                await self.game.cpu.run(owner, entry.execute())
         except Exception as e:
             self.game.app.console.print_exception()
         finally:
@@ -525,6 +734,7 @@ class GameObject:
         self._pid += 1
         task.pid = self._pid
         self.queue_data[self._pid] = task
+        task.queued = time.time()
         await self._queue.put((priority, self._pid))
 
     async def controls(self, entry: "TaskEntry", target: "GameObject"):
@@ -0,0 +1,158 @@
+import asyncio
+import multiprocessing
+import signal
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Dict, List
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows. Workers run without OS limits there.
+    resource = None
+
+
+def _mp_context():
+    """
+    Workers are started from a small server process rather than forked from the game, so they
+    don't inherit its whole address space - RLIMIT_AS would otherwise be measured against a copy
+    of the world, and leave a job little or nothing to work with.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _init_worker(memory_limit: int):
+    """
+    Runs once in each worker process.
+    """
+    # Ctrl-C is for the game server to handle. It shuts the workers down itself.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if resource and memory_limit:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+
+def _limit_cpu(seconds: float):
+    """
+    RLIMIT_CPU counts for the life of the process, and workers are reused, so each job gets a
+    soft limit relative to what the worker has used so far. Going over it delivers SIGXCPU, which
+    kills the worker; the pool notices and starts a new one.
+    """
+    if not resource or not seconds:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft = int(usage.ru_utime + usage.ru_stime + seconds) + 1
+    hard = resource.getrlimit(resource.RLIMIT_CPU)[1]
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+LUA_SANDBOX = """
+function(code, name, env, limit)
+    local chunk, err = load(code, name, 't', env)
+    if not chunk then error(err) end
+    if limit > 0 then
+        debug.sethook(function() error("Lua Instructions have exceeded " .. limit) end, "", limit)
+    end
+    local ok, result = pcall(chunk)
+    debug.sethook()
+    if not ok then error(result) end
+end
+"""
+
+
+def run_lua_job(job: dict) -> dict:
+    """
+    Executes a self-contained Lua job inside a worker process. The job carries everything the
+    script may see: its code, a snapshot of the holder's attributes and its registers. Attribute
+    writes are recorded and returned for the main process to apply.
+    """
+    from lupa import LuaRuntime
+
+    output: List[str] = list()
+    writes: Dict[str, str] = dict()
+    attributes: Dict[str, str] = job["attributes"]
+
+    def lua_print(*args):
+        output.append("".join([str(arg) for arg in args]))
+
+    def lua_get(name):
+        name = str(name).upper()
+        if name in writes:
+            return writes[name]
+        return attributes.get(name, "")
+
+    def lua_set(name, value):
+        writes[str(name).upper()] = str(value)
+
+    _limit_cpu(job["cpu_limit"])
+    try:
+        runtime = LuaRuntime(register_eval=False, register_builtins=False)
+        lua_globals = runtime.globals()
+        env = runtime.table()
+        for key in job["allowed_globals"]:
+            if (found := lua_globals[key]) is not None:
+                env[key] = found
+        env["print"] = lua_print
+        env["get"] = lua_get
+        env["set"] = lua_set
+        env["registers"] = runtime.table_from(job["registers"])
+        sandbox = runtime.eval(LUA_SANDBOX)
+        sandbox(job["code"], job["name"], env, job["max_instructions"])
+        error = None
+    except MemoryError:
+        error = "Memory limit exceeded"
+    except Exception as err:
+        error = str(err)
+    finally:
+        if resource and job["cpu_limit"]:
+            hard = resource.getrlimit(resource.RLIMIT_CPU)[1]
+            resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+
+    return {"output": output, "writes": writes, "error": error}
+
+
+class OffloadPool:
+    """
+    A pool of worker processes for CPU-heavy, self-contained script executions, so that they
+    don't hold up network I/O on the game's event loop. The pool is started on first use.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.submitted = 0
+        self.failed = 0
+
+    @property
+    def options(self):
+        return self.game.options
+
+    def start(self):
+        if not self.executor:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.options["offload_workers"],
+                mp_context=_mp_context(),
+                initializer=_init_worker,
+                initargs=(self.options["offload_memory_limit"],),
+            )
+
+    def stop(self):
+        if self.executor:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+    async def submit(self, func, job: dict) -> dict:
+        self.start()
+        self.submitted += 1
+        job.setdefault("cpu_limit", self.options["offload_cpu_limit"])
+        loop = asyncio.get_event_loop()
+        try:
+            return await loop.run_in_executor(self.executor, func, job)
+        except BrokenProcessPool:
+            # A worker was killed outright by its resource limits. Start fresh next time.
+            self.failed += 1
+            self.stop()
+            return {"output": list(), "writes": dict(), "error": "Worker process died"}
@@ -0,0 +1,102 @@
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+
+# Row fields whose change can alter who perceives whom.
+VISIBILITY_FIELDS = frozenset(("flags", "locks", "powers", "type_name"))
+
+
+class VisibilityCache:
+    """
+    Remembers can_perceive verdicts per (viewer, target). A move forgets only the verdicts it can
+    have changed: those about the mover and everything inside it, and those of everything in the
+    locations it left and entered. Changes to flags or locks, and destroys, are rare next to
+    moves and can affect perception more widely, so they still bump(), which drops every verdict
+    at once.
+
+    Verdicts are deliberately not specific to the task asking, so perception rules must only
+    depend on the viewer, the target and world state. Rules that depend on state further away
+    than an object's own row, its location and its contents must bump() when that changes.
+
+    Every change advances generation. A caller that awaits while deciding a verdict should only
+    put() it if generation hasn't moved meanwhile, since the verdict may already be stale.
+    """
+
+    # Stop remembering past this many verdicts until the next bump.
+    max_entries = 100000
+
+    def __init__(self, game):
+        self.game = game
+        self.generation = 0
+        self.verdicts: Dict[Tuple[Any, Any], bool] = dict()
+        # The verdict keys each object appears in, as viewer or target.
+        self.involving: Dict[Any, Set[Tuple[Any, Any]]] = dict()
+        self.hits = 0
+        self.misses = 0
+        self.bumps = 0
+        self.forgotten = 0
+
+    def __len__(self):
+        return len(self.verdicts)
+
+    def bump(self):
+        self.generation += 1
+        self.bumps += 1
+        self.verdicts.clear()
+        self.involving.clear()
+
+    def get(self, viewer, target) -> Optional[bool]:
+        if (found := self.verdicts.get((viewer.uuid, target.uuid), None)) is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return found
+
+    def put(self, viewer, target, verdict: bool):
+        if len(self.verdicts) < self.max_entries:
+            pair = (viewer.uuid, target.uuid)
+            self.verdicts[pair] = verdict
+            self.involving.setdefault(pair[0], set()).add(pair)
+            self.involving.setdefault(pair[1], set()).add(pair)
+
+    def forget(self, uuids: Iterable[Any]):
+        """
+        Drops every verdict with any of uuids as viewer or target.
+        """
+        self.generation += 1
+        uuids = set(uuids)
+        for uuid in uuids:
+            for pair in self.involving.pop(uuid, ()):
+                if self.verdicts.pop(pair, None) is not None:
+                    self.forgotten += 1
+                other = pair[1] if pair[0] == uuid else pair[0]
+                if other not in uuids and (pairs := self.involving.get(other, None)) is not None:
+                    pairs.discard(pair)
+
+    def moved(self, obj: "GameObject", *locations: Optional["GameObject"]):
+        """
+        Forgets what a move of obj between locations can have changed.
+        """
+        uuids = set()
+        pending = [obj]
+        while pending:
+            found = pending.pop()
+            if found.uuid in uuids:
+                continue
+            uuids.add(found.uuid)
+            pending.extend(found.contents)
+        for location in locations:
+            if location is not None:
+                uuids.add(location.uuid)
+                uuids.update(x.uuid for x in location.contents)
+        self.forget(uuids)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.verdicts),
+            "limit": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.bumps + self.forgotten,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
@@ -0,0 +1,86 @@
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from pymush.db.base import GameObjectKey
+from pymush.dbrefs import DbrefTable
+
+
+class ObjectRegistry:
+    """
+    Holds the key of every object in the game, but only builds a GameObject wrapper for one the
+    first time it is looked up. Startup then costs one small entry per object rather than a full
+    wrapper and start() for the whole world.
+
+    Lookups (get, [], in) see every object. values() and items() only cover wrappers that have
+    been built; use all_keys() to reach everything. Every key is given a dbref as it is added.
+    """
+
+    def __init__(self, factory: Callable[[GameObjectKey], Any]):
+        self.factory = factory
+        self.keys: Dict[Any, GameObjectKey] = dict()
+        self.loaded: Dict[Any, Any] = dict()
+        self.dbrefs = DbrefTable()
+
+    def add_key(self, key: GameObjectKey, dbid: Optional[int] = None) -> int:
+        """
+        Registers key and returns the dbref it was given.
+        """
+        self.keys[key.uuid] = key
+        return self.dbrefs.assign(key, dbid)
+
+    def materialize(self, uuid) -> Optional[Any]:
+        if (obj := self.loaded.get(uuid, None)) is not None:
+            return obj
+        if (key := self.keys.get(uuid, None)) is None:
+            return None
+        obj = self.factory(key)
+        self.loaded[uuid] = obj
+        obj.start()
+        return obj
+
+    def get(self, uuid, default=None):
+        if (obj := self.materialize(uuid)) is not None:
+            return obj
+        return default
+
+    def __getitem__(self, uuid):
+        if (obj := self.materialize(uuid)) is None:
+            raise KeyError(uuid)
+        return obj
+
+    def __setitem__(self, uuid, obj):
+        self.add_key(obj.key)
+        self.loaded[uuid] = obj
+
+    def by_dbref(self, dbid: int, created: Optional[int] = None):
+        """
+        Returns (GameObject, None) or (None, error).
+        """
+        uuid, err = self.dbrefs.lookup(dbid, created)
+        if uuid is None:
+            return None, err
+        return self.materialize(uuid), None
+
+    def __contains__(self, uuid):
+        return uuid in self.keys
+
+    def __len__(self):
+        return len(self.keys)
+
+    def pop(self, uuid, default=None):
+        self.keys.pop(uuid, None)
+        self.dbrefs.release(uuid)
+        return self.loaded.pop(uuid, default)
+
+    def all_keys(self) -> Iterable[GameObjectKey]:
+        return self.keys.values()
+
+    def values(self):
+        return self.loaded.values()
+
+    def items(self):
+        return self.loaded.items()
+
+    def clear(self):
+        self.keys.clear()
+        self.loaded.clear()
+        self.dbrefs.clear()
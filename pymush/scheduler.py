@@ -0,0 +1,102 @@
+import heapq
+import itertools
+import sys
+import time
+import traceback
+
+from typing import Callable, Optional, List, Tuple
+
+
+class ScheduledCall:
+    """
+    Handle returned by the DeadlineScheduler. Cancelling it is O(1); the heap entry is simply
+    skipped when it reaches the top.
+    """
+
+    __slots__ = ["scheduler", "deadline", "callback", "args", "cancelled"]
+
+    def __init__(self, scheduler: "DeadlineScheduler", deadline: float, callback: Callable, args: tuple):
+        self.scheduler = scheduler
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        if not self.cancelled:
+            self.cancelled = True
+            self.scheduler._cancelled += 1
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} : {self.deadline} {self.callback}>"
+
+
+class DeadlineScheduler:
+    """
+    A single heap of deadlines shared by everything in the game that needs to happen 'later' -
+    @wait entries, prompt delays, idle and linkdead timeouts. GameService.update() pumps it,
+    so a tick only costs O(expired) rather than polling every waiter.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, ScheduledCall]] = list()
+        self._counter = itertools.count()
+        self._cancelled = 0
+        self.fired = 0
+        self.lateness_total = 0.0
+        self.lateness_max = 0.0
+
+    def __len__(self):
+        return len(self._heap) - self._cancelled
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def call_at(self, deadline: float, callback: Callable, *args) -> ScheduledCall:
+        handle = ScheduledCall(self, deadline, callback, args)
+        heapq.heappush(self._heap, (deadline, next(self._counter), handle))
+        return handle
+
+    def call_later(self, delay: float, callback: Callable, *args) -> ScheduledCall:
+        return self.call_at(time.time() + max(delay, 0.0), callback, *args)
+
+    def next_deadline(self) -> Optional[float]:
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+            self._cancelled -= 1
+        if self._heap:
+            return self._heap[0][0]
+        return None
+
+    def update(self, now: float):
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            deadline, _, handle = heapq.heappop(heap)
+            if handle.cancelled:
+                self._cancelled -= 1
+                continue
+            # Mark it so a late cancel() from the callback's owner doesn't skew the count.
+            handle.cancelled = True
+            lateness = now - deadline
+            self.fired += 1
+            self.lateness_total += lateness
+            if lateness > self.lateness_max:
+                self.lateness_max = lateness
+            try:
+                handle.callback(*handle.args)
+            except Exception:
+                traceback.print_exc(file=sys.stdout)
+
+        # If most of the heap is dead weight from cancellations, rebuild it.
+        if self._cancelled > 64 and self._cancelled > len(heap) // 2:
+            self._heap = [entry for entry in heap if not entry[2].cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+
+    def stats(self) -> dict:
+        return {
+            "depth": len(self),
+            "fired": self.fired,
+            "lateness_avg": (self.lateness_total / self.fired) if self.fired else 0.0,
+            "lateness_max": self.lateness_max,
+        }
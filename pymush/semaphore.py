@@ -0,0 +1,165 @@
+from collections import OrderedDict, defaultdict
+from typing import Optional, Dict, Tuple, Set
+from uuid import UUID
+
+
+class SemaphoreWaiter:
+    __slots__ = ["semaphore", "holder", "pid", "timer"]
+
+    def __init__(self, semaphore: "Semaphore", holder: "GameObject", pid: int):
+        self.semaphore = semaphore
+        self.holder = holder
+        self.pid = pid
+        self.timer = None
+
+
+class Semaphore:
+    """
+    A counter and a FIFO of waiting tasks for one object/attribute pair. Waiters are kept in an
+    OrderedDict so that waking the oldest is O(1) and so is removing one whose timeout expired.
+    """
+
+    __slots__ = ["key", "count", "waiters", "_next_id"]
+
+    def __init__(self, key: Tuple[UUID, str]):
+        self.key = key
+        # Notifications that arrived while nobody was waiting.
+        self.count = 0
+        self.waiters: Dict[int, SemaphoreWaiter] = OrderedDict()
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self.waiters)
+
+    def add(self, waiter: SemaphoreWaiter) -> int:
+        self._next_id += 1
+        self.waiters[self._next_id] = waiter
+        return self._next_id
+
+
+class SemaphoreManager:
+    """
+    Tracks semaphore waits (@wait obj=, @notify, @drain) for the whole game, keyed by the
+    semaphore object and attribute. Nothing here ever scans a global queue.
+    """
+
+    default_attribute = "SEMAPHORE"
+
+    def __init__(self, game):
+        self.game = game
+        self.semaphores: Dict[Tuple[UUID, str], Semaphore] = dict()
+        self.by_object: Dict[UUID, Set[str]] = defaultdict(set)
+
+    def _key(self, obj: "GameObject", attr: Optional[str]) -> Tuple[UUID, str]:
+        return obj.uuid, (attr or self.default_attribute).upper()
+
+    def _get_or_create(self, key: Tuple[UUID, str]) -> Semaphore:
+        if (sem := self.semaphores.get(key, None)) is None:
+            sem = Semaphore(key)
+            self.semaphores[key] = sem
+            self.by_object[key[0]].add(key[1])
+        return sem
+
+    def _remove(self, key: Tuple[UUID, str]) -> Optional[Semaphore]:
+        if (sem := self.semaphores.pop(key, None)) is not None:
+            if (attrs := self.by_object.get(key[0], None)) is not None:
+                attrs.discard(key[1])
+                if not attrs:
+                    del self.by_object[key[0]]
+        return sem
+
+    def get(self, obj: "GameObject", attr: Optional[str] = None) -> Optional[Semaphore]:
+        return self.semaphores.get(self._key(obj, attr), None)
+
+    def count(self, obj: "GameObject", attr: Optional[str] = None) -> int:
+        """
+        The number of notifications banked on <obj>/<attr> for future waits.
+        """
+        if (sem := self.get(obj, attr)) is not None:
+            return sem.count
+        return 0
+
+    def wait(
+        self,
+        obj: "GameObject",
+        holder: "GameObject",
+        task,
+        attr: Optional[str] = None,
+        timeout: Optional[float] = None,
+        priority: int = 50,
+    ):
+        """
+        Blocks <task> (which will run on <holder>) on the semaphore <obj>/<attr>. If a notify is
+        already banked, the task is queued immediately instead.
+        """
+        sem = self._get_or_create(self._key(obj, attr))
+
+        pid = holder.hold_task(task)
+        if sem.count > 0:
+            sem.count -= 1
+            self._cleanup(sem)
+            holder.release_task(pid, priority)
+            return
+
+        waiter = SemaphoreWaiter(sem, holder, pid)
+        wait_id = sem.add(waiter)
+        if timeout is not None:
+            waiter.timer = self.game.scheduler.call_later(timeout, self._timed_out, sem, wait_id, priority)
+
+    def _timed_out(self, sem: Semaphore, wait_id: int, priority: int):
+        if (waiter := sem.waiters.pop(wait_id, None)):
+            waiter.timer = None
+            self._cleanup(sem)
+            waiter.holder.release_task(waiter.pid, priority)
+
+    def _cleanup(self, sem: Semaphore):
+        if not sem.waiters and not sem.count:
+            self._remove(sem.key)
+
+    def notify(
+        self, obj: "GameObject", attr: Optional[str] = None, count: int = 1, priority: int = 50
+    ) -> int:
+        """
+        Wakes up to <count> waiters in FIFO order. Notifications beyond the number of waiters are
+        banked for future waits. Returns the number of waiters woken.
+        """
+        sem = self._get_or_create(self._key(obj, attr))
+
+        woken = 0
+        waiters = sem.waiters
+        while woken < count and waiters:
+            _, waiter = waiters.popitem(last=False)
+            if waiter.timer:
+                waiter.timer.cancel()
+            waiter.holder.release_task(waiter.pid, priority)
+            woken += 1
+        sem.count += count - woken
+        self._cleanup(sem)
+        return woken
+
+    def notify_all(self, obj: "GameObject", attr: Optional[str] = None, priority: int = 50) -> int:
+        if (sem := self.get(obj, attr)) is None:
+            return 0
+        return self.notify(obj, attr, count=len(sem), priority=priority)
+
+    def drain(self, obj: "GameObject", attr: Optional[str] = None) -> int:
+        """
+        Discards every task waiting on <obj>/<attr> and resets its count. If <attr> is None, all
+        of <obj>'s semaphores are drained. Returns the number of tasks discarded.
+        """
+        if attr is None:
+            keys = [(obj.uuid, name) for name in self.by_object.get(obj.uuid, ())]
+        else:
+            keys = [self._key(obj, attr)]
+
+        drained = 0
+        for key in keys:
+            if (sem := self._remove(key)) is None:
+                continue
+            for waiter in sem.waiters.values():
+                if waiter.timer:
+                    waiter.timer.cancel()
+                waiter.holder.discard_task(waiter.pid)
+                drained += 1
+            sem.waiters.clear()
+        return drained
@@ -0,0 +1,350 @@
+import asyncio
+import mmap
+import os
+import pickle
+import struct
+import sys
+import time
+import traceback
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from pymush.db.base import GameObjectKey
+
+
+# magic, format version, generation, object count, offset and length of the pickled list of
+# (dbref, key) pairs.
+HEADER = struct.Struct("<8sHxxxxxxQQQQ")
+# uuid bytes, offset and length of the pickled (row, attributes) record. Sorted by uuid.
+INDEX = struct.Struct("<16sQI")
+MAGIC = b"PMSNAP\x00\x01"
+FORMAT_VERSION = 1
+
+# Journal records are a length prefix and a pickled (op, key, payload) tuple.
+RECORD = struct.Struct("<I")
+
+
+class Snapshot:
+    """
+    A memory-mapped snapshot file. Only the header is read up front; rows are found by binary
+    search over the index and unpickled when asked for.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.generation, self.count, keys_offset, keys_length = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a snapshot this server can read")
+        self.keys_offset = keys_offset
+        self.keys_length = keys_length
+
+    def keys(self) -> List[Tuple[int, GameObjectKey]]:
+        return pickle.loads(self.map[self.keys_offset:self.keys_offset + self.keys_length])
+
+    def find(self, uuid: UUID) -> Optional[Tuple[dict, Dict[str, Any]]]:
+        target = uuid.bytes
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            found, offset, length = INDEX.unpack_from(self.map, HEADER.size + mid * INDEX.size)
+            if found == target:
+                return pickle.loads(self.map[offset:offset + length])
+            if found < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+def write_snapshot(
+    path: str, generation: int, records: Dict[UUID, Tuple[GameObjectKey, dict, dict]], dbrefs: Dict[UUID, int]
+):
+    """
+    Writes a snapshot atomically: to a temporary file, then renamed over the old one. Runs in a
+    thread, since it is plain blocking I/O.
+    """
+    uuids = sorted(records.keys(), key=lambda x: x.bytes)
+    keys_blob = pickle.dumps(
+        [(dbrefs.get(u, None), records[u][0]) for u in uuids], protocol=pickle.HIGHEST_PROTOCOL
+    )
+    blobs = [pickle.dumps(records[u][1:], protocol=pickle.HIGHEST_PROTOCOL) for u in uuids]
+
+    keys_offset = HEADER.size + INDEX.size * len(uuids)
+    offset = keys_offset + len(keys_blob)
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, generation, len(uuids), keys_offset, len(keys_blob)))
+        for uuid, blob in zip(uuids, blobs):
+            f.write(INDEX.pack(uuid.bytes, offset, len(blob)))
+            offset += len(blob)
+        f.write(keys_blob)
+        for blob in blobs:
+            f.write(blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class SnapshotManager:
+    """
+    Keeps a binary snapshot of every object's row and attributes, plus an append-only journal of
+    every batch the WriteBehind has written since. SQL remains the durable store; this only exists so
+    that a restart can map one file and replay a short journal instead of reading every table.
+
+    Each snapshot starts a new journal generation before it gathers rows, so anything committed
+    while it runs is in the next journal too. Replaying a change twice is harmless.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.snapshot: Optional[Snapshot] = None
+        self.generation = 0
+        self.journal = None
+        self.timer = None
+        self._writing = False
+        # Everything journaled since the mapped snapshot was taken, applied over rows read from it
+        # so that snapshot + overlay always matches SQL.
+        self.fields: Dict[UUID, Dict[str, Any]] = dict()
+        self.attributes: Dict[UUID, Dict[str, Any]] = dict()
+        # While a new snapshot is being written, changes journaled since it began. These become
+        # the overlay once it is mapped.
+        self._next: Optional[Tuple[dict, dict]] = None
+        self.taken = 0
+        self.failures = 0
+        self.last_count = 0
+        self.last_duration = 0.0
+        self.last_taken = 0.0
+
+    @property
+    def options(self):
+        return self.game.options
+
+    @property
+    def enabled(self) -> bool:
+        return self.options["snapshot_interval"] > 0
+
+    @property
+    def directory(self) -> str:
+        return self.options["snapshot_dir"]
+
+    @property
+    def snapshot_path(self) -> str:
+        return os.path.join(self.directory, "world.snapshot")
+
+    def journal_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"journal.{generation}.log")
+
+    def boot(self) -> Optional[List[Tuple[Optional[int], GameObjectKey]]]:
+        """
+        Maps the snapshot and replays the journals written since. Returns (dbref, key) for every
+        object, or None if there is no usable snapshot and the world must be loaded from SQL.
+        """
+        if not self.enabled:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        if not os.path.exists(self.snapshot_path):
+            self.open_journal(self.generation)
+            return None
+        try:
+            self.snapshot = Snapshot(self.snapshot_path)
+        except (OSError, ValueError):
+            traceback.print_exc(file=sys.stdout)
+            self.open_journal(self.generation)
+            return None
+
+        keys = {key.uuid: (dbid, key) for dbid, key in self.snapshot.keys()}
+        generation = self.snapshot.generation
+        while os.path.exists(path := self.journal_path(generation)):
+            records, valid = self.read_journal(path)
+            for op, key, payload in records:
+                if op == "create":
+                    keys[key.uuid] = (payload, key)
+                elif op == "fields":
+                    self.fields.setdefault(key.uuid, dict()).update(payload)
+                elif op == "attributes":
+                    self.attributes.setdefault(key.uuid, dict()).update(payload)
+            # Cut off a record torn by a crash, so new records aren't appended after garbage.
+            if valid < os.path.getsize(path):
+                os.truncate(path, valid)
+            generation += 1
+        self.open_journal(max(generation - 1, self.snapshot.generation))
+        return list(keys.values())
+
+    @staticmethod
+    def read_journal(path: str) -> Tuple[List[tuple], int]:
+        """
+        Returns the records in a journal file and the length of its intact prefix.
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+        records = list()
+        pos = 0
+        while pos + RECORD.size <= len(data):
+            (length,) = RECORD.unpack_from(data, pos)
+            end = pos + RECORD.size + length
+            if end > len(data):
+                break
+            try:
+                records.append(pickle.loads(data[pos + RECORD.size:end]))
+            except Exception:
+                break
+            pos = end
+        return records, pos
+
+    def open_journal(self, generation: int):
+        if self.journal:
+            self.journal.close()
+        self.generation = generation
+        self.journal = open(self.journal_path(generation), "ab")
+
+    def append(self, op: str, key: GameObjectKey, payload: Any = None):
+        if not self.journal:
+            return
+        blob = pickle.dumps((op, key, payload), protocol=pickle.HIGHEST_PROTOCOL)
+        self.journal.write(RECORD.pack(len(blob)) + blob)
+
+    def journal_create(self, key: GameObjectKey, dbid: Optional[int]):
+        self.append("create", key, dbid)
+        self.journal_flush()
+
+    def journal_batch(self, objects: Dict[GameObjectKey, dict], attributes: Dict[GameObjectKey, dict]):
+        """
+        Called by the WriteBehind as it writes a batch to SQL. Journaling comes first, so a crash
+        mid-write can't leave the snapshot behind the database; a batch that fails is journaled
+        again when it is retried, which is harmless.
+        """
+        if not self.journal:
+            return
+        overlays = [(self.fields, self.attributes)]
+        if self._next is not None:
+            overlays.append(self._next)
+        for key, fields in objects.items():
+            self.append("fields", key, fields)
+            for overlay, _ in overlays:
+                overlay.setdefault(key.uuid, dict()).update(fields)
+        for key, changes in attributes.items():
+            if changes:
+                self.append("attributes", key, changes)
+                for _, overlay in overlays:
+                    overlay.setdefault(key.uuid, dict()).update(changes)
+        self.journal_flush()
+
+    def journal_flush(self):
+        if self.journal:
+            self.journal.flush()
+
+    def get_row(self, key: GameObjectKey) -> Optional[dict]:
+        if not self.snapshot or (found := self.snapshot.find(key.uuid)) is None:
+            return None
+        row = found[0]
+        if (fields := self.fields.get(key.uuid, None)) :
+            row = {**row, **fields}
+        return row
+
+    def get_attributes(self, key: GameObjectKey) -> Optional[Dict[str, Any]]:
+        if not self.snapshot or (found := self.snapshot.find(key.uuid)) is None:
+            return None
+        attributes = found[1]
+        if (changes := self.attributes.get(key.uuid, None)) :
+            attributes = {**attributes, **changes}
+            attributes = {k: v for k, v in attributes.items() if v is not None}
+        return attributes
+
+    def schedule(self):
+        if self.enabled and self.timer is None:
+            self.timer = self.game.scheduler.call_later(self.options["snapshot_interval"], self.timer_fired)
+
+    def timer_fired(self):
+        self.timer = None
+        asyncio.create_task(self.take())
+
+    async def gather(self) -> Dict[UUID, Tuple[GameObjectKey, dict, dict]]:
+        db = self.game.db
+        page_size = self.options["load_page_size"]
+        keys = list(self.game.objects.all_keys())
+        records = dict()
+        for i in range(0, len(keys), page_size):
+            page = keys[i:i + page_size]
+            # Rows the cache holds already include staged, unflushed changes, but the snapshot
+            # should match SQL, so read through to the database for all of them.
+            result = await db.get_objects(page)
+            if result.error:
+                raise ValueError(result.error)
+            attributes = dict()
+            if hasattr(db, "get_attributes_many"):
+                if (attr_result := await db.get_attributes_many(page)).error:
+                    raise ValueError(attr_result.error)
+                attributes = attr_result.data
+            for key in page:
+                if (row := result.data.get(key.uuid, None)) is None:
+                    continue
+                records[key.uuid] = (key, row, attributes.get(key.uuid, dict()))
+        return records
+
+    async def take(self):
+        """
+        Writes a fresh snapshot and starts a new journal generation.
+        """
+        if self._writing:
+            return
+        self._writing = True
+        started = time.perf_counter()
+        try:
+            # Flush first, so the snapshot has everything that was pending.
+            await self.game.writeback.flush()
+            generation = self.generation + 1
+            self.open_journal(generation)
+            self._next = (dict(), dict())
+            records = await self.gather()
+            loop = asyncio.get_event_loop()
+            dbrefs = {uuid: self.game.objects.dbrefs.dbid_of(uuid) for uuid in records.keys()}
+            await loop.run_in_executor(None, write_snapshot, self.snapshot_path, generation, records, dbrefs)
+
+            old = self.snapshot
+            self.snapshot = Snapshot(self.snapshot_path)
+            self.fields, self.attributes = self._next
+            if old:
+                old.close()
+            for stale in range(0, generation):
+                if os.path.exists(path := self.journal_path(stale)):
+                    os.remove(path)
+            self.taken += 1
+            self.last_count = len(records)
+            self.last_duration = time.perf_counter() - started
+            self.last_taken = time.time()
+        except Exception:
+            self.failures += 1
+            traceback.print_exc(file=sys.stdout)
+        finally:
+            self._next = None
+            self._writing = False
+            self.schedule()
+
+    def stats(self) -> dict:
+        return {
+            "generation": self.generation,
+            "taken": self.taken,
+            "failures": self.failures,
+            "last_count": self.last_count,
+            "last_duration": self.last_duration,
+            "last_taken": self.last_taken,
+        }
+
+    def close(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+        if self.snapshot:
+            self.snapshot.close()
+            self.snapshot = None
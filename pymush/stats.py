@@ -0,0 +1,125 @@
+import contextvars
+
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+# The BaseTask currently executing in this asyncio context, so that low-level code (like the
+# database getters on GameObject) can charge time to it without having it passed down.
+CURRENT_TASK = contextvars.ContextVar("current_task", default=None)
+
+
+class DbTimer:
+    """
+    Stands in as CURRENT_TASK for work that doesn't run as a BaseTask, such as login and
+    select-screen commands, so that database time charged during it is collected.
+    """
+
+    __slots__ = ["db_time", "_token"]
+
+    def __init__(self):
+        self.db_time = 0.0
+        self._token = None
+
+    def __enter__(self):
+        self._token = CURRENT_TASK.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        CURRENT_TASK.reset(self._token)
+        self._token = None
+
+
+# Four buckets per decade, from 1 microsecond to 100 seconds.
+BUCKET_BOUNDS: Tuple[float, ...] = tuple(1e-6 * (10 ** (i / 4)) for i in range(33))
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket histogram of durations in seconds. Recording is a bisect and an increment;
+    percentiles are reported as the upper bound of the bucket they fall in.
+    """
+
+    __slots__ = ["counts", "count", "total", "max"]
+
+    def __init__(self):
+        self.counts: List[int] = [0] * (len(BUCKET_BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float):
+        self.counts[bisect_left(BUCKET_BOUNDS, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, pct: float) -> float:
+        if not self.count:
+            return 0.0
+        target = self.count * (pct / 100.0)
+        seen = 0
+        for i, bucket in enumerate(self.counts):
+            seen += bucket
+            if seen >= target:
+                if i < len(BUCKET_BOUNDS):
+                    return min(BUCKET_BOUNDS[i], self.max)
+                return self.max
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return (self.total / self.count) if self.count else 0.0
+
+
+class CommandStats:
+    __slots__ = ["queue", "execute", "db"]
+
+    def __init__(self):
+        self.queue = LatencyHistogram()
+        self.execute = LatencyHistogram()
+        self.db = LatencyHistogram()
+
+
+class StatsManager:
+    """
+    Collects queue-wait, execution and database time, keyed by (matcher, command), and how long
+    each phase of the last world load took.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.commands: Dict[Tuple[str, str], CommandStats] = defaultdict(CommandStats)
+        self.load_phases: List[Tuple[str, float]] = list()
+        self.load_objects = 0
+
+    def record_load(self, objects: int, phases: List[Tuple[str, float]]):
+        self.load_objects = objects
+        self.load_phases = phases
+
+    def record_queue(self, key: Tuple[str, str], waited: float):
+        self.commands[key].queue.record(waited)
+
+    def record_command(self, key: Tuple[str, str], elapsed: float, db_time: float):
+        stats = self.commands[key]
+        stats.execute.record(elapsed)
+        stats.db.record(db_time)
+
+    def charge_db(self, elapsed: float):
+        if (task := CURRENT_TASK.get()) is not None:
+            task.db_time += elapsed
+
+    def queue_depths(self, limit: int = 10) -> Tuple[List[Tuple[str, int]], List[Tuple[str, int]]]:
+        objects = list()
+        for obj in self.game.objects.values():
+            if (queue := getattr(obj, "_queue", None)) is not None and (depth := queue.qsize()):
+                objects.append((repr(obj), depth))
+        sessions = list()
+        for key, sess in self.game.sessions.items():
+            if (queue := getattr(sess, "_queue", None)) is not None and (depth := queue.qsize()):
+                sessions.append((str(key), depth))
+        objects.sort(key=lambda x: x[1], reverse=True)
+        sessions.sort(key=lambda x: x[1], reverse=True)
+        return objects[:limit], sessions[:limit]
+
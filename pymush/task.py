@@ -8,6 +8,7 @@ from typing import Optional, Set, Tuple, Union
 from mudrich.traceback import Traceback
 
 from pymush.utils import formatter as fmt
+from pymush.stats import CURRENT_TASK
 
 STD_OUT = sys.stdout
 
@@ -35,6 +36,11 @@ class BaseTask:
         self.holder = holder
         self.start_timer: Optional[float] = 0.0
         self.created: Optional[float] = time.time()
+        # When this task last entered its holder's queue, and the (matcher, command) its timings
+        # are reported under.
+        self.queued: float = self.created
+        self.stat_key: Optional[Tuple[str, str]] = None
+        self.db_time: float = 0.0
         self._task = None
         self._running = False
         self._original_enactor = enactor or holder
@@ -50,10 +56,12 @@ class BaseTask:
         pass
 
     async def execute(self):
-        await self.setup()
-        self.start_timer = time.time()
+        token = CURRENT_TASK.set(self)
         try:
-            await self.do_execute()
+            with self.game.attribute_loader.pinned():
+                await self.setup()
+                self.start_timer = time.time()
+                await self.do_execute()
         except CPUTimeExceeded as mxp:
             pass
         except BreakTaskException as brk:
@@ -66,6 +74,11 @@ class BaseTask:
                 out.add(fmt.PyException(trace))
                 self.session.send(out)
             traceback.print_exc(file=sys.stdout)
+        finally:
+            CURRENT_TASK.reset(token)
+            if self.start_timer:
+                key = self.stat_key or ("task", self.__class__.__name__)
+                self.game.stats.record_queue(key, self.start_timer - self.queued)
 
     async def do_execute(self):
         pass
@@ -0,0 +1,178 @@
+import asyncio
+import sys
+import time
+import traceback
+
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from pymush.stats import LatencyHistogram
+
+if TYPE_CHECKING:
+    from pymush.db.base import GameObjectKey
+
+
+class WriteBehind:
+    """
+    Collects object and attribute changes and writes them to the database in batches, so that a
+    busy scene full of @sets doesn't become a stream of single-row transactions.
+
+    Changes are visible in memory immediately - object fields are staged into the ObjectCache, and
+    AttributeHandlers already hold their own values. A flush happens writeback_interval seconds
+    after the first change since the last flush, sooner if writeback_max_pending objects are dirty,
+    and always on @dump and shutdown. Each flush is one db.write_batch() call, which backends run
+    as a single transaction. If it fails, the changes are kept and retried with the next flush.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.keys: Dict[Any, "GameObjectKey"] = dict()
+        self.fields: Dict[Any, Dict[str, Any]] = dict()
+        self.handlers: Dict[Any, "AttributeHandler"] = dict()
+        # Fields of the batch currently being written, so reads during a flush still see them.
+        self.flushing: Dict[Any, Dict[str, Any]] = dict()
+        self.timer = None
+        self._lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+        self.flushes = 0
+        self.failures = 0
+        self.rows_written = 0
+        self.last_size = 0
+        self.max_size = 0
+        self.durations = LatencyHistogram()
+
+    @property
+    def options(self):
+        return self.game.options
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def in_flush(self) -> bool:
+        return self._lock.locked()
+
+    def mark(self, key: "GameObjectKey", **kwargs):
+        """
+        Records changed fields of an object's row.
+        """
+        self.keys[key.uuid] = key
+        self.fields.setdefault(key.uuid, dict()).update(kwargs)
+        self.game.object_cache.stage(key, **kwargs)
+        self.changed()
+
+    def pending_fields(self, key: "GameObjectKey") -> Optional[Dict[str, Any]]:
+        pending = self.fields.get(key.uuid, None)
+        if (flushing := self.flushing.get(key.uuid, None)) is not None:
+            return {**flushing, **pending} if pending else flushing
+        return pending
+
+    def mark_attributes(self, handler: "AttributeHandler"):
+        """
+        Records that an AttributeHandler has dirty attributes. They are collected at flush time.
+        """
+        key = handler.owner.key
+        self.keys[key.uuid] = key
+        self.handlers[key.uuid] = handler
+        self.changed()
+
+    def changed(self):
+        if len(self.keys) >= self.options["writeback_max_pending"]:
+            self.flush_soon()
+        else:
+            self.schedule()
+
+    def schedule(self):
+        if self.timer is None:
+            self.timer = self.game.scheduler.call_later(
+                self.options["writeback_interval"], self.timer_fired
+            )
+
+    def timer_fired(self):
+        # The handle has been used up. Clear it first, so that if a flush is already running and
+        # this does nothing, that flush can still arm a new timer for whatever it leaves behind.
+        self.timer = None
+        self.flush_soon()
+
+    def flush_soon(self):
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self) -> bool:
+        """
+        Writes everything pending. Returns False if the database refused the batch.
+        """
+        try:
+            return await self._flush()
+        finally:
+            # Anything marked while this batch was being written still needs a flush of its own.
+            if self.keys:
+                self.schedule()
+
+    async def _flush(self) -> bool:
+        async with self._lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if not self.keys:
+                return True
+
+            keys, fields, handlers = self.keys, self.fields, self.handlers
+            self.keys, self.fields, self.handlers = dict(), dict(), dict()
+
+            objects = {keys[uuid]: data for uuid, data in fields.items()}
+            attributes = {keys[uuid]: handler.collect_dirty() for uuid, handler in handlers.items()}
+
+            self.flushing = fields
+            self.game.snapshot.journal_batch(objects, attributes)
+            started = time.perf_counter()
+            try:
+                result = await self.game.db.write_batch(objects=objects, attributes=attributes)
+                error = result.error
+            except Exception as err:
+                traceback.print_exc(file=sys.stdout)
+                error = str(err)
+            finally:
+                self.flushing = dict()
+            elapsed = time.perf_counter() - started
+
+            if error:
+                self.failures += 1
+                print(f"Write-behind flush of {len(keys)} objects failed: {error}")
+                self.restore(keys, fields, handlers, attributes)
+                return False
+
+            self.flushes += 1
+            self.rows_written += len(keys)
+            self.last_size = len(keys)
+            self.max_size = max(self.max_size, len(keys))
+            self.durations.record(elapsed)
+            return True
+
+    def restore(self, keys, fields, handlers, attributes):
+        """
+        Puts a failed batch back in front of anything marked since, so it is retried.
+        """
+        for uuid, key in keys.items():
+            self.keys.setdefault(uuid, key)
+        for uuid, data in fields.items():
+            self.fields[uuid] = {**data, **self.fields.get(uuid, dict())}
+        for uuid, handler in handlers.items():
+            handler.restore_dirty(attributes[keys[uuid]])
+            self.handlers[uuid] = handler
+        # Wait out a full interval rather than hammering a database that just failed.
+        self.schedule()
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self.keys),
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "rows_written": self.rows_written,
+            "last_size": self.last_size,
+            "max_size": self.max_size,
+            "avg_size": (self.rows_written / self.flushes) if self.flushes else 0.0,
+            "duration_p50": self.durations.percentile(50),
+            "duration_p95": self.durations.percentile(95),
+            "duration_max": self.durations.max,
+        }
@@ -0,0 +1,91 @@
+import asyncio
+import unittest
+
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+pytest.importorskip("mudrich")
+attrcache = pytest.importorskip("pymush.attrcache")
+
+from pymush.attributes import AttributeHandler, AttributeManager
+from pymush.inheritance import InheritanceIndex
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.attributes = dict()
+
+    async def get_attributes_many(self, keys):
+        await asyncio.sleep(0)
+        return SimpleNamespace(error=None, data={key.uuid: self.attributes.get(key.uuid, dict()) for key in keys})
+
+
+class FakeGame:
+    def __init__(self, cache_size: int):
+        self.options = {"attribute_cache_size": cache_size}
+        self.db = FakeDatabase()
+        self.snapshot = SimpleNamespace(get_attributes=lambda key: None)
+        self.stats = SimpleNamespace(charge_db=lambda elapsed: None)
+        self.writeback = SimpleNamespace(in_flush=False, handlers=dict())
+        self.objects = SimpleNamespace(loaded=dict())
+        self.inheritance = InheritanceIndex(self)
+        self.attribute_loader = attrcache.AttributeLoader(self)
+        self.manager = AttributeManager(None)
+
+    def add(self, value: str) -> AttributeHandler:
+        uuid = uuid4()
+        owner = SimpleNamespace(game=self, uuid=uuid, key=SimpleNamespace(uuid=uuid))
+        self.db.attributes[uuid] = {"DESC": {"value": {"text": value}}}
+        return AttributeHandler(owner, self.manager)
+
+
+class TestAttributeLoader(unittest.IsolatedAsyncioTestCase):
+    async def test_loads_and_evicts_beyond_the_limit(self):
+        game = FakeGame(1)
+        loader = game.attribute_loader
+        first, second = game.add("one"), game.add("two")
+        await loader.ensure([first])
+        await loader.ensure([second])
+        self.assertFalse(first.loaded)
+        self.assertEqual(second.get_value("DESC").plain, "two")
+        self.assertEqual(loader.evictions, 1)
+
+    async def test_task_keeps_what_it_loaded_across_awaits(self):
+        game = FakeGame(1)
+        loader = game.attribute_loader
+        mine, other = game.add("mine"), game.add("other")
+        started = asyncio.Event()
+
+        async def task():
+            with loader.pinned():
+                await loader.ensure([mine])
+                started.set()
+                # Another batch loads while this task is waiting on something else.
+                await asyncio.sleep(0.05)
+                return mine.get_value("DESC").plain
+
+        async def elsewhere():
+            await started.wait()
+            await loader.ensure([other])
+
+        found, _ = await asyncio.gather(task(), elsewhere())
+        self.assertEqual(found, "mine")
+        self.assertTrue(other.loaded)
+        # Once the task is done its handler is fair game again.
+        self.assertFalse(mine.loaded)
+        self.assertEqual(loader.pins, dict())
+
+    async def test_closed_scope_pins_nothing(self):
+        game = FakeGame(1)
+        loader = game.attribute_loader
+        late = game.add("late")
+        with loader.pinned() as scope:
+            pass
+        token = attrcache.PINS.set(scope)
+        try:
+            await loader.ensure([late])
+        finally:
+            attrcache.PINS.reset(token)
+        self.assertEqual(loader.pins, dict())
@@ -0,0 +1,133 @@
+import unittest
+
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+pytest.importorskip("mudrich")
+pytest.importorskip("rapidjson")
+
+from pymush.attributes import (
+    AttributeHandler,
+    AttributeManager,
+    AttributeRequest,
+    AttributeRequestType,
+    compile_pattern,
+)
+from pymush.inheritance import InheritanceIndex
+
+
+class FakeGame:
+    def __init__(self):
+        self.marked = list()
+        self.changed = list()
+        self.writeback = SimpleNamespace(mark_attributes=self.marked.append)
+        self.inheritance = InheritanceIndex(self)
+        self.objects = SimpleNamespace(loaded=dict())
+
+    def add(self, manager):
+        obj = SimpleNamespace(game=self, uuid=uuid4(), ancestors=list())
+        obj.attributes = AttributeHandler(obj, manager)
+        self.objects.loaded[obj.uuid] = obj
+        return obj
+
+
+NAMES = ["FOO", "FOO`BAR", "FOO`BAR`BAZ", "FOO`QUX", "FOOD", "OTHER"]
+
+
+class TestCompilePattern(unittest.TestCase):
+    def test_literal_prefix(self):
+        self.assertEqual(compile_pattern("foo`*")[0], "FOO`")
+        self.assertEqual(compile_pattern("f?o")[0], "F")
+        self.assertEqual(compile_pattern("foo")[0], "FOO")
+        self.assertEqual(compile_pattern("*")[0], "")
+
+    def test_single_star_stays_on_one_branch(self):
+        regex = compile_pattern("FOO`*")[1]
+        self.assertTrue(regex.match("FOO`BAR"))
+        self.assertFalse(regex.match("FOO`BAR`BAZ"))
+        self.assertFalse(regex.match("FOO"))
+
+    def test_double_star_crosses_branches(self):
+        regex = compile_pattern("FOO`**")[1]
+        self.assertTrue(regex.match("FOO`BAR`BAZ"))
+        self.assertFalse(regex.match("FOOD"))
+
+    def test_question_mark_and_escaping(self):
+        regex = compile_pattern("F?O")[1]
+        self.assertTrue(regex.match("FOO"))
+        self.assertFalse(regex.match("FOOD"))
+        self.assertFalse(compile_pattern("F?O")[1].match("F`O"))
+        self.assertTrue(compile_pattern("A.B")[1].match("A.B"))
+        self.assertFalse(compile_pattern("A.B")[1].match("AXB"))
+
+
+class TestAttributeHandler(unittest.TestCase):
+    def setUp(self):
+        self.game = FakeGame()
+        self.handler = self.game.add(AttributeManager(None)).attributes
+        self.handler.load({name: {"value": {"text": name.lower()}} for name in NAMES})
+
+    def names(self, attributes):
+        return [attr.name for attr in attributes]
+
+    def test_match(self):
+        self.assertEqual(self.names(self.handler.match("foo*")), ["FOO", "FOOD"])
+        self.assertEqual(self.names(self.handler.match("FOO`*")), ["FOO`BAR", "FOO`QUX"])
+        self.assertEqual(self.names(self.handler.match("FOO`**")), ["FOO`BAR", "FOO`BAR`BAZ", "FOO`QUX"])
+        self.assertEqual(self.names(self.handler.match("*")), ["FOO", "FOOD", "OTHER"])
+        self.assertEqual(self.names(self.handler.match("**")), sorted(NAMES))
+        self.assertEqual(self.names(self.handler.match("NOPE*")), [])
+
+    def test_match_items_decodes_values(self):
+        found = {attr.name: value.value.plain for attr, value in self.handler.match_items("FOO?")}
+        self.assertEqual(found, {"FOOD": "food"})
+
+    def test_tree(self):
+        self.assertEqual(self.names(self.handler.tree("foo")), ["FOO", "FOO`BAR", "FOO`BAR`BAZ", "FOO`QUX"])
+        self.assertEqual(self.names(self.handler.tree("FOO`BAR")), ["FOO`BAR", "FOO`BAR`BAZ"])
+        self.assertEqual(self.names(self.handler.tree("FOOD")), ["FOOD"])
+
+    def test_wipe_takes_branches_with_it(self):
+        self.assertEqual(self.handler.wipe("FOO`B*"), 2)
+        self.assertEqual(self.names(self.handler.names()), ["FOO", "FOOD", "FOO`QUX", "OTHER"])
+        self.assertEqual(self.handler.wipe(), 4)
+        self.assertFalse(self.handler)
+        self.assertEqual(len(self.handler.dirty), 6)
+
+    def test_match_survives_changes_while_streaming(self):
+        seen = list()
+        for attr in self.handler.match("FOO`**"):
+            seen.append(attr.name)
+            self.handler.remove(attr)
+        self.assertEqual(seen, ["FOO`BAR", "FOO`BAR`BAZ", "FOO`QUX"])
+        self.assertEqual(self.names(self.handler.names()), ["FOO", "FOOD", "OTHER"])
+
+
+class TestInheritedLookups(unittest.TestCase):
+    def setUp(self):
+        self.game = FakeGame()
+        manager = AttributeManager(None)
+        self.parent = self.game.add(manager)
+        self.child = self.game.add(manager)
+        self.child.ancestors = [self.parent]
+        self.game.inheritance.set_parent(self.child.uuid, self.parent.uuid)
+        self.child.attributes.load(dict())
+
+    def get(self):
+        request = AttributeRequest(accessor=None, req_type=AttributeRequestType.GET, name="COLOR", entry=None)
+        self.child.attributes.api_get(request)
+        return request.value.plain
+
+    def test_loading_an_ancestor_drops_stale_misses(self):
+        self.child.attributes.manager.create("COLOR")
+        self.assertEqual(self.get(), "")
+        self.parent.attributes.load({"COLOR": {"value": {"text": "blue"}}})
+        self.assertEqual(self.get(), "blue")
+
+    def test_unloading_an_ancestor_drops_resolved_sources(self):
+        self.parent.attributes.load({"COLOR": {"value": {"text": "blue"}}})
+        self.assertEqual(self.get(), "blue")
+        self.parent.attributes.unload()
+        self.assertEqual(self.child.attributes.resolved, dict())
@@ -0,0 +1,100 @@
+import unittest
+
+import pytest
+
+pytest.importorskip("pymush.broadcast")
+
+from mudrich.text import Text
+
+from pymush.broadcast import Broadcaster
+
+
+class FakeConnection:
+    def __init__(self, profile):
+        self.render_profile = profile
+        self.output = list()
+
+    def listeners(self):
+        return []
+
+    def send(self, message):
+        self.receive_msg(message)
+
+    def receive_msg(self, message):
+        message.send(self)
+
+    def print_rendered(self, rendered: str):
+        self.output.append(rendered)
+
+
+class FakeSession:
+    def __init__(self, *connections):
+        self.connections = list(connections)
+        self.received = 0
+
+    def send(self, message):
+        self.receive_msg(message)
+        for listener in self.connections:
+            if listener not in message.relay_chain:
+                listener.send(message.relay(self))
+
+    def receive_msg(self, message):
+        self.received += 1
+
+
+class FakeObject:
+    def __init__(self, *listeners):
+        self._listeners = list(listeners)
+        self.sent = list()
+
+    def listeners(self):
+        return self._listeners
+
+    def send(self, message):
+        self.sent.append(message)
+        for listener in self.listeners():
+            if listener not in message.relay_chain:
+                listener.send(message.relay(self))
+
+
+class RecordingBroadcaster(Broadcaster):
+    def render(self, profile, text):
+        self.renders += 1
+        return f"{profile[0]}:{text.plain}"
+
+
+class TestBroadcaster(unittest.TestCase):
+    def setUp(self):
+        self.broadcaster = RecordingBroadcaster(None)
+
+    def test_renders_once_per_text_and_profile(self):
+        conns = [FakeConnection(("ansi", 80, False, False)) for _ in range(3)]
+        conns.append(FakeConnection(("truecolor", 80, False, False)))
+        sessions = [FakeSession(conn) for conn in conns]
+        objects = [FakeObject(session) for session in sessions]
+        hello = Text("hello")
+        self.broadcaster.send((obj, hello) for obj in objects)
+        self.assertEqual(self.broadcaster.renders, 2)
+        self.assertEqual(self.broadcaster.deliveries, 4)
+        self.assertEqual([conn.output for conn in conns], [["ansi:hello"]] * 3 + [["truecolor:hello"]])
+        self.assertTrue(all(session.received == 1 for session in sessions))
+
+    def test_recipients_each_get_their_own_message(self):
+        one, two = FakeObject(), FakeObject()
+        self.broadcaster.send([(one, Text("hi")), (two, Text("hi"))])
+        self.assertEqual(len(one.sent), 1)
+        self.assertIs(one.sent[0].source, one)
+        self.assertIs(two.sent[0].source, two)
+
+    def test_different_texts_render_separately(self):
+        conn = FakeConnection(("ansi", 80, False, False))
+        other = FakeConnection(("ansi", 80, False, False))
+        self.broadcaster.send([(FakeObject(FakeSession(conn)), Text("a")), (FakeObject(FakeSession(other)), Text("b"))])
+        self.assertEqual(self.broadcaster.renders, 2)
+        self.assertEqual((conn.output, other.output), (["ansi:a"], ["ansi:b"]))
+
+    def test_empty_text_is_not_sent(self):
+        obj = FakeObject()
+        self.broadcaster.send([(obj, Text(""))])
+        self.assertEqual(obj.sent, [])
+        self.assertEqual(self.broadcaster.renders, 0)
@@ -0,0 +1,128 @@
+import asyncio
+import time
+import unittest
+
+from pymush.cpu import CpuScheduler
+
+
+class FakeGame:
+    def __init__(self, **options):
+        self.options = {
+            "cpu_quota": 10.0,
+            "cpu_quota_period": 60.0,
+            "cpu_overquota_weight": 0.1,
+            "cpu_throttle": False,
+            "cpu_throttle_max": 5.0,
+            "cpu_slots": 2,
+        }
+        self.options.update(options)
+        self.users = dict()
+        self.objects = dict()
+
+
+def burn(seconds: float):
+    end = time.thread_time() + seconds
+    while time.thread_time() < end:
+        pass
+
+
+class TestCpuScheduler(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.game = FakeGame()
+        self.cpu = CpuScheduler(self.game)
+
+    async def test_waiting_is_not_charged(self):
+        async def task():
+            await asyncio.sleep(0.2)
+            return "done"
+
+        self.assertEqual(await self.cpu.run("owner", task()), "done")
+        account = self.cpu.accounts["owner"]
+        self.assertLess(account.used, 0.05)
+        self.assertEqual(account.tasks, 1)
+        self.assertEqual(self.cpu.running, 0)
+
+    async def test_slices_are_charged(self):
+        async def task():
+            burn(0.02)
+            await asyncio.sleep(0.01)
+            burn(0.02)
+
+        await self.cpu.run("owner", task())
+        self.assertGreaterEqual(self.cpu.accounts["owner"].used, 0.035)
+
+    async def test_slot_is_released_while_awaiting(self):
+        self.game.options["cpu_slots"] = 1
+        release = asyncio.Event()
+        order = list()
+
+        async def waiter():
+            order.append("waiter")
+            await release.wait()
+            order.append("waiter done")
+
+        async def other():
+            order.append("other")
+            release.set()
+
+        first = asyncio.ensure_future(self.cpu.run("a", waiter()))
+        await asyncio.sleep(0)
+        self.assertEqual(self.cpu.running, 0)
+        await self.cpu.run("b", other())
+        await first
+        self.assertEqual(order, ["waiter", "other", "waiter done"])
+
+    async def test_contended_slots_prefer_owners_under_quota(self):
+        self.game.options["cpu_slots"] = 1
+        order = list()
+
+        async def task(name):
+            for _ in range(3):
+                order.append(name)
+                await asyncio.sleep(0)
+            order.append(f"{name} done")
+
+        self.cpu.account("hog").bucket = -100.0
+        hog = asyncio.ensure_future(self.cpu.run("hog", task("hog")))
+        await asyncio.sleep(0)
+        fair = asyncio.ensure_future(self.cpu.run("fair", task("fair")))
+        await asyncio.gather(hog, fair)
+        # Once someone is queued, the hog's next yield requeues it, and the owner under quota keeps
+        # winning the slot until it is done.
+        self.assertEqual(
+            order, ["hog", "hog", "hog", "fair", "fair", "fair", "fair done", "hog done"]
+        )
+
+    async def test_errors_propagate_and_free_the_slot(self):
+        async def task():
+            await asyncio.sleep(0)
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            await self.cpu.run("owner", task())
+        self.assertEqual(self.cpu.running, 0)
+
+    async def test_cancellation_reaches_the_task(self):
+        cleaned = list()
+
+        async def task():
+            try:
+                await asyncio.sleep(10)
+            finally:
+                cleaned.append(True)
+
+        running = asyncio.ensure_future(self.cpu.run("owner", task()))
+        await asyncio.sleep(0)
+        running.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await running
+        self.assertEqual(cleaned, [True])
+        self.assertEqual(self.cpu.running, 0)
+
+    def test_quota_resolves_users_first(self):
+        class Owner:
+            cpu_quota = 3.0
+
+        self.game.users["user"] = Owner()
+        self.assertEqual(self.cpu.quota_for("user"), 3.0)
+        self.assertEqual(self.cpu.quota_for("nobody"), 10.0)
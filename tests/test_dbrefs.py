@@ -0,0 +1,98 @@
+import unittest
+
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Optional
+from uuid import uuid4
+
+import pytest
+
+from pymush.dbrefs import DbrefTable
+
+
+def make_key(created: int = 100, dbid=None):
+    return SimpleNamespace(uuid=uuid4(), created=created, dbid=dbid)
+
+
+class TestDbrefTable(unittest.TestCase):
+    def setUp(self):
+        self.table = DbrefTable()
+
+    def test_assigns_densely_from_zero(self):
+        keys = [make_key() for _ in range(3)]
+        self.assertEqual([self.table.assign(key) for key in keys], [0, 1, 2])
+        self.assertEqual(self.table.lookup(1), (keys[1].uuid, None))
+        self.assertEqual(len(self.table), 3)
+
+    def test_assigning_twice_keeps_the_first_dbref(self):
+        key = make_key()
+        self.assertEqual(self.table.assign(key), 0)
+        self.assertEqual(self.table.assign(key, 5), 0)
+
+    def test_reuses_lowest_free_slot(self):
+        keys = [make_key() for _ in range(4)]
+        for key in keys:
+            self.table.assign(key)
+        self.assertEqual(self.table.release(keys[2].uuid), 2)
+        self.assertEqual(self.table.release(keys[1].uuid), 1)
+        self.assertEqual(self.table.assign(make_key()), 1)
+        self.assertEqual(self.table.assign(make_key()), 2)
+        self.assertEqual(self.table.assign(make_key()), 4)
+
+    def test_recycled_dbref_rejects_old_objid(self):
+        old = make_key(created=100)
+        self.table.assign(old)
+        self.table.release(old.uuid)
+        new = make_key(created=200)
+        self.assertEqual(self.table.assign(new), 0)
+        self.assertEqual(self.table.lookup(0, 100), (None, "Objid not found!"))
+        self.assertEqual(self.table.lookup(0, 200), (new.uuid, None))
+
+    def test_explicit_and_stored_dbrefs_are_honoured(self):
+        self.assertEqual(self.table.assign(make_key(), 3), 3)
+        self.assertEqual(self.table.assign(make_key(dbid=1)), 1)
+        # The gaps below them are free for anything else.
+        self.assertEqual(self.table.assign(make_key()), 0)
+        self.assertEqual(self.table.assign(make_key()), 2)
+        self.assertEqual(self.table.assign(make_key()), 4)
+
+    def test_taken_dbref_falls_back_to_a_free_slot(self):
+        self.table.assign(make_key(), 0)
+        self.assertEqual(self.table.assign(make_key(dbid=0)), 1)
+
+    def test_lookup_misses(self):
+        self.assertEqual(self.table.lookup(0), (None, "Dbref Not Found!"))
+        self.assertEqual(self.table.lookup(-1), (None, "Dbref Not Found!"))
+
+
+@dataclass(frozen=True)
+class Key:
+    uuid: object
+    created: int
+    dbid: Optional[int] = field(default=None, compare=False)
+
+
+class TestIndexKey(unittest.TestCase):
+    def setUp(self):
+        game = pytest.importorskip("pymush.game")
+        registry = pytest.importorskip("pymush.registry")
+        self.marked = list()
+        self.game = SimpleNamespace(
+            objects=registry.ObjectRegistry(lambda key: key),
+            writeback=SimpleNamespace(mark=lambda key, **kwargs: self.marked.append((key, kwargs))),
+        )
+        self.index_key = lambda key, dbid=None: game.GameService.index_key(self.game, key, dbid)
+
+    def test_new_dbref_is_carried_by_the_registered_key(self):
+        key = self.index_key(Key(uuid4(), 100))
+        self.assertEqual(key.dbid, 0)
+        self.assertIs(self.game.objects.keys[key.uuid], key)
+        self.assertEqual(self.marked, [(key, {"dbid": 0})])
+
+    def test_stored_dbref_is_not_written_again(self):
+        key = Key(uuid4(), 100, 4)
+        self.assertIs(self.index_key(key, 4), key)
+        # As a snapshot boot would, with the key it pickled.
+        again = self.index_key(self.index_key(Key(uuid4(), 100)), 0)
+        self.assertEqual(again.dbid, 0)
+        self.assertEqual(len(self.marked), 1)
@@ -0,0 +1,56 @@
+import unittest
+
+from types import SimpleNamespace
+from uuid import uuid4
+
+from pymush.displaynames import DisplayNameCache
+
+
+class FakeObject:
+    def __init__(self, name: str):
+        self.uuid = uuid4()
+        self.name = name
+        self.asked = 0
+
+    def get_dub_or_keyphrase_for(self, target):
+        self.asked += 1
+        return target.name
+
+
+def fake_game(limit: int):
+    return SimpleNamespace(options={"display_name_cache_size": limit})
+
+
+class TestDisplayNameCache(unittest.TestCase):
+    def test_caches_names(self):
+        cache = DisplayNameCache(fake_game(0))
+        viewer, target = FakeObject("viewer"), FakeObject("target")
+        self.assertEqual(cache.name_for(viewer, target), "target")
+        self.assertEqual(cache.name_for(viewer, target), "target")
+        self.assertEqual(viewer.asked, 1)
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 1, 1))
+
+    def test_evicts_least_recently_active_viewer(self):
+        cache = DisplayNameCache(fake_game(4))
+        targets = [FakeObject(f"target{i}") for i in range(2)]
+        first, second, third = FakeObject("first"), FakeObject("second"), FakeObject("third")
+        cache.names_for(first, targets)
+        cache.names_for(second, targets)
+        # Touching first makes second the least recently active.
+        cache.name_for(first, targets[0])
+        cache.names_for(third, targets)
+        self.assertEqual(len(cache), 4)
+        self.assertNotIn(second.uuid, cache.names)
+        self.assertEqual(cache.by_target[targets[0].uuid], {first.uuid, third.uuid})
+        self.assertEqual(cache.stats()["evictions"], 2)
+        self.assertEqual(cache.stats()["limit"], 4)
+
+    def test_rename_and_discard_keep_size(self):
+        cache = DisplayNameCache(fake_game(0))
+        viewer, target, other = FakeObject("viewer"), FakeObject("target"), FakeObject("other")
+        cache.names_for(viewer, [target, other])
+        cache.renamed(target.uuid)
+        self.assertEqual(len(cache), 1)
+        cache.discard(viewer.uuid)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.by_target, {})
@@ -0,0 +1,112 @@
+import unittest
+
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+pytest.importorskip("mudrich")
+
+from pymush.keywords import KeywordIndex, LocationKeywords
+
+
+class TestLocationKeywords(unittest.TestCase):
+    def setUp(self):
+        self.index = LocationKeywords()
+        self.index.add("sword", ["big blue sword"], ["big", "blue", "sword"])
+        self.index.add("shield", ["blue shield"], ["blue", "shield"])
+        self.index.add("swan", ["the swan"], ["the", "swan"])
+
+    def test_exact(self):
+        self.assertEqual(self.index.match("blue shield", exact=True), [("blue shield", {"shield"})])
+        self.assertEqual(self.index.match("blue", exact=True), [])
+
+    def test_partial_returns_every_prefix_key_shortest_first(self):
+        self.assertEqual(self.index.match("sw"), [("swan", {"swan"}), ("sword", {"sword"})])
+        self.assertEqual(self.index.match("blue"), [("blue", {"sword", "shield"})])
+        self.assertEqual(self.index.match("x"), [])
+
+    def test_quoted_matches_full_names(self):
+        self.assertEqual(self.index.match("b", quoted=True), [("blue shield", {"shield"}), ("big blue sword", {"sword"})])
+
+    def test_simple_words_are_skipped(self):
+        self.assertEqual(self.index.match("the"), [])
+        self.assertEqual(self.index.match("the", quoted=True), [("the swan", {"swan"})])
+
+    def test_remove_and_readd(self):
+        self.index.remove("swan")
+        self.assertEqual(self.index.match("sw"), [("sword", {"sword"})])
+        self.index.add("sword", ["swan sword"], ["swan", "sword"])
+        self.assertEqual(self.index.match("swa"), [("swan", {"sword"})])
+        self.assertEqual(self.index.match("big"), [])
+        self.assertEqual(len(self.index), 2)
+
+
+class FakeObject:
+    def __init__(self, game, name: str, visible: bool = True, active: bool = True):
+        self.game = game
+        self.uuid = uuid4()
+        self.key = self.uuid
+        self.name = name
+        self.visible = visible
+        self._active = active
+        self.contents = list()
+        game.objects[self.uuid] = self
+        game.rows[self.uuid] = {"name": name}
+
+    def active(self):
+        return self._active
+
+    async def can_perceive_many(self, entry, targets):
+        return [x for x in targets if x.visible]
+
+
+class FakeCache:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def get_many(self, keys, store=True):
+        return {key: self.rows[key] for key in keys}
+
+
+class TestLocateIndexed(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.base = pytest.importorskip("pymush.objects.base")
+        self.game = SimpleNamespace(objects=dict(), rows=dict())
+        self.game.object_cache = FakeCache(self.game.rows)
+        self.game.keywords = KeywordIndex(self.game)
+        self.room = FakeObject(self.game, "Room")
+        self.viewer = FakeObject(self.game, "Viewer")
+        self.room.contents.append(self.viewer)
+
+    def add(self, *args, **kwargs):
+        obj = FakeObject(self.game, *args, **kwargs)
+        self.room.contents.append(obj)
+        return obj
+
+    async def locate(self, name: str, **kwargs):
+        options = dict(exact=False, quoted=False, filter_visible=True, include_inactive=False)
+        options.update(kwargs)
+        return await self.base.GameObject._locate_indexed(
+            self.viewer, None, name, self.room, False, options["exact"], options["quoted"],
+            options["filter_visible"], options["include_inactive"]
+        )
+
+    async def test_unseen_match_does_not_hide_later_ones(self):
+        self.add("Swan", visible=False)
+        sword = self.add("Sword")
+        self.assertEqual(await self.locate("sw"), [sword])
+
+    async def test_inactive_match_does_not_hide_later_ones(self):
+        self.add("Swan", active=False)
+        sword = self.add("Sword")
+        self.assertEqual(await self.locate("sw"), [sword])
+
+    async def test_shortest_usable_key_wins(self):
+        swan = self.add("Swan")
+        self.add("Sword")
+        self.assertEqual(await self.locate("sw"), [swan])
+        self.assertEqual(await self.locate("sw", filter_visible=False), [swan])
+
+    async def test_viewer_is_never_found(self):
+        self.assertEqual(await self.locate("viewer"), [])
@@ -0,0 +1,78 @@
+import unittest
+
+from types import SimpleNamespace
+
+import pytest
+
+lua = pytest.importorskip("pymush.lua")
+
+from mudrich.text import Text
+
+
+class FakeAttributes:
+    def __init__(self, writable: bool):
+        self.writable = writable
+        self.values = dict()
+
+    def items(self):
+        return [(SimpleNamespace(name=k), SimpleNamespace(value=Text(v))) for k, v in self.values.items()]
+
+    def api_access(self, request):
+        return self.writable
+
+    def api_set(self, request):
+        self.values[request.name] = request.value.plain
+
+
+class FakeHolder:
+    dbref = "#5"
+    instructions_per_check = 1000
+    max_lua_instructions = 0
+
+    def __init__(self, game, writable: bool = True):
+        self.game = game
+        self.attributes = FakeAttributes(writable)
+        self.output = list()
+
+    async def load_attributes(self):
+        pass
+
+    def msg(self, text):
+        self.output.append(text)
+
+
+class FakeOffload:
+    def __init__(self, result):
+        self.result = result
+        self.jobs = list()
+
+    async def submit(self, func, job):
+        self.jobs.append(job)
+        return self.result
+
+
+def make_task(writable: bool = True, **kwargs):
+    game = SimpleNamespace(
+        options={"lua_offload_all": True},
+        offload=FakeOffload({"writes": {"SCORE": "10"}, "output": ["done"], "error": None}),
+    )
+    task = lua.LuaTask(FakeHolder(game, writable), **kwargs)
+    task.code = "set('score', 10)"
+    return task
+
+
+class TestOffloadedLua(unittest.IsolatedAsyncioTestCase):
+    async def test_job_carries_registers(self):
+        task = make_task(registers={"0": "zero", "count": 3, "skip": object()})
+        await task.execute_offloaded()
+        self.assertEqual(task.game.offload.jobs[0]["registers"], {"0": "zero", "count": 3})
+
+    async def test_writes_are_permission_checked(self):
+        task = make_task()
+        await task.execute_offloaded()
+        self.assertEqual(task.holder.attributes.values, {"SCORE": "10"})
+        self.assertEqual(task.holder.output, ["done"])
+
+        denied = make_task(writable=False)
+        await denied.execute_offloaded()
+        self.assertEqual(denied.holder.attributes.values, dict())
@@ -0,0 +1,83 @@
+import unittest
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("mudrich")
+
+from pymush.names import NameIndex
+
+
+class FakeObjects:
+    def __init__(self, rows):
+        self.keys = {uuid: uuid for uuid in rows}
+
+    def all_keys(self):
+        return self.keys.values()
+
+
+class FakeCache:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def get_many(self, keys, store=True):
+        return {key: self.rows[key] for key in keys}
+
+
+def fake_game(rows):
+    return SimpleNamespace(
+        objects=FakeObjects(rows), object_cache=FakeCache(rows), options={"load_page_size": 2}
+    )
+
+
+class TestNameIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = NameIndex(None)
+        self.index.add("sword", {"name": "Big Blue Sword", "type_name": "THING", "aliases": ["blade"]})
+        self.index.add("shield", {"name": "Blue Shield", "type_name": "THING"})
+        self.index.add("bob", {"name": "Bob", "type_name": "PLAYER"})
+
+    def test_exact_matches_names_and_aliases(self):
+        self.assertEqual(self.index.exact("big blue sword"), ["sword"])
+        self.assertEqual(self.index.exact(" BLADE "), ["sword"])
+        self.assertEqual(self.index.exact("blue"), [])
+
+    def test_prefix(self):
+        self.assertEqual(sorted(self.index.prefix("b")), ["bob", "shield", "sword"])
+        self.assertEqual(self.index.prefix("b", type_name="PLAYER"), ["bob"])
+        self.assertEqual(len(self.index.prefix("b", limit=2)), 2)
+
+    def test_word_prefix_needs_every_part(self):
+        self.assertEqual(sorted(self.index.word_prefix("blu")), ["shield", "sword"])
+        self.assertEqual(self.index.word_prefix("bl sw"), ["sword"])
+        self.assertEqual(self.index.word_prefix("sw sh"), [])
+        self.assertEqual(self.index.word_prefix("   "), [])
+
+    def test_search_falls_through_in_order(self):
+        self.assertEqual(self.index.search("bob"), ["bob"])
+        self.assertEqual(self.index.search("big"), ["sword"])
+        self.assertEqual(self.index.search("sh"), ["shield"])
+        self.assertEqual(self.index.search("shield", exact=True), [])
+
+    def test_rename_and_remove(self):
+        self.index.rename("bob", {"name": "Robert", "type_name": "PLAYER"})
+        self.assertEqual(self.index.exact("bob"), [])
+        self.assertEqual(self.index.exact("robert"), ["bob"])
+        self.index.remove("shield")
+        self.index.remove("shield")
+        self.assertEqual(self.index.word_prefix("shield"), [])
+        self.assertEqual(len(self.index), 2)
+        self.assertNotIn(("blue", "shield"), self.index.words)
+
+
+class TestNameIndexBuild(unittest.IsolatedAsyncioTestCase):
+    async def test_build_pages_through_every_object(self):
+        rows = {f"obj{i}": {"name": f"Thing {i}", "type_name": "THING"} for i in range(5)}
+        index = NameIndex(fake_game(rows))
+        await index.ensure_built()
+        self.assertTrue(index.built)
+        self.assertEqual(len(index), 5)
+        self.assertEqual(index.exact("thing 3"), ["obj3"])
+        self.assertEqual(index.names, sorted(index.names))
+        self.assertEqual(index.words, sorted(index.words))
@@ -0,0 +1,73 @@
+import asyncio
+import unittest
+
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+from pymush.perception import VisibilityCache
+
+
+def thing(*contents):
+    return SimpleNamespace(uuid=uuid4(), contents=list(contents))
+
+
+class TestVisibilityCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = VisibilityCache(None)
+
+    def test_move_forgets_only_nearby_verdicts(self):
+        item = thing()
+        mover = thing(item)
+        bystander, far, faraway = thing(), thing(), thing()
+        old, new, elsewhere = thing(bystander), thing(), thing(far, faraway)
+        self.cache.put(bystander, mover, True)
+        self.cache.put(far, item, True)
+        self.cache.put(far, faraway, True)
+        self.cache.put(bystander, faraway, True)
+        generation = self.cache.generation
+
+        self.cache.moved(mover, old, new)
+        self.assertGreater(self.cache.generation, generation)
+        self.assertIsNone(self.cache.get(bystander, mover))
+        self.assertIsNone(self.cache.get(far, item))
+        self.assertIsNone(self.cache.get(bystander, faraway))
+        self.assertTrue(self.cache.get(far, faraway))
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.cache.involving, {far.uuid: {(far.uuid, faraway.uuid)}, faraway.uuid: {(far.uuid, faraway.uuid)}})
+
+    def test_bump_forgets_everything(self):
+        viewer, target = thing(), thing()
+        self.cache.put(viewer, target, False)
+        self.cache.bump()
+        self.assertIsNone(self.cache.get(viewer, target))
+        self.assertEqual(self.cache.involving, dict())
+
+
+class Viewer:
+    def __init__(self, game, gate: asyncio.Event):
+        self.game = game
+        self.uuid = uuid4()
+        self.gate = gate
+
+    async def check_perceive_many(self, entry, targets):
+        await self.gate.wait()
+        return [True for _ in targets]
+
+
+class TestCanPerceiveMany(unittest.IsolatedAsyncioTestCase):
+    async def test_verdicts_outdated_during_the_check_are_not_kept(self):
+        base = pytest.importorskip("pymush.objects.base")
+        game = SimpleNamespace(visibility=VisibilityCache(None))
+        gate = asyncio.Event()
+        viewer, target = Viewer(game, gate), thing()
+        check = asyncio.create_task(base.GameObject.can_perceive_many(viewer, None, [target]))
+        await asyncio.sleep(0)
+        game.visibility.moved(target, None, None)
+        gate.set()
+        self.assertEqual(await check, [target])
+        self.assertIsNone(game.visibility.get(viewer, target))
+
+        self.assertEqual(await base.GameObject.can_perceive_many(viewer, None, [target]), [target])
+        self.assertTrue(game.visibility.get(viewer, target))
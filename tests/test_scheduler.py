@@ -0,0 +1,78 @@
+import unittest
+import unittest.mock
+
+from pymush.scheduler import DeadlineScheduler
+
+
+class TestDeadlineScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = DeadlineScheduler()
+        self.fired = list()
+
+    def test_fires_in_deadline_order(self):
+        self.scheduler.call_at(30.0, self.fired.append, "c")
+        self.scheduler.call_at(10.0, self.fired.append, "a")
+        self.scheduler.call_at(20.0, self.fired.append, "b")
+        self.scheduler.update(25.0)
+        self.assertEqual(self.fired, ["a", "b"])
+        self.assertEqual(len(self.scheduler), 1)
+        self.scheduler.update(30.0)
+        self.assertEqual(self.fired, ["a", "b", "c"])
+        self.assertFalse(self.scheduler)
+
+    def test_ties_fire_in_insertion_order(self):
+        for name in ("a", "b", "c"):
+            self.scheduler.call_at(5.0, self.fired.append, name)
+        self.scheduler.update(5.0)
+        self.assertEqual(self.fired, ["a", "b", "c"])
+
+    def test_cancelled_calls_are_skipped(self):
+        self.scheduler.call_at(1.0, self.fired.append, "a")
+        handle = self.scheduler.call_at(2.0, self.fired.append, "b")
+        handle.cancel()
+        # Cancelling twice mustn't count twice.
+        handle.cancel()
+        self.assertEqual(len(self.scheduler), 1)
+        self.scheduler.update(3.0)
+        self.assertEqual(self.fired, ["a"])
+        self.assertEqual(len(self.scheduler), 0)
+
+    def test_next_deadline_skips_cancelled(self):
+        first = self.scheduler.call_at(1.0, self.fired.append, "a")
+        self.scheduler.call_at(2.0, self.fired.append, "b")
+        first.cancel()
+        self.assertEqual(self.scheduler.next_deadline(), 2.0)
+        self.assertEqual(len(self.scheduler), 1)
+
+    def test_cancel_after_firing_is_harmless(self):
+        handle = self.scheduler.call_at(1.0, self.fired.append, "a")
+        self.scheduler.update(1.0)
+        handle.cancel()
+        self.assertEqual(len(self.scheduler), 0)
+        self.assertIsNone(self.scheduler.next_deadline())
+
+    def test_heap_is_compacted_when_mostly_cancelled(self):
+        handles = [self.scheduler.call_at(100.0 + i, self.fired.append, i) for i in range(200)]
+        for handle in handles[:150]:
+            handle.cancel()
+        self.scheduler.update(0.0)
+        self.assertEqual(len(self.scheduler._heap), 50)
+        self.assertEqual(len(self.scheduler), 50)
+
+    def test_callback_errors_do_not_stop_the_tick(self):
+        def explode():
+            raise ValueError("boom")
+
+        self.scheduler.call_at(1.0, explode)
+        self.scheduler.call_at(2.0, self.fired.append, "after")
+        with unittest.mock.patch("traceback.print_exc"):
+            self.scheduler.update(2.0)
+        self.assertEqual(self.fired, ["after"])
+        self.assertEqual(self.scheduler.stats()["fired"], 2)
+
+    def test_lateness_is_recorded(self):
+        self.scheduler.call_at(1.0, self.fired.append, "a")
+        self.scheduler.update(1.5)
+        stats = self.scheduler.stats()
+        self.assertAlmostEqual(stats["lateness_max"], 0.5)
+        self.assertAlmostEqual(stats["lateness_avg"], 0.5)
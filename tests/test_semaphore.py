@@ -0,0 +1,100 @@
+import unittest
+
+from uuid import uuid4
+
+from pymush.scheduler import DeadlineScheduler
+from pymush.semaphore import SemaphoreManager
+
+
+class FakeGame:
+    def __init__(self):
+        self.scheduler = DeadlineScheduler()
+
+
+class FakeObject:
+    """
+    Just enough of a GameObject to hold, release and discard tasks.
+    """
+
+    def __init__(self):
+        self.uuid = uuid4()
+        self.held = dict()
+        self.released = list()
+        self.discarded = list()
+        self._next_pid = 0
+
+    def hold_task(self, task) -> int:
+        self._next_pid += 1
+        self.held[self._next_pid] = task
+        return self._next_pid
+
+    def release_task(self, pid: int, priority: int):
+        self.released.append(self.held.pop(pid))
+
+    def discard_task(self, pid: int):
+        self.discarded.append(self.held.pop(pid))
+
+
+class TestSemaphoreManager(unittest.TestCase):
+    def setUp(self):
+        self.game = FakeGame()
+        self.manager = SemaphoreManager(self.game)
+        self.sem = FakeObject()
+        self.holder = FakeObject()
+
+    def test_notify_wakes_waiters_in_fifo_order(self):
+        for task in ("a", "b", "c"):
+            self.manager.wait(self.sem, self.holder, task)
+        self.assertEqual(self.manager.notify(self.sem, count=2), 2)
+        self.assertEqual(self.holder.released, ["a", "b"])
+        self.assertEqual(self.manager.notify(self.sem), 1)
+        self.assertEqual(self.holder.released, ["a", "b", "c"])
+        self.assertIsNone(self.manager.get(self.sem))
+
+    def test_extra_notifies_are_banked(self):
+        self.assertEqual(self.manager.notify(self.sem, count=2), 0)
+        self.assertEqual(self.manager.count(self.sem), 2)
+        self.manager.wait(self.sem, self.holder, "a")
+        # A banked notify releases the task straight away.
+        self.assertEqual(self.holder.released, ["a"])
+        self.assertEqual(self.manager.count(self.sem), 1)
+
+    def test_count_ignores_waiters(self):
+        self.manager.wait(self.sem, self.holder, "a")
+        self.manager.wait(self.sem, self.holder, "b")
+        self.assertEqual(self.manager.count(self.sem), 0)
+        self.assertEqual(len(self.manager.get(self.sem)), 2)
+
+    def test_attributes_are_separate_semaphores(self):
+        self.manager.wait(self.sem, self.holder, "a", attr="one")
+        self.manager.wait(self.sem, self.holder, "b", attr="TWO")
+        self.manager.notify(self.sem, attr="two")
+        self.assertEqual(self.holder.released, ["b"])
+        self.assertEqual(len(self.manager.get(self.sem, "ONE")), 1)
+
+    def test_timeout_releases_only_that_waiter(self):
+        self.manager.wait(self.sem, self.holder, "a", timeout=5)
+        self.manager.wait(self.sem, self.holder, "b")
+        self.game.scheduler.update(self.game.scheduler.next_deadline())
+        self.assertEqual(self.holder.released, ["a"])
+        self.manager.notify(self.sem)
+        self.assertEqual(self.holder.released, ["a", "b"])
+
+    def test_notify_cancels_timeout(self):
+        self.manager.wait(self.sem, self.holder, "a", timeout=5)
+        self.manager.notify(self.sem)
+        self.assertEqual(len(self.game.scheduler), 0)
+
+    def test_drain_discards_every_semaphore_on_object(self):
+        self.manager.wait(self.sem, self.holder, "a")
+        self.manager.wait(self.sem, self.holder, "b", attr="other", timeout=5)
+        self.assertEqual(self.manager.drain(self.sem), 2)
+        self.assertEqual(sorted(self.holder.discarded), ["a", "b"])
+        self.assertEqual(len(self.game.scheduler), 0)
+        self.assertNotIn(self.sem.uuid, self.manager.by_object)
+
+    def test_notify_all(self):
+        for task in ("a", "b"):
+            self.manager.wait(self.sem, self.holder, task)
+        self.assertEqual(self.manager.notify_all(self.sem), 2)
+        self.assertEqual(self.manager.count(self.sem), 0)
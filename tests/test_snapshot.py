@@ -0,0 +1,60 @@
+import tempfile
+import unittest
+
+from collections import namedtuple
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+
+pytest.importorskip("pymush.snapshot")
+
+from pymush.snapshot import SnapshotManager
+
+
+Key = namedtuple("Key", ["uuid"])
+
+
+class FakeDatabase:
+    def __init__(self, rows: dict, error=None):
+        self.rows = rows
+        self.error = error
+
+    async def get_objects(self, keys):
+        return SimpleNamespace(error=self.error, data={key.uuid: self.rows[key.uuid] for key in keys})
+
+
+def fake_game(directory: str, keys: list, error=None):
+    async def flush():
+        pass
+
+    return SimpleNamespace(
+        options={"snapshot_interval": 0, "snapshot_dir": directory, "load_page_size": 2},
+        writeback=SimpleNamespace(flush=flush),
+        objects=SimpleNamespace(all_keys=lambda: keys, dbrefs=SimpleNamespace(dbid_of=lambda uuid: None)),
+        db=FakeDatabase({key.uuid: {"name": str(i)} for i, key in enumerate(keys)}, error),
+    )
+
+
+class TestSnapshotStats(unittest.IsolatedAsyncioTestCase):
+    async def test_take_records_stats(self):
+        keys = [Key(uuid4()) for _ in range(3)]
+        with tempfile.TemporaryDirectory() as directory:
+            manager = SnapshotManager(fake_game(directory, keys))
+            await manager.take()
+            stats = manager.stats()
+            self.assertEqual(stats["taken"], 1)
+            self.assertEqual(stats["failures"], 0)
+            self.assertEqual(stats["last_count"], 3)
+            self.assertEqual(stats["generation"], 1)
+            self.assertGreater(stats["last_taken"], 0)
+            self.assertEqual(manager.get_row(keys[1]), {"name": "1"})
+            manager.close()
+
+    async def test_failed_take_is_counted(self):
+        with tempfile.TemporaryDirectory() as directory:
+            manager = SnapshotManager(fake_game(directory, [Key(uuid4())], error="boom"))
+            await manager.take()
+            stats = manager.stats()
+            self.assertEqual((stats["taken"], stats["failures"]), (0, 1))
+            manager.close()
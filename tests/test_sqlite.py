@@ -0,0 +1,87 @@
+import os
+import tempfile
+import types
+import unittest
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("rapidjson")
+pytest.importorskip("mudrich")
+pytest.importorskip("pymush.db.base")
+
+from mudrich.text import Text
+
+from pymush.db.sqlite import SQLiteDatabase
+
+
+class TestSQLiteDatabase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, "test.sqlite3")
+        self.db = await self.open()
+
+    async def asyncTearDown(self):
+        await self.db.close()
+        self.folder.cleanup()
+
+    async def open(self) -> SQLiteDatabase:
+        app = types.SimpleNamespace(config=types.SimpleNamespace(database_config={"path": self.path}))
+        db = SQLiteDatabase(app)
+        await db.async_setup()
+        return db
+
+    async def test_list_objects_pages_by_position(self):
+        created = [(await self.db.create_object("THING", Text(f"Thing {i}"))).data for i in range(7)]
+        seen, position = list(), 0
+        while True:
+            page = (await self.db.list_objects(after=position, limit=3)).data
+            for position, key in page:
+                seen.append(key.uuid)
+            if len(page) < 3:
+                break
+        self.assertEqual(seen, [key.uuid for key in created])
+
+    async def test_list_objects_survives_deletes_between_pages(self):
+        created = [(await self.db.create_object("THING", Text(f"Thing {i}"))).data for i in range(6)]
+        first = (await self.db.list_objects(after=0, limit=3)).data
+        await self.db.conn.execute("DELETE FROM objects WHERE id = ?", (str(created[0].uuid),))
+        await self.db.conn.commit()
+        rest = (await self.db.list_objects(after=first[-1][0], limit=3)).data
+        self.assertEqual([key.uuid for _, key in rest], [key.uuid for key in created[3:]])
+
+    async def test_dbids_are_stored_and_listed(self):
+        key = (await self.db.create_object("THING", Text("Thing"), dbid=7)).data
+        self.assertEqual(key.dbid, 7)
+        other = (await self.db.create_object("THING", Text("Other"))).data
+        await self.db.update_object(other, dbid=3)
+        await self.db.close()
+        self.db = await self.open()
+        listed = {key.uuid: key.dbid for _, key in (await self.db.list_objects()).data}
+        self.assertEqual(listed, {key.uuid: 7, other.uuid: 3})
+
+    async def test_parents_round_trip(self):
+        parent = (await self.db.create_object("THING", Text("Parent"))).data
+        child = (await self.db.create_object("THING", Text("Child"), parent=parent.uuid)).data
+        self.assertEqual((await self.db.get_object(child)).data["parent"], parent.uuid)
+        await self.db.update_object(child, parent=None)
+        self.assertIsNone((await self.db.get_object(child)).data["parent"])
+        await self.db.update_object(parent, parent=child.uuid)
+        rows = (await self.db.get_objects([parent, child])).data
+        self.assertEqual(rows[parent.uuid]["parent"], child.uuid)
+
+    async def test_older_databases_gain_added_columns(self):
+        await self.db.conn.execute("DROP TABLE attributes")
+        await self.db.conn.execute("DROP TABLE objects")
+        await self.db.conn.execute(
+            "CREATE TABLE objects (id TEXT PRIMARY KEY, type_name TEXT NOT NULL, name TEXT NOT NULL, "
+            "name_text TEXT NOT NULL, created INTEGER NOT NULL, modified INTEGER NOT NULL, user TEXT NULL, "
+            "admin_level INTEGER NOT NULL DEFAULT 0, quota_cost INTEGER NOT NULL DEFAULT 0, userdata TEXT NULL)"
+        )
+        await self.db.conn.commit()
+        await self.db.close()
+        self.db = await self.open()
+        key = (await self.db.create_object("THING", Text("Thing"), dbid=2)).data
+        row = (await self.db.get_object(key)).data
+        self.assertEqual(row["dbid"], 2)
+        self.assertIsNone(row["parent"])
@@ -0,0 +1,37 @@
+import unittest
+
+from pymush.stats import CURRENT_TASK, DbTimer, LatencyHistogram, StatsManager
+
+
+class TestDbTimer(unittest.TestCase):
+    def test_collects_charged_time(self):
+        stats = StatsManager(None)
+        with DbTimer() as timer:
+            self.assertIs(CURRENT_TASK.get(), timer)
+            stats.charge_db(0.25)
+            stats.charge_db(0.5)
+        self.assertIsNone(CURRENT_TASK.get())
+        self.assertAlmostEqual(timer.db_time, 0.75)
+
+    def test_restores_outer_task(self):
+        stats = StatsManager(None)
+        with DbTimer() as outer:
+            with DbTimer() as inner:
+                stats.charge_db(1.0)
+            stats.charge_db(2.0)
+        self.assertAlmostEqual(inner.db_time, 1.0)
+        self.assertAlmostEqual(outer.db_time, 2.0)
+
+    def test_charges_nothing_outside_a_task(self):
+        StatsManager(None).charge_db(1.0)
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        for _ in range(99):
+            histogram.record(0.001)
+        histogram.record(1.0)
+        self.assertLessEqual(histogram.percentile(50), 0.0018)
+        self.assertEqual(histogram.percentile(100), 1.0)
+        self.assertAlmostEqual(histogram.mean, (0.099 + 1.0) / 100)
@@ -0,0 +1,69 @@
+import asyncio
+import time
+import unittest
+
+from collections import namedtuple
+
+from types import SimpleNamespace
+from uuid import uuid4
+
+from pymush.scheduler import DeadlineScheduler
+from pymush.writeback import WriteBehind
+
+
+class FakeDatabase:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.batches = list()
+
+    async def write_batch(self, objects, attributes):
+        await asyncio.sleep(self.delay)
+        self.batches.append(objects)
+        return SimpleNamespace(error=None)
+
+
+def fake_game(interval: float, delay: float):
+    return SimpleNamespace(
+        options={"writeback_interval": interval, "writeback_max_pending": 1000},
+        scheduler=DeadlineScheduler(),
+        object_cache=SimpleNamespace(stage=lambda key, **kwargs: None),
+        snapshot=SimpleNamespace(journal_batch=lambda objects, attributes: None),
+        db=FakeDatabase(delay),
+    )
+
+
+Key = namedtuple("Key", ["uuid"])
+
+
+def make_key():
+    return Key(uuid4())
+
+
+class TestWriteBehind(unittest.IsolatedAsyncioTestCase):
+    async def pump(self, game, seconds: float):
+        end = time.time() + seconds
+        while time.time() < end:
+            game.scheduler.update(time.time())
+            await asyncio.sleep(0.01)
+
+    async def test_flushes_after_interval(self):
+        game = fake_game(0.05, 0.0)
+        writeback = WriteBehind(game)
+        writeback.mark(make_key(), name="a")
+        await self.pump(game, 0.2)
+        self.assertEqual(len(writeback), 0)
+        self.assertEqual(writeback.flushes, 1)
+
+    async def test_timer_firing_during_a_flush_is_not_lost(self):
+        game = fake_game(0.1, 0.3)
+        writeback = WriteBehind(game)
+        first, second = make_key(), make_key()
+        writeback.mark(first, name="a")
+        await self.pump(game, 0.15)
+        self.assertTrue(writeback.in_flush)
+        # Arms a timer that fires while the slow write is still going.
+        writeback.mark(second, name="b")
+        await self.pump(game, 0.9)
+        self.assertEqual(len(writeback), 0)
+        self.assertEqual([list(batch.keys()) for batch in game.db.batches], [[first], [second]])
+        self.assertIsNone(writeback.timer)